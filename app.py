@@ -15,7 +15,8 @@ try:
         AuthComponent, 
         VideoComponent,
         ChatComponent,
-        AnalyticsComponent
+        AnalyticsComponent,
+        CorpusComponent
     )
     from core import GeminiTubeGPT
     from utils import APP_CONFIG, QUICK_QUESTIONS
@@ -121,6 +122,8 @@ def render_sidebar_content():
     if st.session_state.video_loaded:
         AnalyticsComponent.render_video_stats()
     
+    CorpusComponent.render_corpus_panel()
+    
     UIComponents.render_controls()
 
 def render_analytics_page():
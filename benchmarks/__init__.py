@@ -0,0 +1,5 @@
+"""
+TubeGPT Benchmarks Package
+
+This package contains micro-benchmarks for the transcript processing pipeline.
+"""
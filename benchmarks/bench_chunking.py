@@ -0,0 +1,73 @@
+import argparse
+import random
+import time
+from array import array
+from typing import List, Tuple
+
+from core.chunker import TokenChunker, estimate_tokens
+from benchmarks.bench_subtitles import WORDS
+
+
+def synthetic_transcript(words: int, punctuated: bool, seed: int = 0) -> Tuple[str, array]:
+    """Return transcript text and its cue end offsets (a cue every ~8 words)"""
+    rng = random.Random(seed)
+    parts: List[str] = []
+    cue_ends = array('q')
+    length = -1
+    for i in range(words):
+        word = rng.choice(WORDS)
+        if punctuated and rng.random() < 1 / 15:
+            word += '.'
+        parts.append(word)
+        length += len(word) + 1
+        if i % 8 == 7:
+            cue_ends.append(length)
+    return ' '.join(parts), cue_ends
+
+
+def legacy_chunk(transcript: str, chunk_size: int = 1000, overlap: int = 200) -> List[str]:
+    """The original character-count chunker, kept here as the comparison baseline"""
+    chunks = []
+    start = 0
+    while start < len(transcript):
+        end = start + chunk_size
+        if end < len(transcript):
+            for i in range(end, max(start + chunk_size - 200, start), -1):
+                if transcript[i] in '.!?':
+                    end = i + 1
+                    break
+        chunk = transcript[start:end].strip()
+        if chunk:
+            chunks.append(chunk)
+        start = end - overlap
+    return chunks
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark transcript chunking throughput")
+    parser.add_argument('--words', type=int, nargs='+', default=[1_000, 100_000, 1_000_000])
+    parser.add_argument('--chunk-tokens', type=int, default=256)
+    parser.add_argument('--overlap-tokens', type=int, default=48)
+    args = parser.parse_args()
+
+    chunker = TokenChunker(args.chunk_tokens, args.overlap_tokens)
+    print(f"{'words':>10} {'text':>6} {'chunker':>8} {'MB/s':>8} {'chunks':>8} {'max tok':>8}")
+    for words in args.words:
+        for punctuated in (True, False):
+            text, cue_ends = synthetic_transcript(words, punctuated)
+            label = 'punct' if punctuated else 'cues'
+            runs = [
+                ('legacy', lambda: legacy_chunk(text)),
+                ('token', lambda: chunker.chunk(text, None if punctuated else cue_ends)),
+            ]
+            for name, run in runs:
+                start = time.perf_counter()
+                chunks = run()
+                elapsed = time.perf_counter() - start
+                mb_per_s = len(text) / 1e6 / elapsed if elapsed else float('inf')
+                largest = max(estimate_tokens(chunk) for chunk in chunks)
+                print(f"{words:>10,} {label:>6} {name:>8} {mb_per_s:>8.1f} {len(chunks):>8,} {largest:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+import argparse
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+
+from core.subtitle_parser import parse_subtitle_file
+
+WORDS = (
+    "the a and of to in is that it for on with as this we you are be at or "
+    "model data video people time work going really think about because "
+    "system example right know just like actually thing important"
+).split()
+
+
+def _timestamp(ms: int) -> str:
+    hours, ms = divmod(ms, 3_600_000)
+    minutes, ms = divmod(ms, 60_000)
+    seconds, ms = divmod(ms, 1000)
+    return f"{hours:02d}:{minutes:02d}:{seconds:02d}.{ms:03d}"
+
+
+def write_auto_caption_vtt(path: str, hours: float, seed: int = 0) -> None:
+    """Write a YouTube-style auto-caption track with rolling repeated lines"""
+    rng = random.Random(seed)
+    end = int(hours * 3_600_000)
+    now = 0
+    previous = ''
+
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write("WEBVTT\nKind: captions\nLanguage: en\n\n")
+        while now < end:
+            words = [rng.choice(WORDS) for _ in range(rng.randint(5, 9))]
+            step = len(words) * 300
+            tagged = words[0] + ''.join(
+                f"<{_timestamp(now + i * 300)}><c> {word}</c>" for i, word in enumerate(words[1:], 1)
+            )
+            line = ' '.join(words)
+
+            # Typing cue: previous line on top, new words tagged word by word
+            f.write(f"{_timestamp(now)} --> {_timestamp(now + step)} align:start position:0%\n")
+            f.write(f"{previous}\n{tagged}\n\n" if previous else f" \n{tagged}\n\n")
+            # Snap cue: the finished line repeated for 10ms
+            f.write(f"{_timestamp(now + step)} --> {_timestamp(now + step + 10)} align:start position:0%\n")
+            f.write(f"{line}\n \n\n")
+
+            previous = line
+            now += step + 10
+
+
+def legacy_clean(path: str) -> str:
+    """The original whole-file line filter, kept here as the comparison baseline"""
+    with open(path, 'r', encoding='utf-8') as f:
+        content = f.read()
+
+    text_lines = []
+    for line in content.split('\n'):
+        line = line.strip()
+        if (line and
+            not line.startswith('WEBVTT') and
+            not line.startswith('NOTE') and
+            '-->' not in line and
+            not line.isdigit() and
+            not line.startswith('<') and
+            not line.endswith('>')):
+            text_lines.append(line)
+    return ' '.join(text_lines)
+
+
+def measure(fn, *args):
+    """Return (result, seconds, peak traced bytes) for one call"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = fn(*args)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark subtitle parsing on synthetic auto-captions")
+    parser.add_argument('--hours', type=float, nargs='+', default=[0.5, 2, 6])
+    args = parser.parse_args()
+
+    print(f"{'hours':>6} {'file MB':>8} {'parser':>10} {'seconds':>8} {'peak MB':>8} {'chars':>10} {'cues':>7}")
+    for hours in args.hours:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, 'captions.vtt')
+            write_auto_caption_vtt(path, hours)
+            size_mb = os.path.getsize(path) / 1e6
+
+            text, elapsed, peak = measure(legacy_clean, path)
+            print(f"{hours:>6} {size_mb:>8.1f} {'legacy':>10} {elapsed:>8.2f} {peak / 1e6:>8.1f} {len(text):>10,} {'-':>7}")
+
+            parsed, elapsed, peak = measure(parse_subtitle_file, path)
+            print(f"{hours:>6} {size_mb:>8.1f} {'streaming':>10} {elapsed:>8.2f} {peak / 1e6:>8.1f} {len(parsed.text):>10,} {len(parsed):>7,}")
+
+
+if __name__ == "__main__":
+    main()
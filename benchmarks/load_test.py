@@ -0,0 +1,119 @@
+import argparse
+import json
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import uvicorn
+
+from core.api_server import AdmissionController, create_app
+from core.llm_backend import FakeBackend
+from utils.constants import API_CONFIG, TRANSCRIPT_CONFIG
+
+QUESTIONS = [
+    "What is the main topic of this video?",
+    "What does the speaker think about the model and the data?",
+    "Why is this system important for people at work?",
+    "Give an example of something that actually matters",
+]
+
+
+def start_server(port: int, latency_ms: float, tokens_per_second: float, max_inflight: int,
+                 max_queue: int) -> uvicorn.Server:
+    """Serve the API in this process against the fake caption source and fake LLM"""
+    TRANSCRIPT_CONFIG['source'] = 'fake'
+    backend = FakeBackend(latency_ms=latency_ms, tokens_per_second=tokens_per_second)
+    app = create_app(backend, AdmissionController(max_inflight, max_queue))
+    server = uvicorn.Server(uvicorn.Config(app, host='127.0.0.1', port=port, log_level='warning'))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return server
+
+
+def post(url: str, payload: Dict, timeout: float) -> Tuple[int, float, Optional[float]]:
+    """(status, seconds, seconds to the first streamed byte)"""
+    request = urllib.request.Request(url, data=json.dumps(payload).encode('utf-8'),
+                                     headers={'Content-Type': 'application/json'})
+    started = time.perf_counter()
+    first_byte = None
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            if payload.get('stream'):
+                first = response.read(1)
+                first_byte = time.perf_counter() - started if first else None
+            response.read()
+            status = response.status
+    except urllib.error.HTTPError as e:
+        status = e.code
+    except OSError:
+        status = 0
+    return status, time.perf_counter() - started, first_byte
+
+
+def run(args) -> Dict:
+    base = args.url or f"http://127.0.0.1:{args.port}"
+    if not args.url:
+        start_server(args.port, args.llm_latency_ms, args.llm_tokens_per_second, args.max_inflight, args.max_queue)
+
+    videos = [f"load{n:07d}" for n in range(args.videos)]
+    jobs = []
+    for n in range(args.requests):
+        video = videos[n % len(videos)]
+        if n % 10 == 9:
+            jobs.append((f"{base}/v1/summarize", {'video': video, 'stream': args.stream}))
+        else:
+            # Vary the wording so most requests miss the answer cache
+            question = f"{QUESTIONS[n % len(QUESTIONS)]} ({n})"
+            jobs.append((f"{base}/v1/ask", {'video': video, 'question': question, 'stream': args.stream}))
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(args.concurrency) as pool:
+        results = list(pool.map(lambda job: post(*job, timeout=args.timeout), jobs))
+    elapsed = time.perf_counter() - started
+
+    statuses: Dict[int, int] = {}
+    for status, _, _ in results:
+        statuses[status] = statuses.get(status, 0) + 1
+    ok = np.array([seconds for status, seconds, _ in results if status == 200])
+    ttfb = np.array([first for status, _, first in results if status == 200 and first is not None])
+
+    def percentiles(values: np.ndarray) -> List[Optional[float]]:
+        return np.percentile(values, [50, 95, 99]).round(4).tolist() if len(values) else [None] * 3
+
+    return {
+        'requests': args.requests,
+        'concurrency': args.concurrency,
+        'seconds': elapsed,
+        'requests_per_second': args.requests / elapsed,
+        'statuses': statuses,
+        'latency_p50_p95_p99': percentiles(ok),
+        'first_byte_p50_p95_p99': percentiles(ttfb),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the TubeGPT HTTP API with fake YouTube and LLM backends")
+    parser.add_argument('--url', help="test a running server instead of starting one in-process with fakes")
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--requests', type=int, default=500)
+    parser.add_argument('--concurrency', type=int, default=64)
+    parser.add_argument('--videos', type=int, default=20)
+    parser.add_argument('--stream', action='store_true', help="use the streaming endpoints")
+    parser.add_argument('--timeout', type=float, default=120.0)
+    parser.add_argument('--llm-latency-ms', type=float, default=400.0)
+    parser.add_argument('--llm-tokens-per-second', type=float, default=80.0)
+    parser.add_argument('--max-inflight', type=int, default=API_CONFIG['max_inflight'])
+    parser.add_argument('--max-queue', type=int, default=API_CONFIG['max_queue'])
+    args = parser.parse_args()
+
+    summary = run(args)
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+import argparse
+import gc
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional
+
+from benchmarks.bench_chunking import synthetic_transcript
+from benchmarks.bench_subtitles import write_auto_caption_vtt
+from core.gemini_service import GeminiTubeGPT
+from core.llm_backend import FakeBackend
+from core.retrieval import BM25Index
+from core.subtitle_parser import parse_subtitle_file
+from core.vector_index import DenseVectorIndex, HashingEmbedder
+
+# write_auto_caption_vtt emits about 7 words per 2.11s of video
+WORDS_PER_CAPTION_HOUR = 11_900
+
+QUESTIONS = [
+    "What is the main topic of this video?",
+    "What does the speaker think about the model and the data?",
+    "Why is this system important for people at work?",
+    "Give an example of something that actually matters",
+]
+
+URLS = [
+    "https://www.youtube.com/watch?v=dQw4w9WgXcQ",
+    "https://youtu.be/dQw4w9WgXcQ?t=42",
+    "https://www.youtube.com/embed/dQw4w9WgXcQ",
+    "https://www.youtube.com/watch?feature=share&v=dQw4w9WgXcQ&list=PL123",
+    "dQw4w9WgXcQ",
+    "not a youtube url at all",
+]
+
+
+class Suite:
+    """Collects timing and peak memory of each benchmark case.
+
+    Each case runs ``repeat`` times untraced and keeps the fastest time.
+    It then runs once more under tracemalloc for the peak allocation.
+    ``ops`` divides the time for cases that loop over many small calls.
+    """
+
+    def __init__(self, repeat: int = 3, only: Optional[List[str]] = None):
+        self.repeat = repeat
+        self.only = only
+        self.results: Dict[str, Dict] = {}
+
+    def case(self, name: str, words: int, fn: Callable, ops: int = 1, repeat: Optional[int] = None) -> None:
+        if self.only and not any(pattern in name for pattern in self.only):
+            return
+        best = float('inf')
+        for _ in range(repeat or self.repeat):
+            gc.collect()
+            start = time.perf_counter()
+            fn()
+            best = min(best, time.perf_counter() - start)
+
+        gc.collect()
+        tracemalloc.start()
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        key = f"{name}@{words}"
+        self.results[key] = {'seconds': best / ops, 'peak_bytes': peak, 'ops': ops}
+        print(f"{key:<40} {best / ops * 1e3:>12.3f} ms {peak / 1e6:>10.2f} MB")
+
+
+def run_size(suite: Suite, words: int, temp_dir: str) -> None:
+    text, _ = synthetic_transcript(words, punctuated=True)
+    vtt_path = os.path.join(temp_dir, f'captions-{words}.vtt')
+    write_auto_caption_vtt(vtt_path, words / WORDS_PER_CAPTION_HOUR)
+    with open(vtt_path, 'r', encoding='utf-8') as f:
+        vtt = f.read()
+
+    service = GeminiTubeGPT()
+    service.set_backend(FakeBackend(latency_distribution='fixed', latency_ms=0.0, tokens_per_second=1e9))
+
+    suite.case('parse.clean_subtitle_content', words, lambda: service._clean_subtitle_content(vtt))
+    suite.case('parse.subtitle_file', words, lambda: parse_subtitle_file(vtt_path))
+
+    suite.case('chunk.chunk_transcript', words, lambda: service.chunk_transcript(text))
+    chunks = service.chunk_transcript(text)
+    service.transcript, service.chunks = text, chunks
+
+    suite.case('index.bm25_build', words, lambda: BM25Index(chunks))
+    embedder = HashingEmbedder()
+    suite.case('index.dense_build', words, lambda: DenseVectorIndex.build(chunks, embedder), repeat=1)
+    service.vector_index = DenseVectorIndex.build(chunks, embedder)
+
+    for mode in ('bm25', 'dense', 'cascade'):
+        suite.case(f'retrieve.{mode}', words,
+                   lambda: [service.find_relevant_chunks(q, chunks, mode=mode) for q in QUESTIONS],
+                   ops=len(QUESTIONS))
+
+    ranked = [service.find_relevant_chunk_ids(q, chunks, service.context_packer.candidates) for q in QUESTIONS]
+    suite.case('context.pack', words, lambda: [service.context_packer.pack(chunks, ids) for ids in ranked],
+               ops=len(QUESTIONS))
+
+
+def run(args) -> Dict:
+    suite = Suite(args.repeat, args.only)
+    print(f"{'case':<40} {'time/op':>15} {'peak':>13}")
+    suite.case('url.extract_video_id', 0,
+               lambda: [GeminiTubeGPT.extract_video_id(url) for _ in range(1000) for url in URLS],
+               ops=1000 * len(URLS))
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for words in args.sizes:
+            run_size(suite, words, temp_dir)
+
+    return {
+        'meta': {
+            'python': sys.version.split()[0],
+            'platform': platform.platform(),
+            'machine': platform.machine(),
+            'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'sizes': args.sizes,
+            'repeat': args.repeat,
+        },
+        'results': suite.results,
+    }
+
+
+def compare(baseline: Dict, current: Dict, time_threshold: float, memory_threshold: float) -> List[str]:
+    """Names of cases that got slower or hungrier than the thresholds allow"""
+    regressions = []
+    print(f"{'case':<40} {'time':>9} {'memory':>9}")
+    for key, now in sorted(current['results'].items()):
+        before = baseline['results'].get(key)
+        if before is None:
+            print(f"{key:<40} {'new':>9} {'new':>9}")
+            continue
+        time_ratio = now['seconds'] / before['seconds'] if before['seconds'] else 1.0
+        memory_ratio = now['peak_bytes'] / before['peak_bytes'] if before['peak_bytes'] else 1.0
+        flags = []
+        if time_ratio > 1 + time_threshold:
+            flags.append('SLOWER')
+        if memory_ratio > 1 + memory_threshold:
+            flags.append('MEMORY')
+        if flags:
+            regressions.append(key)
+        print(f"{key:<40} {time_ratio:>8.2f}x {memory_ratio:>8.2f}x {' '.join(flags)}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="TubeGPT micro-benchmark suite with JSON baselines")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1_000, 10_000, 100_000, 1_000_000],
+                        help="synthetic transcript sizes in words")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--only', nargs='+', help="run only cases whose name contains one of these")
+    parser.add_argument('--output', help="write results as a JSON baseline")
+    parser.add_argument('--compare', help="baseline JSON to check these results against")
+    parser.add_argument('--current', help="compare this saved results file instead of running")
+    parser.add_argument('--time-threshold', type=float, default=0.25,
+                        help="allowed fractional slowdown before a case counts as a regression")
+    parser.add_argument('--memory-threshold', type=float, default=0.25)
+    args = parser.parse_args()
+
+    if args.current:
+        with open(args.current, 'r', encoding='utf-8') as f:
+            results = json.load(f)
+    else:
+        results = run(args)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"Saved {len(results['results'])} results to {args.output}")
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare(baseline, results, args.time_threshold, args.memory_threshold)
+        if regressions:
+            print(f"{len(regressions)} regression(s) beyond the thresholds")
+            sys.exit(1)
+        print("No regressions")
+
+
+if __name__ == "__main__":
+    main()
@@ -9,13 +9,15 @@ from .auth_component import AuthComponent
 from .video_component import VideoComponent
 from .chat_component import ChatComponent
 from .analytics_component import AnalyticsComponent
+from .corpus_component import CorpusComponent
 
 __all__ = [
     'UIComponents',
     'AuthComponent', 
     'VideoComponent',
     'ChatComponent',
-    'AnalyticsComponent'
+    'AnalyticsComponent',
+    'CorpusComponent'
 ]
 
 __version__ = '2.0.0'
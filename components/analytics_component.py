@@ -7,9 +7,11 @@ class AnalyticsComponent:
         if st.session_state.video_loaded:
             st.markdown("### 📊 Video Analytics")
             
-            transcript_length = len(st.session_state.tube_gpt.transcript)
-            chunk_count = len(st.session_state.tube_gpt.chunks)
-            word_count = len(st.session_state.tube_gpt.transcript.split())
+            # Precomputed at load; nothing here scans the transcript
+            stats = st.session_state.tube_gpt.video_stats
+            transcript_length = stats.chars
+            chunk_count = stats.chunk_count
+            word_count = stats.words
             
             # Stats metrics
             col1, col2, col3 = st.columns(3)
@@ -30,9 +32,10 @@ class AnalyticsComponent:
             st.info("💡 Load a video to see detailed analytics")
             return
         
-        transcript_length = len(st.session_state.tube_gpt.transcript)
-        chunk_count = len(st.session_state.tube_gpt.chunks)
-        word_count = len(st.session_state.tube_gpt.transcript.split())
+        stats = st.session_state.tube_gpt.video_stats
+        transcript_length = stats.chars
+        chunk_count = stats.chunk_count
+        word_count = stats.words
         chat_count = len(st.session_state.chat_history)
         
         # Overview metrics
@@ -60,8 +63,13 @@ class AnalyticsComponent:
             
             with st.container():
                 st.info(f"**Video ID:** {st.session_state.tube_gpt.video_id}")
-                st.info(f"**Average words per chunk:** {word_count // chunk_count if chunk_count > 0 else 0}")
+                st.info(f"**Average words per chunk:** {stats.avg_words_per_chunk}")
+                if stats.average_wpm is not None:
+                    st.info(f"**Speaking pace:** {stats.average_wpm:.0f} words/min over {stats.duration_seconds / 60:.0f} min")
                 st.info(f"**Processing status:** ✅ Complete")
+                store = st.session_state.tube_gpt.video_store.stats()
+                st.info(f"**Shared video store:** {store['videos']} videos, {store['sessions']} sessions, "
+                        f"{store['bytes'] / 1e6:.1f} of {store['max_bytes'] / 1e6:.0f} MB")
         
         with col2:
             st.markdown("### 💬 Chat Statistics")
@@ -71,5 +79,101 @@ class AnalyticsComponent:
                     avg_response_length = sum(len(answer) for _, answer in st.session_state.chat_history) // chat_count
                     st.info(f"**Total conversations:** {chat_count}")
                     st.info(f"**Average response length:** {avg_response_length} characters")
+                    
+                    metrics = [m for m in st.session_state.tube_gpt.request_metrics if m['ttft_seconds'] is not None]
+                    if metrics:
+                        avg_ttft = sum(m['ttft_seconds'] for m in metrics) / len(metrics)
+                        avg_total = sum(m['total_seconds'] for m in metrics) / len(metrics)
+                        st.info(f"**Avg time to first token:** {avg_ttft:.2f}s (total {avg_total:.2f}s)")
+                    
+                    prompts = list(st.session_state.tube_gpt.prompt_metrics)
+                    if prompts:
+                        st.markdown("**Prompt tokens per question**")
+                        st.line_chart(
+                            {"Prompt": [m['prompt_tokens'] for m in prompts],
+                             "History": [m['history_tokens'] for m in prompts]},
+                        )
                 else:
                     st.info("**Status:** No chat history yet")
+        
+        st.divider()
+        AnalyticsComponent.render_content_charts(stats)
+        
+        st.divider()
+        AnalyticsComponent.render_latency_breakdown()
+    
+    @staticmethod
+    def render_content_charts(stats):
+        """Render speaking pace, top terms and chunk sizes from precomputed VideoStats"""
+        if stats.words_per_minute is not None and len(stats.words_per_minute) > 1:
+            st.markdown("### 🗣️ Words per Minute")
+            st.line_chart(
+                {"Minute": stats.pace_minutes, "Words/min": stats.words_per_minute},
+                x="Minute", y="Words/min",
+            )
+        
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            st.markdown("### 🔤 Top Terms")
+            st.dataframe([{"Term": term, "Count": count} for term, count in stats.top_terms],
+                         hide_index=True, use_container_width=True)
+        
+        with col2:
+            st.markdown("### 📦 Chunk Sizes (tokens)")
+            counts, edges = stats.chunk_token_histogram
+            if len(counts):
+                st.bar_chart({"Tokens": [f"{int(low)}-{int(high)}" for low, high in zip(edges[:-1], edges[1:])],
+                              "Chunks": counts}, x="Tokens", y="Chunks")
+                percentiles = stats.chunk_token_percentiles
+                st.caption(f"p10 {percentiles['p10']} · median {percentiles['p50']} · "
+                           f"p90 {percentiles['p90']} · max {percentiles['max']}")
+    
+    @staticmethod
+    def render_latency_breakdown():
+        """Render per-stage timings of the latest load, question and summary traces"""
+        tube_gpt = st.session_state.tube_gpt
+        st.markdown("### ⏱️ Latency Breakdown")
+        
+        traces = [
+            ("Video load", 'video.load'),
+            ("Last question", 'question.answer'),
+            ("Quick actions batch", 'question.batch'),
+            ("Last summary", 'summary.generate'),
+        ]
+        shown = False
+        for label, name in traces:
+            trace_id = tube_gpt.last_traces.get(name)
+            rows = tube_gpt.tracer.breakdown(trace_id) if trace_id else []
+            if not rows:
+                continue
+            shown = True
+            
+            total_ms = rows[0]['ms']
+            with st.expander(f"{label}: {total_ms / 1000:.2f}s", expanded=name == 'video.load'):
+                st.dataframe(
+                    [{
+                        'Stage': "\u00a0\u00a0" * row['depth'] + row['stage'],
+                        'ms': round(row['ms'], 1),
+                        'Share': row['ms'] / total_ms if total_ms else 0.0,
+                        'Details': ", ".join(f"{key}={value}" for key, value in row['attributes'].items())
+                                   + (f" ⚠️ {row['error']}" if row['error'] else ""),
+                    } for row in rows],
+                    column_config={
+                        'Share': st.column_config.ProgressColumn("Share", min_value=0.0, max_value=1.0, format="%.2f"),
+                    },
+                    hide_index=True,
+                    use_container_width=True,
+                )
+        
+        if not shown:
+            st.info("No traced operations yet")
+            return
+        
+        col1, col2 = st.columns(2)
+        with col1:
+            st.download_button("📈 Prometheus metrics", tube_gpt.tracer.to_prometheus(),
+                               file_name="tubegpt_metrics.prom", mime="text/plain", use_container_width=True)
+        with col2:
+            st.download_button("🧵 OTLP traces (JSON)", tube_gpt.tracer.to_otlp_json(),
+                               file_name="tubegpt_traces.json", mime="application/json", use_container_width=True)
@@ -1,5 +1,5 @@
 import streamlit as st
-from utils.constants import QUICK_QUESTIONS
+from utils.constants import QUICK_QUESTIONS, QA_CONFIG
 
 class ChatComponent:
     @staticmethod
@@ -43,10 +43,15 @@ class ChatComponent:
             submitted = st.form_submit_button("🚀 Send Message", type="primary", use_container_width=True)
             
             if submitted and question:
-                with st.spinner("🤔 Thinking..."):
-                    answer = st.session_state.tube_gpt.answer_question(question)
-                    st.session_state.chat_history.append((question, answer))
-                    st.rerun()
+                with st.chat_message("user"):
+                    st.write(question)
+                
+                # Render tokens as they arrive, then commit the full answer
+                with st.chat_message("assistant"):
+                    answer = st.write_stream(st.session_state.tube_gpt.answer_question_stream(question))
+                
+                st.session_state.chat_history.append((question, answer))
+                st.rerun()
     
     @staticmethod
     def render_quick_actions():
@@ -64,7 +69,7 @@ class ChatComponent:
                 for col_idx, question in enumerate(row):
                     with cols[col_idx]:
                         # Clean button text (remove emoji for cleaner look)
-                        clean_text = question[2:].strip()  # Remove emoji and extra spaces
+                        clean_text = ChatComponent.quick_question_text(question)
                         button_key = f"quick_{row_idx}_{col_idx}"
                         
                         if st.button(
@@ -74,8 +79,41 @@ class ChatComponent:
                             help=f"Ask: {clean_text}"
                         ):
                             with st.spinner("🤔 Processing..."):
-                                answer = st.session_state.tube_gpt.answer_question(clean_text)
+                                # Standalone questions, so precomputed answers still apply mid-conversation
+                                answer = st.session_state.tube_gpt.answer_question(clean_text, use_history=False)
                                 st.session_state.chat_history.append((clean_text, answer))
                                 st.rerun()
+            
+            ChatComponent._render_batch_export()
         else:
             st.info("💡 Configure API and load a video to see quick actions")
+    
+    @staticmethod
+    def quick_question_text(question):
+        """Quick action label without its emoji, as it is asked"""
+        return question[2:].strip()  # Remove emoji and extra spaces
+    
+    @staticmethod
+    def precompute_quick_actions():
+        """Answer every quick action in the background so clicks are instant"""
+        if QA_CONFIG['precompute_quick_actions'] and st.session_state.api_configured:
+            st.session_state.tube_gpt.start_precompute(
+                [ChatComponent.quick_question_text(question) for question in QUICK_QUESTIONS]
+            )
+    
+    @staticmethod
+    def _render_batch_export():
+        """Render quick action precompute status and report download"""
+        tube_gpt = st.session_state.tube_gpt
+        
+        if tube_gpt.precompute_running():
+            st.caption("⏳ Preparing quick action answers...")
+        elif tube_gpt.last_batch_results:
+            st.download_button(
+                "📥 Export Q&A Report",
+                data=tube_gpt.export_batch_report(),
+                file_name=f"tubegpt_{tube_gpt.video_id}_report.md",
+                mime="text/markdown",
+                use_container_width=True,
+                key="export_batch_report"
+            )
@@ -0,0 +1,69 @@
+import streamlit as st
+from core import get_ingest_manifest
+
+class CorpusComponent:
+    @staticmethod
+    def render_corpus_panel():
+        """Render the multi-video knowledge base"""
+        tube_gpt = st.session_state.tube_gpt
+        
+        with st.expander("📚 Knowledge Base", expanded=False):
+            st.caption("Add several videos and ask one question across all of them.")
+            
+            with st.form("corpus_add_form", clear_on_submit=True):
+                video_inputs = st.text_area(
+                    "YouTube URLs or Video IDs",
+                    placeholder="One per line",
+                    height=100
+                )
+                submitted = st.form_submit_button("➕ Add Videos", use_container_width=True)
+            
+            if submitted and video_inputs.strip():
+                CorpusComponent._add_videos(video_inputs)
+            
+            # Videos pre-warmed by ingest.py load from the on-disk cache without refetching
+            ingested = get_ingest_manifest().stats()['done']
+            if ingested:
+                count = st.number_input("Ingested videos to add", min_value=1, max_value=ingested,
+                                        value=min(ingested, 50), key="corpus_ingested_count")
+                if st.button(f"📦 Add Ingested Videos ({ingested} available)", key="corpus_add_ingested",
+                             use_container_width=True):
+                    CorpusComponent._add_videos("\n".join(get_ingest_manifest().video_ids(limit=int(count))))
+            
+            if len(tube_gpt.corpus):
+                st.markdown(f"**{len(tube_gpt.corpus)} videos · {tube_gpt.corpus.chunk_count} chunks**")
+                for video_id in tube_gpt.corpus.video_ids:
+                    st.markdown(f"- [{video_id}](https://www.youtube.com/watch?v={video_id})")
+                
+                question = st.text_input("Ask across all videos", key="corpus_question")
+                if st.button("🔎 Ask", key="corpus_ask", use_container_width=True) and question:
+                    with st.spinner("🤔 Searching the knowledge base..."):
+                        answer, hits = tube_gpt.answer_across_videos(question)
+                    st.markdown(answer)
+                    if hits:
+                        st.markdown("**Sources**")
+                        for i, hit in enumerate(hits, 1):
+                            st.markdown(f"[{i}] [{hit.label}]({hit.url})")
+                
+                if st.button("🗑️ Clear Knowledge Base", key="corpus_clear", use_container_width=True):
+                    tube_gpt.corpus.clear()
+                    st.rerun()
+    
+    @staticmethod
+    def _add_videos(video_inputs):
+        """Load each listed video into the corpus"""
+        tube_gpt = st.session_state.tube_gpt
+        lines = [line.strip() for line in video_inputs.splitlines() if line.strip()]
+        progress = st.progress(0.0)
+        
+        for i, line in enumerate(lines, 1):
+            video_id = tube_gpt.extract_video_id(line)
+            if not video_id:
+                st.error(f"❌ Invalid YouTube URL or Video ID: {line}")
+            else:
+                message, success = tube_gpt.add_to_corpus(video_id)
+                if success:
+                    st.success(f"✅ {message}")
+                else:
+                    st.error(f"❌ {video_id}: {message}")
+            progress.progress(i / len(lines))
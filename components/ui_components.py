@@ -196,10 +196,12 @@ class UIComponents:
             with col1:
                 if st.button("🗑️ Clear Chat", use_container_width=True, key="clear_chat"):
                     st.session_state.chat_history = []
+                    st.session_state.tube_gpt.memory.clear()
                     st.rerun()
             
             with col2:
                 if st.button("🔄 New Video", use_container_width=True, key="new_video"):
                     st.session_state.video_loaded = False
                     st.session_state.chat_history = []
+                    st.session_state.tube_gpt.memory.clear()
                     st.rerun()
@@ -1,4 +1,5 @@
 import streamlit as st
+from .chat_component import ChatComponent
 
 class VideoComponent:
     @staticmethod
@@ -23,20 +24,17 @@ class VideoComponent:
         """Process video input"""
         video_id = st.session_state.tube_gpt.extract_video_id(video_input)
         if video_id:
-            with st.spinner("🔄 Fetching transcript..."):
-                transcript, success = st.session_state.tube_gpt.get_transcript(video_id)
-                
-                if success:
-                    st.session_state.tube_gpt.transcript = transcript
-                    st.session_state.tube_gpt.video_id = video_id
-                    
-                    with st.spinner("🧠 Processing transcript..."):
-                        st.session_state.tube_gpt.chunks = st.session_state.tube_gpt.chunk_transcript(transcript)
-                        st.session_state.video_loaded = True
-                        st.session_state.chat_history = []
-                        st.success(f"✅ Video loaded! Created {len(st.session_state.tube_gpt.chunks)} chunks.")
-                        st.rerun()
-                else:
-                    st.error(f"❌ {transcript}")
+            # Served from the process-wide store when another session already loaded it
+            with st.spinner("🔄 Fetching and processing transcript..."):
+                transcript, success = st.session_state.tube_gpt.load_video(video_id)
+            
+            if success:
+                st.session_state.video_loaded = True
+                st.session_state.chat_history = []
+                ChatComponent.precompute_quick_actions()
+                st.success(f"✅ Video loaded! Created {len(st.session_state.tube_gpt.chunks)} chunks.")
+                st.rerun()
+            else:
+                st.error(f"❌ {transcript}")
         else:
             st.error("❌ Invalid YouTube URL or Video ID")
@@ -5,9 +5,73 @@ This package contains the core business logic and services for the TubeGPT appli
 """
 
 from .gemini_service import GeminiTubeGPT
+from .transcript_cache import TranscriptCache, get_transcript_cache
+from .chunker import Chunk, ChunkStore, TokenChunker, estimate_tokens
+from .answer_cache import AnswerCache, get_answer_cache
+from .llm_backend import Completion, LLMBackend, GeminiBackend, FakeBackend
+from .llm_client import LLMClient, LLMOverloadedError
+from .tracing import Span, Tracer, get_tracer
+from .video_stats import VideoStats
+from .video_store import VideoEntry, VideoHandle, VideoStore, get_video_store
+from .corpus import CorpusHit, VideoCorpus
+from .conversation import ConversationMemory
+from .context_packer import ContextPacker, PackedContext
+from .ingest import BulkIngester, IngestManifest, get_ingest_manifest
+from .summarizer import MapReduceSummarizer, SummaryCache
+from .retrieval import BM25Index, tokenize
+from .vector_index import DenseVectorIndex, Embedder, HashingEmbedder
+from .caption_fetcher import CaptionFetcher, select_caption_track
+from .fake_youtube import FakeTranscriptSource, get_fake_transcript_source
+from .rate_limiter import TokenBucketLimiter, RateLimitBackend, MemoryRateLimitBackend, SQLiteRateLimitBackend, get_rate_limiter
 
 __all__ = [
-    'GeminiTubeGPT'
+    'GeminiTubeGPT',
+    'TranscriptCache',
+    'get_transcript_cache',
+    'TokenBucketLimiter',
+    'RateLimitBackend',
+    'MemoryRateLimitBackend',
+    'SQLiteRateLimitBackend',
+    'get_rate_limiter',
+    'CaptionFetcher',
+    'select_caption_track',
+    'BM25Index',
+    'tokenize',
+    'DenseVectorIndex',
+    'Embedder',
+    'HashingEmbedder',
+    'Chunk',
+    'ChunkStore',
+    'TokenChunker',
+    'estimate_tokens',
+    'MapReduceSummarizer',
+    'SummaryCache',
+    'AnswerCache',
+    'get_answer_cache',
+    'LLMClient',
+    'LLMOverloadedError',
+    'Completion',
+    'LLMBackend',
+    'GeminiBackend',
+    'FakeBackend',
+    'Span',
+    'Tracer',
+    'get_tracer',
+    'VideoStats',
+    'VideoEntry',
+    'VideoHandle',
+    'VideoStore',
+    'get_video_store',
+    'CorpusHit',
+    'VideoCorpus',
+    'BulkIngester',
+    'IngestManifest',
+    'get_ingest_manifest',
+    'FakeTranscriptSource',
+    'get_fake_transcript_source',
+    'ConversationMemory',
+    'ContextPacker',
+    'PackedContext'
 ]
 
 __version__ = '2.0.0'
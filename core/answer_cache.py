@@ -0,0 +1,162 @@
+import hashlib
+import json
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, FrozenSet, Optional, Tuple
+
+from utils.constants import ANSWER_CACHE_CONFIG
+
+NON_WORD_RE = re.compile(r"[^\w\s']+")
+SPACE_RE = re.compile(r'\s+')
+
+# Words that change what a question asks; near-duplicates must agree on them exactly
+QUESTION_WORDS = frozenset("who whom whose what which when where why how".split())
+NEGATIONS = frozenset("not no never nor none nothing neither cannot without".split())
+
+
+def normalize_question(question: str) -> str:
+    """Lowercase, drop emoji/punctuation and collapse whitespace"""
+    return SPACE_RE.sub(' ', NON_WORD_RE.sub(' ', question.lower())).strip()
+
+
+def hash_text(text: str) -> str:
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+
+def question_words(normalized: str) -> FrozenSet[str]:
+    """Every word of a normalized question, negations folded to ``not``.
+
+    Stopwords are kept on purpose: unlike retrieval, "who" and "when" or
+    "are" and "are not" make two questions different.
+    """
+    return frozenset('not' if word in NEGATIONS or word.endswith("n't") else word
+                     for word in normalized.split())
+
+
+def config_fingerprint(model_config: Dict) -> str:
+    return hash_text(json.dumps(model_config, sort_keys=True, default=str))
+
+
+class AnswerCache:
+    """Size-bounded LRU/TTL cache of answers.
+
+    Keyed by video_id, normalized question, model config and a hash of the
+    retrieved context, so a cached answer is only reused when it would have
+    been produced from exactly the same inputs. With ``near_duplicate``
+    enabled, a lightly reworded question (high word overlap) for the same
+    video, config and context also hits, provided both use the same
+    question words and negations.
+    """
+
+    def __init__(self, max_entries: int = ANSWER_CACHE_CONFIG['max_entries'],
+                 ttl_seconds: float = ANSWER_CACHE_CONFIG['ttl_seconds'],
+                 near_duplicate: bool = ANSWER_CACHE_CONFIG['near_duplicate'],
+                 similarity_threshold: float = ANSWER_CACHE_CONFIG['similarity_threshold']):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.near_duplicate = near_duplicate
+        self.similarity_threshold = similarity_threshold
+        self.hits = 0
+        self.near_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # key -> (answer, stored at)
+        self._entries: "OrderedDict[Tuple[str, str, str, str], Tuple[str, float]]" = OrderedDict()
+        # (video_id, config, context) -> {normalized question: its word set}
+        self._questions: Dict[Tuple[str, str, str], Dict[str, FrozenSet[str]]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(video_id: str, question: str, model_config: Dict, context: str) -> Tuple[str, str, str, str]:
+        return (video_id or '', normalize_question(question), config_fingerprint(model_config), hash_text(context))
+
+    def get(self, video_id: str, question: str, model_config: Dict, context: str) -> Optional[str]:
+        """Return a cached answer for these exact inputs (or a near-duplicate question)"""
+        key = self.make_key(video_id, question, model_config, context)
+        with self._lock:
+            answer = self._lookup(key)
+            if answer is not None:
+                self.hits += 1
+                return answer
+
+            if self.near_duplicate:
+                similar = self._find_similar(key)
+                answer = self._lookup(similar) if similar else None
+                if answer is not None:
+                    self.near_hits += 1
+                    return answer
+
+            self.misses += 1
+            return None
+
+    def put(self, video_id: str, question: str, model_config: Dict, context: str, answer: str) -> None:
+        key = self.make_key(video_id, question, model_config, context)
+        with self._lock:
+            self._entries[key] = (answer, time.time())
+            self._entries.move_to_end(key)
+            self._questions.setdefault(key[0:1] + key[2:], {})[key[1]] = question_words(key[1])
+            while len(self._entries) > self.max_entries:
+                old_key, _ = self._entries.popitem(last=False)
+                self._forget(old_key)
+                self.evictions += 1
+
+    def _lookup(self, key: Tuple[str, str, str, str]) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        answer, stored = entry
+        if self.ttl_seconds and time.time() - stored > self.ttl_seconds:
+            del self._entries[key]
+            self._forget(key)
+            return None
+        self._entries.move_to_end(key)
+        return answer
+
+    def _find_similar(self, key: Tuple[str, str, str, str]) -> Optional[Tuple[str, str, str, str]]:
+        """Best Jaccard match among questions asked with the same video, config and context"""
+        candidates = self._questions.get(key[0:1] + key[2:])
+        words = question_words(key[1])
+        if not candidates or not words:
+            return None
+
+        signature = words & (QUESTION_WORDS | {'not'})
+        best, best_score = None, self.similarity_threshold
+        for question, other in candidates.items():
+            if other & (QUESTION_WORDS | {'not'}) != signature:
+                continue
+            score = len(words & other) / len(words | other) if other else 0.0
+            if score >= best_score:
+                best, best_score = question, score
+        return (key[0], best, key[2], key[3]) if best is not None else None
+
+    def _forget(self, key: Tuple[str, str, str, str]) -> None:
+        group = key[0:1] + key[2:]
+        questions = self._questions.get(group)
+        if questions is not None:
+            questions.pop(key[1], None)
+            if not questions:
+                del self._questions[group]
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            'hits': self.hits,
+            'near_hits': self.near_hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'entries': len(self._entries),
+        }
+
+
+_shared_cache = None
+_shared_cache_lock = threading.Lock()
+
+
+def get_answer_cache() -> AnswerCache:
+    """Return the process-wide answer cache shared by all sessions"""
+    global _shared_cache
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            _shared_cache = AnswerCache()
+        return _shared_cache
@@ -0,0 +1,321 @@
+import asyncio
+import json
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import AsyncIterator, Dict, Iterator, Optional
+
+from starlette.applications import Starlette
+from starlette.background import BackgroundTask
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import Request
+from starlette.responses import JSONResponse, PlainTextResponse, Response, StreamingResponse
+from starlette.routing import Route
+
+from .gemini_service import GeminiTubeGPT
+from .llm_backend import STREAM_END, LLMBackend
+from .tracing import get_tracer
+from utils.constants import API_CONFIG
+
+
+class Overloaded(Exception):
+    """No request slot is free and the wait queue is full or timed out"""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"Server busy, retry in {retry_after}s")
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """Caps requests doing work at once, with a bounded queue in front.
+
+    Up to ``max_inflight`` requests run and up to ``max_queue`` more wait for
+    a slot. Anything beyond that, or a request that waits longer than
+    ``queue_timeout``, is rejected at once with a Retry-After hint. The hint
+    comes from a moving average of recent service times.
+    """
+
+    def __init__(self, max_inflight: int = API_CONFIG['max_inflight'], max_queue: int = API_CONFIG['max_queue'],
+                 queue_timeout: float = API_CONFIG['queue_timeout_seconds']):
+        self.max_inflight = max_inflight
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.inflight = 0
+        self.waiting = 0
+        self.served = 0
+        self.rejected = 0
+        self._service_seconds = 1.0
+        self._semaphore = asyncio.Semaphore(max_inflight)
+
+    def retry_after(self) -> int:
+        """Seconds until the current backlog has likely drained"""
+        backlog = self.waiting + self.inflight
+        return max(1, math.ceil(self._service_seconds * backlog / self.max_inflight))
+
+    async def acquire(self) -> float:
+        if self._semaphore.locked() and self.waiting >= self.max_queue:
+            self.rejected += 1
+            raise Overloaded(self.retry_after())
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), self.queue_timeout)
+        except asyncio.TimeoutError:
+            self.rejected += 1
+            raise Overloaded(self.retry_after())
+        finally:
+            self.waiting -= 1
+        self.inflight += 1
+        return time.perf_counter()
+
+    def release(self, started: float) -> None:
+        self.inflight -= 1
+        self.served += 1
+        self._service_seconds = 0.9 * self._service_seconds + 0.1 * (time.perf_counter() - started)
+        self._semaphore.release()
+
+    def stats(self) -> Dict:
+        return {
+            'inflight': self.inflight,
+            'waiting': self.waiting,
+            'served': self.served,
+            'rejected': self.rejected,
+            'max_inflight': self.max_inflight,
+            'max_queue': self.max_queue,
+            'service_seconds': self._service_seconds,
+        }
+
+
+class VideoSessions:
+    """One loaded GeminiTubeGPT per video, kept least-recently-used.
+
+    Every instance reads its video from the process-wide video store and
+    shares the transcript and answer caches, so evicting one here only
+    drops a few references. Questions about one video run concurrently on
+    its instance, which only reads the shared, immutable video data.
+    """
+
+    def __init__(self, backend: LLMBackend, max_videos: int = API_CONFIG['max_videos']):
+        self.backend = backend
+        self.max_videos = max_videos
+        self._services: "OrderedDict[str, GeminiTubeGPT]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._services)
+
+    def get(self, video_id: str) -> GeminiTubeGPT:
+        """The loaded instance for ``video_id``; raises LookupError if the video cannot be loaded"""
+        with self._lock:
+            service = self._services.get(video_id)
+            if service is not None:
+                self._services.move_to_end(video_id)
+                return service
+
+        # Concurrent first loads of one video are built once by the video store
+        service = GeminiTubeGPT()
+        service.set_backend(self.backend)
+        # Clients share this instance, so questions are answered without chat history
+        service.memory = None
+        message, success = service.load_video(video_id)
+        if not success:
+            raise LookupError(message)
+
+        with self._lock:
+            existing = self._services.get(video_id)
+            if existing is not None:
+                return existing
+            self._services[video_id] = service
+            while len(self._services) > self.max_videos:
+                self._services.popitem(last=False)
+        return service
+
+
+def _error(status: int, message: str, headers: Optional[Dict] = None) -> JSONResponse:
+    return JSONResponse({'error': message}, status_code=status, headers=headers)
+
+
+async def _events(deltas: AsyncIterator[str]) -> AsyncIterator[str]:
+    """Text deltas as server-sent events, closed by a ``done`` event"""
+    async for delta in deltas:
+        yield f"data: {json.dumps({'delta': delta})}\n\n"
+    yield "event: done\ndata: {}\n\n"
+
+
+async def _drive(deltas: Iterator[str]) -> AsyncIterator[str]:
+    """Iterate a blocking generator on one dedicated thread.
+
+    The service generators hold tracer spans open across ``yield`` and the
+    tracer keeps its span stack per thread, so every ``next()`` has to run on
+    the same thread; a shared pool would resume them wherever a worker is
+    free. Items are handed to the event loop as they arrive. If the client
+    goes away, the generator is closed on its own thread as well.
+    """
+    loop = asyncio.get_running_loop()
+    items: asyncio.Queue = asyncio.Queue()
+    stop = threading.Event()
+
+    def hand_over(item) -> None:
+        try:
+            loop.call_soon_threadsafe(items.put_nowait, item)
+        except RuntimeError:
+            # The event loop has shut down; nobody is reading any more
+            stop.set()
+
+    def produce() -> None:
+        try:
+            for item in deltas:
+                hand_over(item)
+                if stop.is_set():
+                    break
+        except BaseException as e:
+            hand_over(e)
+        finally:
+            close = getattr(deltas, 'close', None)
+            if close is not None:
+                close()
+            hand_over(STREAM_END)
+
+    threading.Thread(target=produce, name='api-stream', daemon=True).start()
+    try:
+        while True:
+            item = await items.get()
+            if item is STREAM_END:
+                return
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+    finally:
+        stop.set()
+
+
+def _default_backend() -> LLMBackend:
+    """The backend the app would configure, keyed by GEMINI_API_KEY"""
+    service = GeminiTubeGPT()
+    if not service.setup_gemini(os.environ.get('GEMINI_API_KEY', '')):
+        raise RuntimeError("Could not configure the LLM backend; set GEMINI_API_KEY or TUBEGPT_LLM_BACKEND=fake")
+    return service.backend
+
+
+def create_app(backend: Optional[LLMBackend] = None, admission: Optional[AdmissionController] = None,
+               max_videos: int = API_CONFIG['max_videos']) -> Starlette:
+    """Async HTTP API over GeminiTubeGPT: load, ask (optionally streamed) and summarize.
+
+    The blocking service calls run on the worker's thread pool behind the
+    admission controller. A busy worker answers 429 with Retry-After instead
+    of queueing without bound. Caches and the video store are process-wide.
+    Run several workers with the SQLite rate-limit backend so that the
+    YouTube limits hold across them.
+    """
+    sessions = VideoSessions(backend or _default_backend(), max_videos)
+    admission = admission or AdmissionController()
+    tracer = get_tracer()
+
+    async def video_from(request: Request) -> Dict:
+        try:
+            body = await request.json()
+        except ValueError:
+            body = None
+        if not isinstance(body, dict):
+            raise ValueError("Request body must be a JSON object")
+        video_id = GeminiTubeGPT.extract_video_id(str(body.get('video', '')))
+        if not video_id:
+            raise ValueError("Invalid YouTube URL or Video ID")
+        body['video_id'] = video_id
+        return body
+
+    async def handle(request: Request, work) -> Response:
+        """Parse, admit and run ``work(body, service, started)``, releasing the slot when done"""
+        try:
+            body = await video_from(request)
+        except ValueError as e:
+            return _error(400, str(e))
+        try:
+            started = await admission.acquire()
+        except Overloaded as e:
+            return _error(429, str(e), headers={'Retry-After': str(e.retry_after)})
+
+        streaming = False
+        try:
+            try:
+                service = await run_in_threadpool(sessions.get, body['video_id'])
+            except LookupError as e:
+                return _error(422, str(e))
+            response = await work(body, service, started)
+            streaming = isinstance(response, StreamingResponse)
+            return response
+        finally:
+            if not streaming:
+                admission.release(started)
+
+    def stream(deltas: Iterator[str], started: float) -> StreamingResponse:
+        released = []
+
+        def release() -> None:
+            if not released:
+                released.append(True)
+                admission.release(started)
+
+        async def body() -> AsyncIterator[str]:
+            # The slot is held until the last event is sent or the client goes away
+            try:
+                async for event in _events(_drive(deltas)):
+                    yield event
+            finally:
+                release()
+        # The background task covers a response that fails before the body starts
+        return StreamingResponse(body(), media_type='text/event-stream', headers={'Cache-Control': 'no-cache'},
+                                 background=BackgroundTask(release))
+
+    async def load(request: Request) -> Response:
+        async def work(body, service, started):
+            return JSONResponse({
+                'video_id': body['video_id'],
+                'chunks': len(service.chunks),
+                'words': service.video_stats.words if service.video_stats else None,
+                'strategy': service.last_transcript_strategy,
+            })
+        return await handle(request, work)
+
+    async def ask(request: Request) -> Response:
+        async def work(body, service, started):
+            question = str(body.get('question', '')).strip()
+            if not question:
+                return _error(400, "Missing question")
+            if body.get('stream'):
+                return stream(service.answer_question_stream(question), started)
+            answer = await run_in_threadpool(service.answer_question, question)
+            return JSONResponse({'video_id': body['video_id'], 'question': question, 'answer': answer})
+        return await handle(request, work)
+
+    async def summarize(request: Request) -> Response:
+        async def work(body, service, started):
+            if body.get('stream'):
+                return stream(service.generate_summary_stream(), started)
+            summary = await run_in_threadpool(service.generate_summary)
+            return JSONResponse({'video_id': body['video_id'], 'summary': summary})
+        return await handle(request, work)
+
+    async def health(request: Request) -> Response:
+        return JSONResponse({'status': 'ok', 'videos': len(sessions), 'admission': admission.stats()})
+
+    async def metrics(request: Request) -> Response:
+        stats = admission.stats()
+        lines = [tracer.to_prometheus().rstrip('\n')]
+        for name in ('inflight', 'waiting'):
+            lines += [f"# TYPE tubegpt_api_{name} gauge", f"tubegpt_api_{name} {stats[name]}"]
+        for name in ('served', 'rejected'):
+            lines += [f"# TYPE tubegpt_api_{name}_total counter", f"tubegpt_api_{name}_total {stats[name]}"]
+        return PlainTextResponse("\n".join(lines) + "\n", media_type='text/plain; version=0.0.4')
+
+    app = Starlette(routes=[
+        Route('/v1/videos', load, methods=['POST']),
+        Route('/v1/ask', ask, methods=['POST']),
+        Route('/v1/summarize', summarize, methods=['POST']),
+        Route('/health', health),
+        Route('/metrics', metrics),
+    ])
+    app.state.sessions = sessions
+    app.state.admission = admission
+    return app
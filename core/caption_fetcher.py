@@ -0,0 +1,85 @@
+import threading
+from typing import Dict, Iterable, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .subtitle_parser import ParsedTranscript, parse_caption_bytes
+from utils.constants import CAPTION_CONFIG
+
+
+def select_caption_track(info: Dict,
+                         languages: Iterable[str] = CAPTION_CONFIG['languages'],
+                         formats: Iterable[str] = CAPTION_CONFIG['formats']) -> Optional[Dict]:
+    """Pick the best caption track from a yt-dlp info dict.
+
+    Uploaded subtitles beat automatic captions, earlier languages beat later
+    ones, and within a language the first available format in ``formats`` wins.
+    Returns the yt-dlp track dict (``url``, ``ext``, ...) or None.
+    """
+    formats = list(formats)
+    for source in ('subtitles', 'automatic_captions'):
+        tracks_by_language = info.get(source) or {}
+        for language in languages:
+            tracks = [track for track in tracks_by_language.get(language) or [] if track.get('url')]
+            for fmt in formats:
+                for track in tracks:
+                    if track.get('ext') == fmt:
+                        return track
+    return None
+
+
+class CaptionFetcher:
+    """Downloads caption tracks into memory over a pooled keep-alive session"""
+
+    def __init__(self, session: Optional[requests.Session] = None,
+                 timeout: float = CAPTION_CONFIG['timeout_seconds'],
+                 max_bytes: int = CAPTION_CONFIG['max_bytes']):
+        self.session = session or get_http_session()
+        self.timeout = timeout
+        self.max_bytes = max_bytes
+
+    def download(self, url: str) -> bytes:
+        """Fetch a caption track body, refusing anything over ``max_bytes``"""
+        with self.session.get(url, timeout=self.timeout, stream=True) as response:
+            response.raise_for_status()
+            body = bytearray()
+            for block in response.iter_content(chunk_size=64 * 1024):
+                body.extend(block)
+                if len(body) > self.max_bytes:
+                    raise ValueError(f"Caption track larger than {self.max_bytes} bytes")
+        return bytes(body)
+
+    def fetch_track(self, track: Dict) -> Tuple[ParsedTranscript, int]:
+        """Download and parse one track; returns the transcript and bytes fetched"""
+        data = self.download(track['url'])
+        return parse_caption_bytes(data, track.get('ext', 'vtt')), len(data)
+
+    def fetch_transcript(self, info: Dict) -> Optional[ParsedTranscript]:
+        """Fetch the best caption track described by a yt-dlp info dict"""
+        track = select_caption_track(info)
+        if track is None:
+            return None
+        transcript, _ = self.fetch_track(track)
+        return transcript
+
+
+_shared_session = None
+_shared_session_lock = threading.Lock()
+
+
+def get_http_session() -> requests.Session:
+    """Return the process-wide HTTP session whose connection pool all fetches reuse"""
+    global _shared_session
+    with _shared_session_lock:
+        if _shared_session is None:
+            adapter = HTTPAdapter(
+                pool_connections=CAPTION_CONFIG['pool_connections'],
+                pool_maxsize=CAPTION_CONFIG['pool_maxsize'],
+            )
+            session = requests.Session()
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+            session.headers['User-Agent'] = CAPTION_CONFIG['user_agent']
+            _shared_session = session
+        return _shared_session
@@ -0,0 +1,207 @@
+import heapq
+import re
+import sys
+from array import array
+from bisect import bisect_right
+from collections import abc, deque
+from typing import Iterable, Iterator, List, Optional, Tuple, Union
+
+from .subtitle_parser import ParsedTranscript
+
+# End of a sentence: terminal punctuation, optional closing quote/bracket, then whitespace
+SENTENCE_END_RE = re.compile(r'[.!?]+["\')\]]*(?=\s)')
+
+# Gemini averages roughly four characters of English per token
+CHARS_PER_TOKEN = 4.0
+
+
+def estimate_tokens(text: str, chars_per_token: float = CHARS_PER_TOKEN) -> int:
+    """Cheap token estimate for prompt budgeting"""
+    return int(len(text) / chars_per_token + 0.999)
+
+
+class TokenChunker:
+    """Single-pass chunker sized by an approximate token budget.
+
+    The transcript is walked once as a stream of units ending at sentence
+    punctuation or, for unpunctuated auto-captions, at cue boundaries. Units are
+    packed into chunks of at most ``chunk_tokens``; the next chunk starts with
+    the trailing units that fit in ``overlap_tokens``. A unit longer than the
+    whole budget is cut at whitespace into overlap-sized pieces.
+    """
+
+    def __init__(self, chunk_tokens: int = 256, overlap_tokens: int = 48,
+                 chars_per_token: float = CHARS_PER_TOKEN):
+        if overlap_tokens >= chunk_tokens:
+            raise ValueError("overlap_tokens must be smaller than chunk_tokens")
+        self.chunk_tokens = chunk_tokens
+        self.overlap_tokens = overlap_tokens
+        self.chars_per_token = chars_per_token
+
+    def _boundaries(self, text: str, cue_ends: Optional[Iterable[int]]) -> Iterator[int]:
+        """Sorted unit end offsets from sentence punctuation and cue ends"""
+        sentence_ends = (match.end() for match in SENTENCE_END_RE.finditer(text))
+        sources = [sentence_ends] if cue_ends is None else [sentence_ends, iter(cue_ends)]
+        last = 0
+        for end in heapq.merge(*sources):
+            if end > last:
+                yield end
+                last = end
+        if last < len(text):
+            yield len(text)
+
+    def _units(self, text: str, cue_ends: Optional[Iterable[int]]) -> Iterator[Tuple[int, int]]:
+        """(start, end) units, hard-splitting any unit larger than the chunk budget.
+
+        Oversized units are cut at whitespace into pieces of about the overlap
+        size, so the next chunk can still carry the configured overlap.
+        """
+        max_chars = int(self.chunk_tokens * self.chars_per_token)
+        step = int(self.overlap_tokens * self.chars_per_token) or max_chars
+        start = 0
+        for end in self._boundaries(text, cue_ends):
+            if end - start > max_chars:
+                while end - start > step:
+                    cut = text.rfind(' ', start + 1, start + step)
+                    if cut <= start:
+                        # A word longer than the step: cut after it, or at the budget
+                        cut = text.find(' ', start + step, min(end, start + max_chars))
+                        if cut == -1:
+                            cut = start + min(step, max_chars)
+                    yield start, cut
+                    start = cut
+            yield start, end
+            start = end
+
+    def iter_spans(self, text: str, cue_ends: Optional[Iterable[int]] = None) -> Iterator[Tuple[int, int]]:
+        """Yield (start, end) character offsets of each chunk, lazily"""
+        budget = self.chunk_tokens * self.chars_per_token
+        overlap = self.overlap_tokens * self.chars_per_token
+        window = deque()  # units in the current chunk
+        size = 0          # their total length in characters
+
+        for start, end in self._units(text, cue_ends):
+            if window and size + (end - start) > budget:
+                span = _trim(text, window[0][0], window[-1][1])
+                if span:
+                    yield span
+                # Carry trailing units into the next chunk as overlap, leaving
+                # room for the unit that overflowed
+                while window and (size > overlap or size + (end - start) > budget):
+                    unit_start, unit_end = window.popleft()
+                    size -= unit_end - unit_start
+            window.append((start, end))
+            size += end - start
+
+        if window:
+            span = _trim(text, window[0][0], window[-1][1])
+            if span:
+                yield span
+
+    def chunk(self, text: str, cue_ends: Optional[Iterable[int]] = None) -> List[str]:
+        """Materialize every chunk as a string"""
+        return [text[start:end] for start, end in self.iter_spans(text, cue_ends)]
+
+    def chunk_store(self, text: str, timing: Optional[ParsedTranscript] = None) -> 'ChunkStore':
+        """Chunk into offset pairs over ``text`` without copying any chunk text"""
+        cue_ends = timing.text_end if timing is not None else None
+        return ChunkStore.from_spans(text, self.iter_spans(text, cue_ends), timing)
+
+
+class Chunk:
+    """Lightweight view of one chunk inside a ChunkStore"""
+    __slots__ = ('store', 'index')
+
+    def __init__(self, store: 'ChunkStore', index: int):
+        self.store = store
+        self.index = index
+
+    @property
+    def start(self) -> int:
+        return self.store.starts[self.index]
+
+    @property
+    def end(self) -> int:
+        return self.store.ends[self.index]
+
+    @property
+    def text(self) -> str:
+        return self.store.text[self.start:self.end]
+
+    @property
+    def start_ms(self) -> Optional[int]:
+        return self.store.time_at(self.start)
+
+    @property
+    def end_ms(self) -> Optional[int]:
+        return self.store.time_at(self.end - 1, end=True)
+
+    def __str__(self) -> str:
+        return self.text
+
+    def __repr__(self) -> str:
+        return f"Chunk(index={self.index}, start={self.start}, end={self.end})"
+
+
+class ChunkStore(abc.Sequence):
+    """Chunks as (start, end) offsets into one shared transcript string.
+
+    Behaves as a sequence of chunk strings, sliced out of the transcript only
+    when read, so overlapping chunks cost two integers each instead of a copy
+    of their text. ``view(i)`` gives a Chunk with offsets and timestamps.
+    """
+    __slots__ = ('text', 'starts', 'ends', 'timing')
+
+    def __init__(self, text: str, starts: array, ends: array, timing: Optional[ParsedTranscript] = None):
+        self.text = text
+        self.starts = starts
+        self.ends = ends
+        self.timing = timing
+
+    @classmethod
+    def from_spans(cls, text: str, spans: Iterable[Tuple[int, int]],
+                   timing: Optional[ParsedTranscript] = None) -> 'ChunkStore':
+        starts, ends = array('q'), array('q')
+        for start, end in spans:
+            starts.append(start)
+            ends.append(end)
+        return cls(text, starts, ends, timing)
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[str, List[str]]:
+        if isinstance(index, slice):
+            return [self.text[self.starts[i]:self.ends[i]] for i in range(*index.indices(len(self)))]
+        return self.text[self.starts[index]:self.ends[index]]
+
+    def view(self, index: int) -> Chunk:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("chunk index out of range")
+        return Chunk(self, index)
+
+    def views(self) -> Iterator[Chunk]:
+        return (Chunk(self, i) for i in range(len(self)))
+
+    def time_at(self, offset: int, end: bool = False) -> Optional[int]:
+        """Start (or end) time in ms of the cue containing a character offset"""
+        if self.timing is None or not len(self.timing):
+            return None
+        cue = max(bisect_right(self.timing.text_start, offset) - 1, 0)
+        return self.timing.end_ms[cue] if end else self.timing.start_ms[cue]
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the offset arrays (the shared transcript is not counted)"""
+        return sys.getsizeof(self.starts) + sys.getsizeof(self.ends)
+
+
+def _trim(text: str, start: int, end: int) -> Optional[Tuple[int, int]]:
+    """Shrink a span to exclude surrounding whitespace; None if nothing is left"""
+    while start < end and text[start].isspace():
+        start += 1
+    while end > start and text[end - 1].isspace():
+        end -= 1
+    return (start, end) if start < end else None
@@ -0,0 +1,118 @@
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .chunker import CHARS_PER_TOKEN, ChunkStore, estimate_tokens
+from utils.constants import CHUNK_CONFIG, CONTEXT_CONFIG
+
+
+class PackedContext:
+    """Transcript context for one prompt, and what went into it"""
+    __slots__ = ('text', 'tokens', 'spans', 'chunks', 'dropped', 'unpacked_tokens')
+
+    def __init__(self, text: str, tokens: int, spans: int, chunks: int, dropped: int, unpacked_tokens: int):
+        self.text = text
+        self.tokens = tokens
+        self.spans = spans
+        self.chunks = chunks
+        self.dropped = dropped
+        # What joining the same chunks whole would have cost
+        self.unpacked_tokens = unpacked_tokens
+
+
+def _label(chunks: ChunkStore, start: int) -> str:
+    start_ms = chunks.time_at(start)
+    if start_ms is None:
+        return ""
+    minutes, seconds = divmod(start_ms // 1000, 60)
+    return f"[{minutes}:{seconds:02d}] "
+
+
+def _merge(spans: List[Tuple[int, int]], text: str) -> List[Tuple[int, int]]:
+    """Union of character spans; spans separated only by whitespace join up"""
+    merged: List[Tuple[int, int]] = []
+    for start, end in sorted(spans):
+        if merged and (start <= merged[-1][1] or not text[merged[-1][1]:start].strip()):
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+class ContextPacker:
+    """Assembles retrieved chunks into a prompt context under a token budget.
+
+    Chunks are taken in relevance order while they fit in ``budget_tokens``.
+    The chosen chunks are then merged wherever they overlap or touch, so the
+    overlap between neighbouring chunks is sent once. The merged spans are
+    emitted in transcript order, each prefixed with its timestamp when the
+    transcript is timed. A chunk that would overflow the budget is skipped
+    in favour of later, smaller additions such as a neighbour that adds only
+    a few new characters. The top chunk alone is clipped to fit if it must.
+    Retrieval should offer ``candidates`` ranked chunks, enough to fill the
+    budget with whole chunks and then some.
+    """
+
+    def __init__(self, budget_tokens: int = CONTEXT_CONFIG['budget_tokens'],
+                 separator: str = CONTEXT_CONFIG['separator'], timestamps: bool = CONTEXT_CONFIG['timestamps'],
+                 candidates: Optional[int] = CONTEXT_CONFIG['candidates'],
+                 chunk_tokens: int = CHUNK_CONFIG['chunk_tokens']):
+        self.budget_tokens = budget_tokens
+        self.separator = separator
+        self.timestamps = timestamps
+        self.candidates = candidates or budget_tokens // chunk_tokens + 2
+
+    def pack(self, chunks: Sequence[str], ranked_ids: Sequence[int]) -> PackedContext:
+        if not isinstance(chunks, ChunkStore):
+            return self._pack_texts(chunks, ranked_ids)
+
+        text = chunks.text
+        chosen: List[Tuple[int, int]] = []
+        taken: List[int] = []
+        rendered = ""
+        tokens = dropped = 0
+        for doc_id in ranked_ids:
+            candidate = _merge(chosen + [(chunks.starts[doc_id], chunks.ends[doc_id])], text)
+            candidate_text = self._render(chunks, candidate)
+            candidate_tokens = estimate_tokens(candidate_text)
+            if candidate_tokens > self.budget_tokens:
+                if chosen:
+                    dropped += 1
+                    continue
+                # Even the best chunk alone is over budget: keep its opening part
+                start = chunks.starts[doc_id]
+                length = int(self.budget_tokens * CHARS_PER_TOKEN) - len(self._label(chunks, start))
+                candidate = [(start, start + max(length, 1))]
+                candidate_text = self._render(chunks, candidate)
+                candidate_tokens = estimate_tokens(candidate_text)
+            chosen, rendered, tokens = candidate, candidate_text, candidate_tokens
+            taken.append(doc_id)
+
+        unpacked = estimate_tokens(self.separator.join(chunks[doc_id] for doc_id in taken))
+        return PackedContext(rendered, tokens, len(chosen), len(taken), dropped, unpacked)
+
+    def _label(self, chunks: ChunkStore, start: int) -> str:
+        return _label(chunks, start) if self.timestamps else ""
+
+    def _render(self, chunks: ChunkStore, spans: List[Tuple[int, int]]) -> str:
+        return self.separator.join(self._label(chunks, start) + chunks.text[start:end] for start, end in spans)
+
+    def _pack_texts(self, chunks: Sequence[str], ranked_ids: Sequence[int]) -> PackedContext:
+        """Plain chunk strings have no offsets: drop repeats, keep transcript order"""
+        chosen: List[int] = []
+        # The top chunk's opening part, when it alone is over budget
+        clipped: Dict[int, str] = {}
+        tokens = dropped = 0
+        for doc_id in ranked_ids:
+            if doc_id in chosen or any(chunks[doc_id] == chunks[i] for i in chosen):
+                continue
+            candidate = sorted(chosen + [doc_id])
+            candidate_tokens = estimate_tokens(self.separator.join(clipped.get(i, chunks[i]) for i in candidate))
+            if candidate_tokens > self.budget_tokens:
+                if chosen:
+                    dropped += 1
+                    continue
+                clipped[doc_id] = chunks[doc_id][:max(int(self.budget_tokens * CHARS_PER_TOKEN), 1)]
+                candidate_tokens = estimate_tokens(clipped[doc_id])
+            chosen, tokens = candidate, candidate_tokens
+        rendered = self.separator.join(clipped.get(i, chunks[i]) for i in chosen)
+        unpacked = estimate_tokens(self.separator.join(chunks[i] for i in chosen))
+        return PackedContext(rendered, tokens, len(chosen), len(chosen), dropped, unpacked)
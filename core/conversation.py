@@ -0,0 +1,140 @@
+import threading
+from collections import deque
+from typing import Callable, Deque, List, Optional, Tuple
+
+from .chunker import CHARS_PER_TOKEN, estimate_tokens
+from utils.constants import MEMORY_CONFIG
+
+COMPACT_PROMPT = """
+            Update the running summary of a conversation about a YouTube video.
+            Keep what the user may refer back to: topics asked about, names, numbers,
+            timestamps and conclusions. Use at most {words} words.
+
+            Current summary:
+            {summary}
+
+            Older turns to fold in:
+            {turns}
+
+            Updated summary:
+            """
+
+
+def _clip(text: str, tokens: int) -> str:
+    """``text`` cut to about ``tokens`` tokens"""
+    limit = int(tokens * CHARS_PER_TOKEN)
+    return text if len(text) <= limit else text[:limit].rstrip() + "…"
+
+
+def _format_turns(turns: List[Tuple[str, str]]) -> str:
+    return "\n".join(f"User: {question}\nAssistant: {answer}" for question, answer in turns)
+
+
+class ConversationMemory:
+    """Chat history for prompts under a fixed token budget.
+
+    The newest turns are kept verbatim up to ``recent_tokens``. Older turns
+    are folded into a running summary of at most ``summary_tokens``, so
+    every compaction only reads the old summary plus the turns that just
+    aged out. Each stored turn is clipped to ``max_turn_tokens``. A rendered
+    history therefore never exceeds ``recent_tokens + summary_tokens``
+    however long the conversation runs. Compaction runs in the background
+    after a turn is added; the next ``render`` waits for it.
+    """
+
+    def __init__(self, summarize: Optional[Callable[[str], str]] = None,
+                 recent_tokens: int = MEMORY_CONFIG['recent_tokens'],
+                 summary_tokens: int = MEMORY_CONFIG['summary_tokens'],
+                 max_turn_tokens: int = MEMORY_CONFIG['max_turn_tokens'],
+                 background: bool = MEMORY_CONFIG['background']):
+        self.summarize = summarize
+        self.recent_tokens = recent_tokens
+        self.summary_tokens = summary_tokens
+        self.max_turn_tokens = min(max_turn_tokens, recent_tokens)
+        self.background = background
+        self.summary = ""
+        self.turns: Deque[Tuple[str, str]] = deque()
+        self.compactions = 0
+        self._aged_out: List[Tuple[str, str]] = []
+        self._compactor: Optional[threading.Thread] = None
+        self._compacting = False
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.turns) + (1 if self.summary else 0)
+
+    @property
+    def last_question(self) -> Optional[str]:
+        with self._lock:
+            return self.turns[-1][0] if self.turns else None
+
+    def add(self, question: str, answer: str) -> None:
+        """Remember a turn, aging the oldest verbatim turns out past the budget"""
+        half = self.max_turn_tokens // 2
+        question = _clip(question, half)
+        answer = _clip(answer, self.max_turn_tokens - estimate_tokens(question))
+        with self._lock:
+            self.turns.append((question, answer))
+            while self._recent_tokens() > self.recent_tokens:
+                self._aged_out.append(self.turns.popleft())
+            if not self._aged_out or self._compacting:
+                return
+            self._compacting = True
+            if self.background:
+                self._compactor = threading.Thread(target=self._compact, name='memory-compact', daemon=True)
+                self._compactor.start()
+                return
+        self._compact()
+
+    def _recent_tokens(self) -> int:
+        return sum(estimate_tokens(question) + estimate_tokens(answer) + 4 for question, answer in self.turns)
+
+    def _compact(self) -> None:
+        """Fold aged-out turns into the summary until none are left"""
+        while True:
+            with self._lock:
+                turns, self._aged_out = self._aged_out, []
+                summary = self.summary
+                if not turns:
+                    # Cleared under the lock, so add() starts a new pass for later turns
+                    self._compacting = False
+                    return
+
+            updated = None
+            if self.summarize is not None:
+                prompt = COMPACT_PROMPT.format(words=int(self.summary_tokens * 0.75),
+                                               summary=summary or "(none yet)", turns=_format_turns(turns))
+                try:
+                    updated = self.summarize(prompt).strip()
+                except Exception:
+                    updated = None
+            if not updated:
+                # Without a model, keep the questions themselves, newest last
+                updated = " ".join([summary] + [f"Earlier the user asked: {question}" for question, _ in turns])
+                updated = updated.strip()[-int(self.summary_tokens * CHARS_PER_TOKEN):]
+
+            with self._lock:
+                self.summary = _clip(updated, self.summary_tokens)
+                self.compactions += 1
+
+    def render(self) -> str:
+        """The history for a prompt: the running summary, then the recent turns"""
+        compactor = self._compactor
+        if compactor is not None:
+            compactor.join()
+        with self._lock:
+            parts = []
+            if self.summary:
+                parts.append(f"Summary of the earlier conversation: {self.summary}")
+            if self.turns:
+                parts.append(_format_turns(list(self.turns)))
+            return "\n\n".join(parts)
+
+    def clear(self) -> None:
+        compactor = self._compactor
+        if compactor is not None:
+            compactor.join()
+        with self._lock:
+            self.summary = ""
+            self.turns.clear()
+            self._aged_out = []
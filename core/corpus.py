@@ -0,0 +1,174 @@
+import math
+import threading
+from array import array
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .chunker import Chunk
+from .retrieval import tokenize
+from .video_store import VideoHandle
+from utils.constants import RETRIEVAL_CONFIG
+
+
+class CorpusHit:
+    """One retrieved chunk and the video it came from"""
+    __slots__ = ('video_id', 'chunk', 'score')
+
+    def __init__(self, video_id: str, chunk: Chunk, score: float):
+        self.video_id = video_id
+        self.chunk = chunk
+        self.score = score
+
+    @property
+    def text(self) -> str:
+        return self.chunk.text
+
+    @property
+    def start_ms(self) -> Optional[int]:
+        return self.chunk.start_ms
+
+    @property
+    def label(self) -> str:
+        """``video_id @ m:ss`` when the chunk is timed, else the video id"""
+        start_ms = self.start_ms
+        if start_ms is None:
+            return self.video_id
+        minutes, seconds = divmod(start_ms // 1000, 60)
+        return f"{self.video_id} @ {minutes}:{seconds:02d}"
+
+    @property
+    def url(self) -> str:
+        start_ms = self.start_ms or 0
+        return f"https://www.youtube.com/watch?v={self.video_id}&t={start_ms // 1000}s"
+
+
+class VideoCorpus:
+    """Many videos behind one incrementally built BM25 index.
+
+    Postings store raw term frequencies, and IDF and length normalization are
+    applied at query time. Adding a video therefore only appends its own
+    chunks' postings and never rewrites the existing ones. A query costs the
+    postings of its terms plus one vectorized pass over a score array.
+    Chunk text, offsets and timestamps stay in each video's shared ChunkStore,
+    and the corpus holds a VideoHandle on every video it indexes.
+    """
+
+    def __init__(self, k1: float = RETRIEVAL_CONFIG['bm25_k1'], b: float = RETRIEVAL_CONFIG['bm25_b']):
+        self.k1 = k1
+        self.b = b
+        self._handles: List[VideoHandle] = []
+        self._video_numbers: Dict[str, int] = {}
+        # Per corpus document: owning video number, chunk index in that video, token count
+        self._doc_video = array('i')
+        self._doc_chunk = array('i')
+        self._doc_length = array('i')
+        self._total_length = 0
+        # term -> (doc ids, term frequencies)
+        self.postings: Dict[str, Tuple[array, array]] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._handles)
+
+    def __contains__(self, video_id: str) -> bool:
+        return video_id in self._video_numbers
+
+    @property
+    def video_ids(self) -> List[str]:
+        return [handle.entry.video_id for handle in self._handles]
+
+    @property
+    def chunk_count(self) -> int:
+        return len(self._doc_video)
+
+    def add(self, handle: VideoHandle) -> int:
+        """Index a video's chunks; returns how many were added (0 if already present)"""
+        entry = handle.entry
+        if entry.video_id in self._video_numbers:
+            handle.release()
+            return 0
+
+        # Tokenize outside the lock; only the appends block queries
+        counts = [Counter(tokenize(text)) for text in entry.chunks]
+
+        with self._lock:
+            if entry.video_id in self._video_numbers:
+                handle.release()
+                return 0
+            number = len(self._handles)
+            self._handles.append(handle)
+            self._video_numbers[entry.video_id] = number
+            for chunk_index, terms in enumerate(counts):
+                doc_id = len(self._doc_video)
+                length = sum(terms.values())
+                self._doc_video.append(number)
+                self._doc_chunk.append(chunk_index)
+                self._doc_length.append(length)
+                self._total_length += length
+                for term, tf in terms.items():
+                    posting = self.postings.get(term)
+                    if posting is None:
+                        posting = self.postings[term] = (array('i'), array('f'))
+                    posting[0].append(doc_id)
+                    posting[1].append(tf)
+        return len(counts)
+
+    def _scores(self, query: str) -> np.ndarray:
+        """BM25 score of every corpus document; call with the lock held"""
+        count = len(self._doc_video)
+        lengths = np.frombuffer(self._doc_length, dtype=np.int32)
+        average_length = self._total_length / count or 1.0
+        scores = np.zeros(count, dtype=np.float32)
+        for term in set(tokenize(query)):
+            posting = self.postings.get(term)
+            if posting is None:
+                continue
+            doc_ids = np.frombuffer(posting[0], dtype=np.int32)
+            tf = np.frombuffer(posting[1], dtype=np.float32)
+            idf = math.log(1 + (count - len(doc_ids) + 0.5) / (len(doc_ids) + 0.5))
+            norm = self.k1 * (1 - self.b + self.b * lengths[doc_ids] / average_length)
+            scores[doc_ids] += idf * tf * (self.k1 + 1) / (tf + norm)
+        # The buffer views die here, so add() can grow the arrays again
+        return scores
+
+    def search(self, query: str, top_k: int = 6, per_video: Optional[int] = None) -> List[CorpusHit]:
+        """Best chunks across every video, optionally at most ``per_video`` from each"""
+        with self._lock:
+            count = len(self._doc_video)
+            if not count:
+                return []
+            scores = self._scores(query)
+
+            candidates = min(count, top_k * (4 if per_video else 1))
+            best = np.argpartition(-scores, candidates - 1)[:candidates]
+            best = best[np.argsort(-scores[best])]
+
+            hits, taken = [], Counter()
+            for doc_id in best.tolist():
+                score = float(scores[doc_id])
+                if score <= 0:
+                    break
+                number = self._doc_video[doc_id]
+                if per_video and taken[number] >= per_video:
+                    continue
+                taken[number] += 1
+                entry = self._handles[number].entry
+                hits.append(CorpusHit(entry.video_id, entry.chunks.view(self._doc_chunk[doc_id]), score))
+                if len(hits) == top_k:
+                    break
+            return hits
+
+    def clear(self) -> None:
+        """Drop every video and release their store handles"""
+        with self._lock:
+            for handle in self._handles:
+                handle.release()
+            self._handles = []
+            self._video_numbers = {}
+            self._doc_video = array('i')
+            self._doc_chunk = array('i')
+            self._doc_length = array('i')
+            self._total_length = 0
+            self.postings = {}
@@ -0,0 +1,71 @@
+import math
+import random
+import threading
+import time
+from typing import List, Tuple, Union
+
+from .subtitle_parser import ParsedTranscript
+from utils.constants import FAKE_TRANSCRIPT_CONFIG
+
+VOCABULARY = (
+    "the model data people work system example video today really important question answer "
+    "training learning network because think going actually know right time thing different "
+    "problem result research company product customer design process team build start point"
+).split()
+
+
+class FakeTranscriptSource:
+    """Offline stand-in for YouTube captions, for load tests and benchmarks.
+
+    Every video id maps to its own reproducible timed transcript of about
+    ``words`` words. Fetches sleep for a lognormal latency around
+    ``latency_ms``, and ``error_rate`` of them report no captions.
+    """
+
+    def __init__(self, latency_ms: float = FAKE_TRANSCRIPT_CONFIG['latency_ms'],
+                 latency_jitter: float = FAKE_TRANSCRIPT_CONFIG['latency_jitter'],
+                 words: int = FAKE_TRANSCRIPT_CONFIG['words'],
+                 error_rate: float = FAKE_TRANSCRIPT_CONFIG['error_rate'],
+                 seed: int = FAKE_TRANSCRIPT_CONFIG['seed']):
+        self.latency_ms = latency_ms
+        self.latency_jitter = latency_jitter
+        self.words = words
+        self.error_rate = error_rate
+        self.seed = seed
+        self.fetches = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def fetch(self, video_id: str) -> Tuple[Union[ParsedTranscript, str], bool]:
+        with self._lock:
+            self.fetches += 1
+            failed = self._rng.random() < self.error_rate
+            latency = self.latency_ms * math.exp(self._rng.gauss(0.0, self.latency_jitter))
+        time.sleep(max(latency, 0.0) / 1000.0)
+        if failed:
+            return "fake source: no captions", False
+        return ParsedTranscript.from_entries(self.entries(video_id)), True
+
+    def entries(self, video_id: str) -> List[dict]:
+        """YouTubeTranscriptApi-style cues of eight words every 2.5 seconds"""
+        rng = random.Random(f"{self.seed}:{video_id}")
+        entries = []
+        for index in range(0, self.words, 8):
+            words = [rng.choice(VOCABULARY) for _ in range(min(8, self.words - index))]
+            if rng.random() < 0.5:
+                words[-1] += '.'
+            entries.append({'text': ' '.join(words), 'start': index / 8 * 2.5, 'duration': 2.5})
+        return entries
+
+
+_shared_source = None
+_shared_source_lock = threading.Lock()
+
+
+def get_fake_transcript_source() -> FakeTranscriptSource:
+    """Return the process-wide fake caption source"""
+    global _shared_source
+    with _shared_source_lock:
+        if _shared_source is None:
+            _shared_source = FakeTranscriptSource()
+        return _shared_source
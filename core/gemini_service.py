@@ -1,41 +1,137 @@
 import streamlit as st
-import google.generativeai as genai
 import yt_dlp
+import copy
 import tempfile
 import os
 import re
+import io
 import json
+import threading
 import time
-import random
-from typing import List, Tuple
+from typing import Callable, Iterator, List, Sequence, Tuple, Union
+from collections import deque
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 from youtube_transcript_api import YouTubeTranscriptApi, TranscriptsDisabled
+from .transcript_cache import get_transcript_cache
+from .rate_limiter import get_rate_limiter
+from .chunker import ChunkStore, TokenChunker, estimate_tokens
+from .answer_cache import AnswerCache, get_answer_cache
+from .summarizer import MapReduceSummarizer
+from .retrieval import BM25Index, spread_indices
+from .vector_index import DenseVectorIndex, Embedder, HashingEmbedder
+from .caption_fetcher import CaptionFetcher, select_caption_track
+from .fake_youtube import get_fake_transcript_source
+from .llm_backend import FakeBackend, GeminiBackend, LLMBackend
+from .llm_client import LLMClient
+from .tracing import Span, get_tracer
+from .video_stats import VideoStats
+from .video_store import VideoEntry, VideoHandle, get_video_store
+from .corpus import CorpusHit, VideoCorpus
+from .conversation import ConversationMemory
+from .context_packer import ContextPacker
+from .subtitle_parser import ParsedTranscript, parse_subtitle_file, parse_subtitles
+from utils.constants import CACHE_CONFIG, CHUNK_CONFIG, LLM_CONFIG, QA_CONFIG, RATE_LIMIT_CONFIG, RETRIEVAL_CONFIG, TRANSCRIPT_CONFIG
+
+TRANSCRIPT_FAILURE_MESSAGE = "All transcript methods failed. Please try a different video or check if captions are available."
+
+class VideoLoadError(Exception):
+    """A video could not be loaded; the message is shown to the user"""
+
+# Structured output for the cascade rerank: one {id, score} object per passage
+RERANK_SCHEMA = {
+    "type": "array",
+    "items": {
+        "type": "object",
+        "properties": {
+            "id": {"type": "integer"},
+            "score": {"type": "number"},
+        },
+        "required": ["id", "score"],
+    },
+}
+
+# A fetch strategy returns the parsed transcript on success, or an error message
+TranscriptResult = Tuple[Union[ParsedTranscript, str], bool]
 
 class GeminiTubeGPT:
     def __init__(self):
         self.transcript = None
+        self.parsed_transcript = None
         self.video_id = None
-        self.model = None
+        self.backend: LLMBackend = None
+        self._llm = None
+        self.model_config = {}
         self.chunks = []
+        self.search_index = None
+        self.vector_index = None
+        self.last_retrieval_report = []
+        self.video_stats = None
+        self.answer_cache = get_answer_cache()
+        self.last_batch_results = []
+        self._pending_answers = {}
+        self._precompute_thread = None
+        self.request_metrics = deque(maxlen=QA_CONFIG['metrics_history'])
+        # Prompt sizes of answered questions; flat as a conversation grows
+        self.prompt_metrics = deque(maxlen=QA_CONFIG['metrics_history'])
+        self.embedder: Embedder = HashingEmbedder(RETRIEVAL_CONFIG['embedding_dim'])
+        self.context_packer = ContextPacker()
         self.video_title = None
-        self.last_request_time = 0
+        self.transcript_cache = get_transcript_cache()
+        self.rate_limiter = get_rate_limiter()
+        self.caption_fetcher = CaptionFetcher()
+        self.last_transcript_strategy = None
+        self.tracer = get_tracer()
+        self.last_traces = {}
+        self.video_store = get_video_store()
+        self.video_handle: VideoHandle = None
+        self.corpus = VideoCorpus()
+        # None turns chat history off, e.g. for an instance shared by many API clients
+        self.memory = ConversationMemory(self._summarize_history)
         
     def setup_gemini(self, api_key: str) -> bool:
         """Setup Gemini API"""
         try:
-            genai.configure(api_key=api_key)
-            self.model = genai.GenerativeModel(
+            if LLM_CONFIG['backend'] == 'fake':
+                self.set_backend(FakeBackend())
+                return True
+            generation_config = {
+                "temperature": 0.7,
+                "max_output_tokens": 2000,
+            }
+            self.set_backend(GeminiBackend(
+                api_key,
                 model_name="gemini-2.0-flash-exp",
-                generation_config={
-                    "temperature": 0.7,
-                    "max_output_tokens": 2000,
-                }
-            )
+                generation_config=generation_config
+            ))
             return True
         except Exception as e:
             st.error(f"Error setting up Gemini: {str(e)}")
             return False
     
-    def extract_video_id(self, url: str) -> str:
+    def set_backend(self, backend: LLMBackend) -> None:
+        """Answer with any LLMBackend, e.g. a FakeBackend for offline load tests"""
+        self.backend = backend
+        self.model_config = backend.config
+    
+    @property
+    def llm(self) -> LLMClient:
+        """Retrying, concurrency-limited client around the current backend"""
+        if self._llm is None or self._llm.backend is not self.backend:
+            self._llm = LLMClient(self.backend)
+        return self._llm
+    
+    @contextmanager
+    def trace(self, name: str, **attributes) -> Iterator[Span]:
+        """Open a tracing span; a root span's trace is remembered as this session's latest ``name``"""
+        root = self.tracer.current() is None
+        with self.tracer.span(name, **attributes) as span:
+            if root:
+                self.last_traces[name] = span.trace_id
+            yield span
+    
+    @staticmethod
+    def extract_video_id(url: str) -> str:
         """Extract video ID from YouTube URL"""
         patterns = [
             r'(?:youtube\.com\/watch\?v=|youtu\.be\/|youtube\.com\/embed\/)([^&\n?#]+)',
@@ -52,29 +148,215 @@ class GeminiTubeGPT:
             
         return None
     
-    def get_transcript(self, video_id: str) -> Tuple[str, bool]:
+    def load_video(self, video_id: str) -> Tuple[str, bool]:
+        """Attach this session to the shared store entry for a video, building it only
+        if no other session has, and point the transcript/chunk/index attributes at it"""
+        try:
+            handle = self._acquire_video(video_id)
+        except VideoLoadError as e:
+            return str(e), False
+        
+        if self.video_handle is not None:
+            self.video_handle.release()
+        self.video_handle = handle
+        entry = handle.entry
+        self.video_id = entry.video_id
+        self.parsed_transcript = entry.parsed
+        self.transcript = entry.transcript
+        self.chunks = entry.chunks
+        self.search_index = entry.search_index
+        self.vector_index = entry.vector_index
+        self.video_stats = entry.video_stats
+        self.last_transcript_strategy = entry.strategy
+        if self.memory is not None:
+            self.memory.clear()
+        return self.transcript, True
+    
+    def _acquire_video(self, video_id: str) -> VideoHandle:
+        """Handle on a video's shared store entry; raises VideoLoadError if it cannot be fetched"""
+        key = (video_id, CHUNK_CONFIG['chunk_tokens'], CHUNK_CONFIG['overlap_tokens'])
+        
+        def build() -> VideoEntry:
+            # A scratch instance does the work so this session's current video is untouched
+            span.set(shared=False)
+            loader = GeminiTubeGPT()
+            loader.video_id = video_id
+            transcript, success = loader.get_transcript(video_id)
+            if not success:
+                raise VideoLoadError(transcript)
+            chunks = loader.chunk_transcript(transcript)
+            return VideoEntry(video_id, loader.parsed_transcript, chunks, loader.search_index,
+                              loader.vector_index, loader.video_stats, loader.last_transcript_strategy)
+        
+        with self.trace('video.load', video_id=video_id, shared=True) as span:
+            return self.video_store.acquire(key, build)
+    
+    def add_to_corpus(self, video_id: str) -> Tuple[str, bool]:
+        """Add a video to this session's multi-video corpus without changing the current video"""
+        if video_id in self.corpus:
+            return f"{video_id} is already in the knowledge base", True
+        try:
+            handle = self._acquire_video(video_id)
+        except VideoLoadError as e:
+            return str(e), False
+        with self.trace('corpus.add', video_id=video_id) as span:
+            added = self.corpus.add(handle)
+            span.set(chunks=added, videos=len(self.corpus))
+        return f"Added {video_id} ({added} chunks)", True
+    
+    def answer_across_videos(self, question: str, max_chunks: int = 6) -> Tuple[str, List[CorpusHit]]:
+        """Answer from the best chunks of every corpus video, citing which video each came from"""
+        if not len(self.corpus) or not self.backend:
+            return "Add videos to the knowledge base and ensure Gemini is configured.", []
+        
+        try:
+            with self.trace('corpus.answer', videos=len(self.corpus)) as span:
+                with self.trace('corpus.search', chunks=self.corpus.chunk_count):
+                    hits = self.corpus.search(question, top_k=max_chunks)
+                span.set(sources=len(hits))
+                if not hits:
+                    return "I couldn't find anything about that in the loaded videos.", []
+                
+                context = "\n\n".join(f"[{i + 1}] ({hit.label}) {hit.text}" for i, hit in enumerate(hits))
+                prompt = f"""
+            You are TubeGPT, answering a question from transcripts of several YouTube videos.
+            Answer ONLY from the numbered excerpts below and cite the excerpts you use as [1], [2], ...
+            If the excerpts are insufficient to answer the question, say you don't know.
+            
+            Excerpts (video id @ timestamp):
+            {context}
+            
+            Question: {question}
+            
+            Answer with citations:
+            """
+                return self.llm.generate_text(prompt), hits
+            
+        except Exception as e:
+            return f"Error generating answer: {str(e)}", []
+    
+    def get_transcript(self, video_id: str, language: str = 'en') -> Tuple[str, bool]:
+        """Fetch a transcript, serving repeat loads from the persistent cache"""
+        with self.trace('video.transcript', video_id=video_id) as span:
+            cached = self.transcript_cache.get_bytes(video_id, language)
+            if cached is not None:
+                self.parsed_transcript = ParsedTranscript.from_bytes(cached)
+                self.last_transcript_strategy = 'cache'
+                span.set(strategy='cache', chars=len(self.parsed_transcript.text))
+                return self.parsed_transcript.text, True
+            
+            result, success = self._fetch_transcript(video_id)
+            if not success:
+                span.set(strategy='none')
+                return result, False
+            
+            self.parsed_transcript = result
+            self.transcript_cache.put_bytes(video_id, language, result.to_bytes())
+            span.set(strategy=self.last_transcript_strategy, chars=len(result.text))
+            return result.text, True
+    
+    def _transcript_strategies(self) -> List[Tuple[str, Callable[[str], TranscriptResult]]]:
+        """Transcript fetch strategies in order of preference"""
+        if TRANSCRIPT_CONFIG['source'] == 'fake':
+            return [('fake', get_fake_transcript_source().fetch)]
+        return [
+            # Method 1: Try yt-dlp first (most reliable against blocking)
+            ('ytdlp', self._get_transcript_ytdlp),
+            # Method 2: Try original API with enhanced rate limiting
+            ('youtube_transcript_api', self._get_transcript_original_enhanced),
+            # Method 3: Try alternative yt-dlp configuration
+            ('ytdlp_alternative', self._get_transcript_ytdlp_alternative),
+        ]
+    
+    def _fetch_transcript(self, video_id: str) -> TranscriptResult:
         """Enhanced transcript fetching with multiple reliable methods"""
+        if TRANSCRIPT_CONFIG['hedged']:
+            return self._fetch_transcript_hedged(video_id)
         
-        # Method 1: Try yt-dlp first (most reliable against blocking)
-        transcript, success = self._get_transcript_ytdlp(video_id)
-        if success and transcript.strip():
-            return transcript, True
+        for name, strategy in self._transcript_strategies():
+            transcript, success = self._run_strategy(name, strategy, video_id)
+            if success and transcript.text.strip():
+                self.last_transcript_strategy = name
+                return transcript, True
         
-        # Method 2: Try original API with enhanced rate limiting
-        transcript, success = self._get_transcript_original_enhanced(video_id)
-        if success and transcript.strip():
-            return transcript, True
+        return TRANSCRIPT_FAILURE_MESSAGE, False
+    
+    def _fetch_transcript_hedged(self, video_id: str) -> TranscriptResult:
+        """Run the strategies concurrently on a stagger and keep the first non-empty transcript"""
+        strategies = self._transcript_strategies()
+        stagger = TRANSCRIPT_CONFIG['hedge_stagger_seconds']
+        timeout = TRANSCRIPT_CONFIG['strategy_timeout_seconds']
         
-        # Method 3: Try alternative yt-dlp configuration
-        transcript, success = self._get_transcript_ytdlp_alternative(video_id)
-        if success and transcript.strip():
-            return transcript, True
+        executor = ThreadPoolExecutor(max_workers=len(strategies), thread_name_prefix='transcript')
+        pending = {}  # future -> (strategy name, deadline)
+        launched = 0
+        next_launch = time.monotonic()
         
-        return "All transcript methods failed. Please try a different video or check if captions are available.", False
+        try:
+            while launched < len(strategies) or pending:
+                now = time.monotonic()
+                
+                # Launch the next strategy when its stagger slot arrives, or early
+                # once nothing else is in flight
+                while launched < len(strategies) and (now >= next_launch or not pending):
+                    name, strategy = strategies[launched]
+                    run = self.tracer.wrap(self._run_strategy)
+                    pending[executor.submit(run, name, strategy, video_id)] = (name, now + timeout)
+                    launched += 1
+                    next_launch = now + stagger
+                
+                wake_at = min(deadline for _, deadline in pending.values())
+                if launched < len(strategies):
+                    wake_at = min(wake_at, next_launch)
+                
+                done, _ = wait(list(pending), timeout=max(wake_at - now, 0), return_when=FIRST_COMPLETED)
+                
+                for future in done:
+                    name, _ = pending.pop(future)
+                    try:
+                        transcript, success = future.result()
+                    except Exception:
+                        continue
+                    if success and transcript.text.strip():
+                        self.last_transcript_strategy = name
+                        return transcript, True
+                
+                # Give up on strategies that overran their timeout; their threads
+                # finish in the background and the result is ignored
+                now = time.monotonic()
+                for future, (name, deadline) in list(pending.items()):
+                    if now >= deadline:
+                        future.cancel()
+                        del pending[future]
+            
+            return TRANSCRIPT_FAILURE_MESSAGE, False
+        finally:
+            for future in pending:
+                future.cancel()
+            executor.shutdown(wait=False)
+    
+    def _run_strategy(self, name: str, strategy: Callable[[str], TranscriptResult], video_id: str) -> TranscriptResult:
+        with self.trace('transcript.strategy', strategy=name) as span:
+            transcript, success = strategy(video_id)
+            span.set(success=success)
+            return transcript, success
     
-    def _get_transcript_ytdlp(self, video_id: str) -> Tuple[str, bool]:
+    def _throttle(self, endpoint: str) -> Tuple[bool, float]:
+        """Reserve a request slot on the shared limiter, waiting only as long as it reports"""
+        with self.trace('rate_limit.wait', endpoint=endpoint) as span:
+            granted, wait_time = self.rate_limiter.reserve(endpoint, max_wait=RATE_LIMIT_CONFIG['max_wait_seconds'])
+            if granted and wait_time > 0:
+                time.sleep(wait_time)
+            span.set(granted=granted, wait_seconds=wait_time)
+            return granted, wait_time
+    
+    def _get_transcript_ytdlp(self, video_id: str) -> TranscriptResult:
         """Primary method using yt-dlp for subtitle extraction"""
         try:
+            granted, wait_time = self._throttle('youtube_watch')
+            if not granted:
+                return f"yt-dlp rate limited, retry in {wait_time:.1f}s", False
+            
             url = f"https://www.youtube.com/watch?v={video_id}"
             
             with tempfile.TemporaryDirectory() as temp_dir:
@@ -93,18 +375,21 @@ class GeminiTubeGPT:
                 with yt_dlp.YoutubeDL(ydl_opts) as ydl:
                     try:
                         # Extract info and download subtitles
-                        info = ydl.extract_info(url, download=False)
-                        ydl.download([url])
+                        with self.trace('ytdlp.extract_info'):
+                            info = ydl.extract_info(url, download=False)
+                        with self.trace('ytdlp.download_subtitles') as span:
+                            ydl.download([url])
+                            span.set(bytes_fetched=sum(os.path.getsize(os.path.join(temp_dir, file))
+                                                       for file in os.listdir(temp_dir)))
                         
                         # Look for subtitle files
                         for file in os.listdir(temp_dir):
                             if file.endswith(('.vtt', '.srt')):
-                                file_path = os.path.join(temp_dir, file)
-                                with open(file_path, 'r', encoding='utf-8') as f:
-                                    content = f.read()
-                                    transcript = self._clean_subtitle_content(content)
-                                    if transcript.strip():
-                                        return transcript, True
+                                # Parse cue by cue instead of reading the whole file
+                                with self.trace('subtitle.parse', file=file):
+                                    transcript = parse_subtitle_file(os.path.join(temp_dir, file))
+                                if transcript.text.strip():
+                                    return transcript, True
                     except Exception as e:
                         pass
                         
@@ -113,9 +398,13 @@ class GeminiTubeGPT:
         except Exception as e:
             return f"yt-dlp error: {str(e)}", False
     
-    def _get_transcript_ytdlp_alternative(self, video_id: str) -> Tuple[str, bool]:
-        """Alternative yt-dlp configuration"""
+    def _get_transcript_ytdlp_alternative(self, video_id: str) -> TranscriptResult:
+        """Alternative yt-dlp configuration that fetches the caption track in memory"""
         try:
+            granted, wait_time = self._throttle('youtube_watch')
+            if not granted:
+                return f"Alternative yt-dlp rate limited, retry in {wait_time:.1f}s", False
+            
             url = f"https://www.youtube.com/watch?v={video_id}"
             
             ydl_opts = {
@@ -127,42 +416,36 @@ class GeminiTubeGPT:
                 'no_warnings': True,
             }
             
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                try:
-                    info = ydl.extract_info(url, download=False)
-                    
-                    # Check if subtitles are available in the info
-                    if 'subtitles' in info:
-                        for lang in ['en', 'en-US', 'en-GB']:
-                            if lang in info['subtitles']:
-                                subtitle_url = info['subtitles'][lang][0]['url']
-                                # You could fetch and parse this URL
-                                return "Subtitles available but need URL parsing", False
-                    
-                    if 'automatic_captions' in info:
-                        for lang in ['en', 'en-US', 'en-GB']:
-                            if lang in info['automatic_captions']:
-                                return "Auto captions available but need URL parsing", False
-                                
-                except Exception:
-                    pass
-                    
+            with yt_dlp.YoutubeDL(ydl_opts) as ydl, self.trace('ytdlp.extract_info'):
+                info = ydl.extract_info(url, download=False)
+            
+            # Download the best track straight into memory and parse it there
+            track = select_caption_track(info or {})
+            if track is None:
+                return "No English subtitles or auto captions available", False
+            
+            granted, wait_time = self._throttle('youtube_timedtext')
+            if not granted:
+                return f"Caption download rate limited, retry in {wait_time:.1f}s", False
+            
+            with self.trace('captions.download', ext=track.get('ext')) as span:
+                transcript, nbytes = self.caption_fetcher.fetch_track(track)
+                span.set(bytes_fetched=nbytes)
+            if transcript.text.strip():
+                return transcript, True
+            
             return "Alternative yt-dlp method failed", False
             
         except Exception as e:
             return f"Alternative yt-dlp error: {str(e)}", False
     
-    def _get_transcript_original_enhanced(self, video_id: str) -> Tuple[str, bool]:
+    def _get_transcript_original_enhanced(self, video_id: str) -> TranscriptResult:
         """Enhanced original method with better rate limiting"""
         try:
-            # Enhanced rate limiting
-            current_time = time.time()
-            time_since_last = current_time - self.last_request_time
-            if time_since_last < 5:  # Increased to 5 seconds
-                wait_time = 5 + random.uniform(2, 5)  # 7-10 second delay
-                time.sleep(wait_time)
-            
-            self.last_request_time = time.time()
+            # Shared rate limiting across sessions and strategies
+            granted, wait_time = self._throttle('youtube_transcript_api')
+            if not granted:
+                return f"YouTube API rate limited, retry in {wait_time:.1f}s", False
             
             # Try multiple language configurations
             language_attempts = [
@@ -175,8 +458,8 @@ class GeminiTubeGPT:
             for languages in language_attempts:
                 try:
                     transcript_list = YouTubeTranscriptApi.get_transcript(video_id, languages=languages)
-                    transcript = " ".join(chunk["text"] for chunk in transcript_list)
-                    if transcript.strip():
+                    transcript = ParsedTranscript.from_entries(transcript_list)
+                    if transcript.text.strip():
                         return transcript, True
                 except TranscriptsDisabled:
                     continue
@@ -188,8 +471,7 @@ class GeminiTubeGPT:
             # Final attempt without language specification
             try:
                 transcript_list = YouTubeTranscriptApi.get_transcript(video_id)
-                transcript = " ".join(chunk["text"] for chunk in transcript_list)
-                return transcript, True
+                return ParsedTranscript.from_entries(transcript_list), True
             except Exception as e:
                 error_msg = str(e)
                 if "blocked" in error_msg.lower() or "ip" in error_msg.lower():
@@ -201,52 +483,167 @@ class GeminiTubeGPT:
     
     def _clean_subtitle_content(self, content: str) -> str:
         """Clean VTT/SRT subtitle content to plain text"""
-        lines = content.split('\n')
-        text_lines = []
+        return parse_subtitles(io.StringIO(content)).text
+    
+    def chunk_transcript(self, transcript: str, chunk_tokens: int = CHUNK_CONFIG['chunk_tokens'],
+                         overlap_tokens: int = CHUNK_CONFIG['overlap_tokens']) -> ChunkStore:
+        """Split transcript into token-budgeted chunks at sentence or cue boundaries"""
+        timing = None
+        if self.parsed_transcript is not None and self.parsed_transcript.text == transcript:
+            # Share the parsed transcript's string so chunks and cues index one buffer
+            transcript = self.parsed_transcript.text
+            timing = self.parsed_transcript
         
-        for line in lines:
-            line = line.strip()
-            # Skip VTT headers, timestamps, and sequence numbers
-            if (line and 
-                not line.startswith('WEBVTT') and
-                not line.startswith('NOTE') and
-                not '-->' in line and
-                not line.isdigit() and
-                not line.startswith('<') and
-                not line.endswith('>') and
-                line != ''):
-                text_lines.append(line)
+        with self.trace('transcript.chunk', chars=len(transcript)) as span:
+            chunks = TokenChunker(chunk_tokens, overlap_tokens).chunk_store(transcript, timing)
+            span.set(chunks=len(chunks))
         
-        return ' '.join(text_lines)
+        # Index once per video so questions never rescan the transcript
+        self.search_index = self._build_search_index(chunks)
+        self.vector_index = self._open_vector_index(chunks) if RETRIEVAL_CONFIG['mode'] == 'dense' else None
+        
+        # Analytics are computed here once, never on a rerender
+        with self.trace('video.stats'):
+            self.video_stats = VideoStats.compute(transcript, chunks, timing)
+        return chunks
+    
+    def _build_search_index(self, chunks: Sequence[str]) -> BM25Index:
+        with self.trace('index.bm25_build', chunks=len(chunks)):
+            return BM25Index(chunks, k1=RETRIEVAL_CONFIG['bm25_k1'], b=RETRIEVAL_CONFIG['bm25_b'])
     
-    def chunk_transcript(self, transcript: str, chunk_size: int = 1000, overlap: int = 200) -> List[str]:
-        """Split transcript into chunks for better processing"""
-        chunks = []
-        start = 0
+    def _open_vector_index(self, chunks: Sequence[str]) -> DenseVectorIndex:
+        """Memory-map this video's chunk vectors from disk, embedding them on first use"""
+        dtype = RETRIEVAL_CONFIG['vector_dtype']
+        with self.trace('index.dense_open', chunks=len(chunks), dtype=dtype):
+            if not self.video_id:
+                return DenseVectorIndex.build(chunks, self.embedder, dtype)
+            directory = os.path.join(CACHE_CONFIG['dir'], 'vectors', self.video_id)
+            return DenseVectorIndex.open_or_build(directory, chunks, self.embedder, dtype)
+    
+    def find_relevant_chunks(self, question: str, chunks: Sequence[str], max_chunks: int = 4,
+                             mode: str = None) -> List[str]:
+        """Find the chunks most relevant to a question.
         
-        while start < len(transcript):
-            end = start + chunk_size
-            
-            if end < len(transcript):
-                # Try to break at sentence boundaries
-                for i in range(end, max(start + chunk_size - 200, start), -1):
-                    if transcript[i] in '.!?':
-                        end = i + 1
-                        break
+        Modes: 'bm25'/'dense' rank locally, 'cascade' reranks a local shortlist
+        with one Gemini call, 'llm' is the legacy Gemini scoring prompt.
+        Per-stage timings are left in ``self.last_retrieval_report``.
+        """
+        return [chunks[doc_id] for doc_id in self.find_relevant_chunk_ids(question, chunks, max_chunks, mode)]
+    
+    def find_relevant_chunk_ids(self, question: str, chunks: Sequence[str], max_chunks: int = 4,
+                                mode: str = None) -> List[int]:
+        """Indices of the most relevant chunks, most relevant first"""
+        if not chunks:
+            return []
+        
+        mode = mode or RETRIEVAL_CONFIG['mode']
+        with self.trace('retrieval', mode=mode, chunks=len(chunks)):
+            if mode == 'llm':
+                return self._find_relevant_chunks_llm(question, chunks, max_chunks)
+            if mode == 'cascade':
+                return self._find_relevant_chunks_cascade(question, chunks, max_chunks)
+            
+            started = time.perf_counter()
+            selected = self._rank_locally(question, chunks, max_chunks, mode)
+            self.last_retrieval_report = [
+                self._stage_report(mode, started, candidates=len(chunks), selected=len(selected))
+            ]
+            return selected
+    
+    def _rank_locally(self, question: str, chunks: Sequence[str], k: int, scorer: str) -> List[int]:
+        """Top-k chunk ids from the BM25 or dense index, padded to k"""
+        if scorer == 'dense':
+            if self.vector_index is None or len(self.vector_index) != len(chunks):
+                self.vector_index = self._open_vector_index(chunks)
+            hits = self.vector_index.search(question, k)
+        else:
+            if self.search_index is None or self.search_index.documents is not chunks:
+                self.search_index = self._build_search_index(chunks)
+            hits = self.search_index.search(question, k)
+        
+        selected = [doc_id for doc_id, _ in hits]
+        
+        # Questions with no lexical match ("Summarize this video") get chunks
+        # spread across the whole transcript instead of nothing
+        if len(selected) < k:
+            for doc_id in spread_indices(len(chunks), k):
+                if doc_id not in selected:
+                    selected.append(doc_id)
+                if len(selected) == k:
+                    break
+        
+        return selected
+    
+    @staticmethod
+    def _stage_report(stage: str, started: float, api_calls: int = 0, input_tokens: int = 0,
+                      output_tokens: int = 0, **extra) -> dict:
+        report = {
+            'stage': stage,
+            'seconds': time.perf_counter() - started,
+            'api_calls': api_calls,
+            'input_tokens': input_tokens,
+            'output_tokens': output_tokens,
+        }
+        report.update(extra)
+        return report
+    
+    def _find_relevant_chunks_cascade(self, question: str, chunks: Sequence[str], max_chunks: int = 4) -> List[int]:
+        """Cheap local prefilter over every chunk, then one batched Gemini rerank of the shortlist"""
+        prefilter = RETRIEVAL_CONFIG['cascade_prefilter']
+        started = time.perf_counter()
+        candidates = self._rank_locally(question, chunks, RETRIEVAL_CONFIG['cascade_candidates'], prefilter)
+        report = [self._stage_report(f"prefilter:{prefilter}", started,
+                                     candidates=len(chunks), selected=len(candidates))]
+        self.last_retrieval_report = report
+        
+        if len(candidates) <= max_chunks or not self.backend:
+            return candidates[:max_chunks]
+        
+        started = time.perf_counter()
+        passages = "\n\n".join(f"[{doc_id}] {chunks[doc_id]}" for doc_id in candidates)
+        rerank_prompt = f"""
+            Question: "{question}"
             
-            chunk = transcript[start:end].strip()
-            if chunk:
-                chunks.append(chunk)
+            Score how well each numbered transcript passage below helps answer the question,
+            from 0 (irrelevant) to 10 (directly answers it). Score every passage exactly once,
+            using the number in square brackets as its id.
             
-            start = end - overlap
+            Passages:
+            {passages}
+            """
+        
+        try:
+            completion = self.llm.generate(
+                rerank_prompt,
+                generation_config={
+                    "temperature": 0.0,
+                    "response_mime_type": "application/json",
+                    "response_schema": RERANK_SCHEMA,
+                }
+            )
+            scores = {}
+            for item in json.loads(completion.text):
+                doc_id = item.get('id')
+                if doc_id in candidates and doc_id not in scores:
+                    scores[doc_id] = float(item.get('score', 0))
+            
+            # Unscored candidates keep their prefilter order behind the scored ones
+            reranked = sorted(candidates, key=lambda doc_id: -scores.get(doc_id, -1))
+            report.append(self._stage_report(
+                'rerank:gemini', started, api_calls=1,
+                input_tokens=completion.input_tokens,
+                output_tokens=completion.output_tokens,
+                candidates=len(candidates), scored=len(scores),
+            ))
+            return reranked[:max_chunks]
             
-        return chunks
+        except Exception as e:
+            report.append(self._stage_report('rerank:gemini', started, api_calls=1,
+                                             candidates=len(candidates), error=str(e)))
+            return candidates[:max_chunks]
     
-    def find_relevant_chunks(self, question: str, chunks: List[str], max_chunks: int = 4) -> List[str]:
+    def _find_relevant_chunks_llm(self, question: str, chunks: Sequence[str], max_chunks: int = 4) -> List[int]:
         """Find most relevant chunks using Gemini for semantic similarity"""
-        if not chunks:
-            return []
-        
         try:
             # Limit chunks to prevent token overflow
             chunks_to_analyze = chunks[:6]  # Further reduced for reliability
@@ -261,7 +658,7 @@ class GeminiTubeGPT:
             {json.dumps(chunks_to_analyze)}
             """
             
-            response = self.model.generate_content(relevance_prompt)
+            response = self.llm.generate(relevance_prompt)
             
             try:
                 # Enhanced response cleaning
@@ -280,9 +677,9 @@ class GeminiTubeGPT:
                 # Try to parse JSON
                 scores = json.loads(response_text)
                 if isinstance(scores, list) and len(scores) == len(chunks_to_analyze):
-                    chunk_scores = list(zip(chunks_to_analyze, scores))
+                    chunk_scores = list(zip(range(len(chunks_to_analyze)), scores))
                     chunk_scores.sort(key=lambda x: x[1], reverse=True)  # Fixed sorting key
-                    return [chunk for chunk, score in chunk_scores[:max_chunks]]
+                    return [doc_id for doc_id, score in chunk_scores[:max_chunks]]
                     
             except json.JSONDecodeError:
                 # Enhanced fallback: try to extract numbers from response
@@ -291,34 +688,166 @@ class GeminiTubeGPT:
                     numbers = re.findall(r'\d+', response_text)
                     if len(numbers) == len(chunks_to_analyze):
                         scores = [int(n) for n in numbers]
-                        chunk_scores = list(zip(chunks_to_analyze, scores))
+                        chunk_scores = list(zip(range(len(chunks_to_analyze)), scores))
                         chunk_scores.sort(key=lambda x: x[1], reverse=True)
-                        return [chunk for chunk, score in chunk_scores[:max_chunks]]
+                        return [doc_id for doc_id, score in chunk_scores[:max_chunks]]
                 except:
                     pass
             
             # Final fallback: return first chunks
-            return chunks_to_analyze[:max_chunks]
+            return list(range(min(max_chunks, len(chunks_to_analyze))))
             
         except Exception as e:
             st.error(f"Error finding relevant chunks: {str(e)}")
-            return chunks[:max_chunks]
+            return list(range(min(max_chunks, len(chunks))))
     
-    def answer_question(self, question: str) -> str:
-        """Answer question using Gemini with relevant transcript chunks"""
-        if not self.transcript or not self.model:
+    def answer_question(self, question: str, use_history: bool = True) -> str:
+        """Answer question using Gemini with relevant transcript chunks and, when
+        ``use_history`` is on, the conversation so far"""
+        if not self.transcript or not self.backend:
             return "Please load a video first and ensure Gemini is configured."
         
         try:
-            relevant_chunks = self.find_relevant_chunks(question, self.chunks)
-            context = "\n\n".join(relevant_chunks)
+            with self.trace('question.answer') as span:
+                history = self._history(use_history)
+                context = self._retrieve_context(self._retrieval_query(question, history))
+                cache_context = self._cache_context(context, history)
+                
+                # A background batch may already be generating this exact answer
+                key = AnswerCache.make_key(self.video_id, question, self.model_config, cache_context)
+                pending = self._pending_answers.get(key)
+                if pending is not None:
+                    span.set(source='precompute')
+                    answer = pending.result()
+                else:
+                    # Same video, question, model and context: reuse the answer without a model call
+                    answer = self.answer_cache.get(self.video_id, question, self.model_config, cache_context)
+                    span.set(source='cache' if answer is not None else 'model')
+                    if answer is None:
+                        answer = self._generate_answer(question, context, history)
+            
+            self._remember(question, answer)
+            return answer
+            
+        except Exception as e:
+            return f"Error generating answer: {str(e)}"
+    
+    def answer_question_stream(self, question: str, use_history: bool = True) -> Iterator[str]:
+        """Answer a question, yielding text deltas as Gemini produces them"""
+        if not self.transcript or not self.backend:
+            yield "Please load a video first and ensure Gemini is configured."
+            return
+        
+        started = time.perf_counter()
+        try:
+            with self.trace('question.answer', streamed=True) as span:
+                history = self._history(use_history)
+                context = self._retrieve_context(self._retrieval_query(question, history))
+                cache_context = self._cache_context(context, history)
+                
+                key = AnswerCache.make_key(self.video_id, question, self.model_config, cache_context)
+                pending = self._pending_answers.get(key)
+                cached = pending.result() if pending is not None else \
+                    self.answer_cache.get(self.video_id, question, self.model_config, cache_context)
+                if cached is not None:
+                    span.set(source='cache')
+                    yield from self._timed_stream('answer', started, iter([cached]), cached=True)
+                    self._remember(question, cached)
+                    return
+                
+                span.set(source='model')
+                parts = []
+                prompt = self._answer_prompt(question, context, history)
+                self._record_prompt(prompt, context, history)
+                for delta in self._timed_stream('answer', started, self._stream_text(prompt)):
+                    parts.append(delta)
+                    yield delta
+                answer = ''.join(parts)
+                self.answer_cache.put(self.video_id, question, self.model_config, cache_context, answer)
+                self._remember(question, answer)
             
-            prompt = f"""
+        except Exception as e:
+            yield f"Error generating answer: {str(e)}"
+    
+    def _stream_text(self, prompt: str) -> Iterator[str]:
+        """Text deltas of a streamed Gemini response"""
+        return self.llm.stream_text(prompt)
+    
+    def _timed_stream(self, kind: str, started: float, deltas: Iterator[str], cached: bool = False) -> Iterator[str]:
+        """Pass deltas through, recording time-to-first-token and total time"""
+        first_token = None
+        chars = 0
+        for delta in deltas:
+            if first_token is None:
+                first_token = time.perf_counter() - started
+            chars += len(delta)
+            yield delta
+        self.request_metrics.append({
+            'kind': kind,
+            'cached': cached,
+            'ttft_seconds': first_token,
+            'total_seconds': time.perf_counter() - started,
+            'chars': chars,
+        })
+    
+    def _retrieve_context(self, question: str) -> str:
+        """Relevant transcript for a prompt: overlaps merged, in transcript order, within the token budget"""
+        doc_ids = self.find_relevant_chunk_ids(question, self.chunks, max_chunks=self.context_packer.candidates)
+        packed = self.context_packer.pack(self.chunks, doc_ids)
+        span = self.tracer.current()
+        if span is not None:
+            span.set(context_spans=packed.spans, context_chunks=packed.chunks,
+                     context_saved_tokens=packed.unpacked_tokens - packed.tokens)
+        return packed.text
+    
+    def _history(self, use_history: bool) -> str:
+        """The bounded conversation memory for a prompt, or "" when history is off"""
+        if not use_history or self.memory is None:
+            return ""
+        return self.memory.render()
+    
+    def _retrieval_query(self, question: str, history: str) -> str:
+        """Search with the previous question too, so follow-ups like "what came after that?" find its topic"""
+        previous = self.memory.last_question if history else None
+        return f"{previous} {question}" if previous else question
+    
+    @staticmethod
+    def _cache_context(context: str, history: str) -> str:
+        # The same question can deserve a different answer later in a conversation
+        return f"{context}\n\n{history}" if history else context
+    
+    def _remember(self, question: str, answer: str) -> None:
+        if self.memory is not None:
+            self.memory.add(question, answer)
+    
+    def _summarize_history(self, prompt: str) -> str:
+        """Fold old chat turns into the running conversation summary"""
+        with self.trace('memory.compact'):
+            return self.llm.generate_text(prompt)
+    
+    def _record_prompt(self, prompt: str, context: str, history: str) -> None:
+        """Note the prompt's size on the current span and in ``prompt_metrics``"""
+        sizes = {
+            'prompt_tokens': estimate_tokens(prompt),
+            'context_tokens': estimate_tokens(context),
+            'history_tokens': estimate_tokens(history),
+        }
+        span = self.tracer.current()
+        if span is not None:
+            span.set(**sizes)
+        self.prompt_metrics.append(sizes)
+    
+    def _answer_prompt(self, question: str, context: str, history: str = "") -> str:
+        conversation = f"""
+            Conversation so far (use it to resolve follow-up questions; the transcript remains the only source of facts):
+            {history}
+            """ if history else ""
+        return f"""
             You are TubeGPT, a helpful AI assistant that answers questions about YouTube videos.
             Answer ONLY from the provided transcript context below.
             If the context is insufficient to answer the question, say you don't know.
             Be conversational, helpful, and provide specific details from the transcript when possible.
-            
+            {conversation}
             Context from video transcript:
             {context}
             
@@ -326,38 +855,137 @@ class GeminiTubeGPT:
             
             Please provide a clear, helpful answer based only on the information in the transcript:
             """
+    
+    def _generate_answer(self, question: str, context: str, history: str = "") -> str:
+        prompt = self._answer_prompt(question, context, history)
+        self._record_prompt(prompt, context, history)
+        answer = self.llm.generate_text(prompt)
+        self.answer_cache.put(self.video_id, question, self.model_config, self._cache_context(context, history), answer)
+        return answer
+    
+    def answer_many(self, questions: List[str], max_workers: int = QA_CONFIG['max_concurrency']) -> List[Tuple[str, str]]:
+        """Answer several questions: retrieval runs once per distinct question on this
+        thread, cache misses are generated concurrently under ``max_workers``"""
+        answers = self._pinned()._answer_batch(questions, max_workers)
+        self.last_batch_results = answers
+        return answers
+    
+    def _pinned(self) -> 'GeminiTubeGPT':
+        """A shallow copy fixed to the current video, for work that may outlive it on another thread.
+        Caches, the LLM client and pending answers stay shared, but ``load_video`` on this
+        instance no longer changes the copy's video id, chunks or indexes"""
+        return copy.copy(self)
+    
+    def _answer_batch(self, questions: List[str], max_workers: int) -> List[Tuple[str, str]]:
+        if not self.transcript or not self.backend:
+            return [(question, "Please load a video first and ensure Gemini is configured.") for question in questions]
+        
+        with self.trace('question.batch', questions=len(questions)) as span:
+            results = {}
+            jobs = {}
+            keys = []
+            for question in questions:
+                try:
+                    context = self._retrieve_context(question)
+                except Exception as e:
+                    key = ('error', question)
+                    results[key] = f"Error generating answer: {str(e)}"
+                    keys.append(key)
+                    continue
             
-            response = self.model.generate_content(prompt)
-            return response.text
-            
-        except Exception as e:
-            return f"Error generating answer: {str(e)}"
+                # Reworded duplicates and repeats collapse onto one cache key
+                key = AnswerCache.make_key(self.video_id, question, self.model_config, context)
+                keys.append(key)
+                if key in results or key in jobs:
+                    continue
+                cached = self.answer_cache.get(self.video_id, question, self.model_config, context)
+                if cached is not None:
+                    results[key] = cached
+                else:
+                    jobs[key] = (question, context)
+            
+            with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='answer') as pool:
+                generate = self.tracer.wrap(self._generate_answer)
+                futures = {key: pool.submit(generate, question, context)
+                           for key, (question, context) in jobs.items()}
+                self._pending_answers.update(futures)
+                try:
+                    for key, future in futures.items():
+                        try:
+                            results[key] = future.result()
+                        except Exception as e:
+                            results[key] = f"Error generating answer: {str(e)}"
+                finally:
+                    for key in futures:
+                        self._pending_answers.pop(key, None)
+            
+            span.set(generated=len(jobs))
+            return [(question, results[key]) for question, key in zip(questions, keys)]
+    
+    def start_precompute(self, questions: List[str]) -> bool:
+        """Answer questions on a background thread so later asks are cache hits"""
+        if self.precompute_running():
+            return False
+        self.last_batch_results = []
+        # Pinned here, on the caller's thread, before a later load_video can swap the video
+        batch = self._pinned()
+        
+        def run() -> None:
+            answers = batch._answer_batch(list(questions), QA_CONFIG['max_concurrency'])
+            # The report is for the video on screen; answers for an earlier one stay in the cache only
+            if self.video_id == batch.video_id:
+                self.last_batch_results = answers
+        
+        self._precompute_thread = threading.Thread(target=run, name='tubegpt-precompute', daemon=True)
+        self._precompute_thread.start()
+        return True
+    
+    def precompute_running(self) -> bool:
+        return self._precompute_thread is not None and self._precompute_thread.is_alive()
+    
+    def export_batch_report(self, results: List[Tuple[str, str]] = None, fmt: str = 'markdown') -> str:
+        """Render batch Q&A results as a Markdown or JSON report"""
+        results = self.last_batch_results if results is None else results
+        generated_at = time.strftime('%Y-%m-%d %H:%M:%S')
+        
+        if fmt == 'json':
+            return json.dumps({
+                'video_id': self.video_id,
+                'generated_at': generated_at,
+                'results': [{'question': question, 'answer': answer} for question, answer in results],
+            }, indent=2, ensure_ascii=False)
+        
+        lines = ["# TubeGPT Q&A Report", "", f"**Video ID:** {self.video_id}  ", f"**Generated:** {generated_at}", ""]
+        for question, answer in results:
+            lines += [f"## {question}", "", answer.strip(), ""]
+        return "\n".join(lines)
     
     def generate_summary(self) -> str:
-        """Generate a comprehensive summary of the video"""
-        if not self.transcript or not self.model:
+        """Generate a comprehensive summary covering the whole video"""
+        if not self.transcript or not self.backend:
             return "Please load a video first."
         
         try:
-            # Use more chunks for better summary
-            summary_context = "\n\n".join(self.chunks[:8])
-            
-            prompt = f"""
-            Create a comprehensive summary of this YouTube video based on the transcript below.
-            Include:
-            1. Main topic/theme
-            2. Key points discussed
-            3. Important people or entities mentioned
-            4. Any conclusions or takeaways
-            
-            Transcript:
-            {summary_context}
-            
-            Summary:
-            """
-            
-            response = self.model.generate_content(prompt)
-            return response.text
+            with self.trace('summary.generate', chunks=len(self.chunks)):
+                # Map-reduce over every chunk instead of only the opening minutes
+                summarizer = MapReduceSummarizer(self.tracer.wrap(self.llm.generate_text))
+                return summarizer.summarize(self.video_id, self.chunks)
             
         except Exception as e:
             return f"Error generating summary: {str(e)}"
+    
+    def generate_summary_stream(self) -> Iterator[str]:
+        """Generate the whole-video summary, streaming the final pass as text deltas"""
+        if not self.transcript or not self.backend:
+            yield "Please load a video first."
+            return
+        
+        started = time.perf_counter()
+        try:
+            with self.trace('summary.generate', chunks=len(self.chunks), streamed=True):
+                summarizer = MapReduceSummarizer(self.tracer.wrap(self.llm.generate_text))
+                deltas = summarizer.summarize_stream(self.video_id, self.chunks, self._stream_text)
+                yield from self._timed_stream('summary', started, deltas)
+            
+        except Exception as e:
+            yield f"Error generating summary: {str(e)}"
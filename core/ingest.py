@@ -0,0 +1,335 @@
+import multiprocessing
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from contextlib import ExitStack
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import yt_dlp
+
+from .chunker import TokenChunker
+from .gemini_service import GeminiTubeGPT
+from .subtitle_parser import ParsedTranscript
+from .tracing import get_tracer
+from .transcript_cache import get_transcript_cache
+from utils.constants import CACHE_CONFIG, CHUNK_CONFIG, INGEST_CONFIG, RETRIEVAL_CONFIG
+
+# URL fragments that name a playlist or a channel rather than one video
+LISTING_MARKERS = ('list=', '/playlist', '/channel/', '/c/', '/user/', '/@')
+
+
+class IngestManifest:
+    """Per-video progress of bulk ingestion, kept in SQLite beside the transcript cache.
+
+    A video is marked ``done`` once its transcript is in the cache and any
+    dense vectors are on disk, so an interrupted run resumes by skipping
+    done videos. Failed videos keep their error and are retried only when
+    asked.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS ingested (
+                video_id TEXT PRIMARY KEY,
+                status TEXT NOT NULL,
+                strategy TEXT,
+                chunks INTEGER NOT NULL,
+                size INTEGER NOT NULL,
+                seconds REAL NOT NULL,
+                error TEXT,
+                updated REAL NOT NULL
+            )
+            """
+        )
+
+    def statuses(self, video_ids: Iterable[str]) -> Dict[str, str]:
+        """Recorded status of each given video that has one"""
+        video_ids = list(video_ids)
+        result = {}
+        with self._lock:
+            # Stay under SQLite's bound-parameter limit
+            for start in range(0, len(video_ids), 500):
+                batch = video_ids[start:start + 500]
+                result.update(self._conn.execute(
+                    f"SELECT video_id, status FROM ingested WHERE video_id IN ({','.join('?' * len(batch))})",
+                    batch
+                ).fetchall())
+        return result
+
+    def record(self, video_id: str, status: str, strategy: Optional[str] = None, chunks: int = 0,
+               size: int = 0, seconds: float = 0.0, error: Optional[str] = None) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO ingested (video_id, status, strategy, chunks, size, seconds, error, updated) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (video_id, status, strategy, chunks, size, seconds, error, time.time())
+            )
+
+    def video_ids(self, status: str = 'done', limit: Optional[int] = None) -> List[str]:
+        """Videos with ``status``, most recently ingested first"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT video_id FROM ingested WHERE status = ? ORDER BY updated DESC LIMIT ?",
+                (status, -1 if limit is None else limit)
+            ).fetchall()
+        return [video_id for video_id, in rows]
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT status, COUNT(*), COALESCE(SUM(size), 0) FROM ingested GROUP BY status"
+            ).fetchall()
+        stats = {'done': 0, 'failed': 0, 'bytes': 0}
+        for status, count, size in rows:
+            stats[status] = count
+            stats['bytes'] += size
+        return stats
+
+
+_shared_manifest = None
+_shared_manifest_lock = threading.Lock()
+
+
+def get_ingest_manifest() -> IngestManifest:
+    """Return the process-wide ingestion manifest"""
+    global _shared_manifest
+    with _shared_manifest_lock:
+        if _shared_manifest is None:
+            _shared_manifest = IngestManifest(os.path.join(CACHE_CONFIG['dir'], 'ingest.sqlite3'))
+        return _shared_manifest
+
+
+def list_videos(url: str) -> List[str]:
+    """Video ids of a playlist or channel, without fetching each video's page"""
+    ydl_opts = {
+        'extract_flat': 'in_playlist',
+        'skip_download': True,
+        'quiet': True,
+        'no_warnings': True,
+    }
+    with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+        info = ydl.extract_info(url, download=False)
+
+    video_ids = []
+    pending = list(info.get('entries') or [])
+    while pending:
+        entry = pending.pop(0)
+        if not entry:
+            continue
+        if entry.get('entries'):
+            pending.extend(entry['entries'])
+        elif entry.get('_type') == 'playlist' or entry.get('ie_key') == 'YoutubeTab':
+            # Channels list their tabs (videos, shorts, ...) as nested playlists
+            pending.extend(list_videos(entry['url']))
+        elif entry.get('id'):
+            video_ids.append(entry['id'])
+    return video_ids
+
+
+def expand_sources(sources: Iterable[str], extract_video_id: Callable[[str], Optional[str]],
+                   on_error: Callable[[str], None] = print) -> List[str]:
+    """Unique video ids from video URLs/ids, playlist or channel URLs and files listing either"""
+    video_ids = []
+    pending = list(sources)
+    while pending:
+        source = pending.pop(0).strip()
+        if not source or source.startswith('#'):
+            continue
+        if os.path.isfile(source):
+            with open(source, 'r', encoding='utf-8') as f:
+                pending[:0] = f.read().splitlines()
+        elif any(marker in source for marker in LISTING_MARKERS) and 'watch?v=' not in source:
+            try:
+                video_ids.extend(list_videos(source))
+            except Exception as e:
+                on_error(f"Could not list {source}: {e}")
+        else:
+            video_id = extract_video_id(source)
+            if video_id:
+                video_ids.append(video_id)
+            else:
+                on_error(f"Invalid YouTube URL or Video ID: {source}")
+    return list(dict.fromkeys(video_ids))
+
+
+def writes_vectors() -> bool:
+    """Whether the configured retrieval reads per-video vectors that ingestion can precompute"""
+    mode = RETRIEVAL_CONFIG['mode']
+    return mode == 'dense' or (mode == 'cascade' and RETRIEVAL_CONFIG['cascade_prefilter'] == 'dense')
+
+
+def index_transcript(video_id: str, payload: bytes) -> int:
+    """Chunk one fetched transcript as the app does and write its dense vectors; runs in a worker process"""
+    parsed = ParsedTranscript.from_bytes(payload)
+    chunks = TokenChunker(CHUNK_CONFIG['chunk_tokens'], CHUNK_CONFIG['overlap_tokens']).chunk_store(parsed.text, parsed)
+    loader = GeminiTubeGPT()
+    loader.video_id = video_id
+    loader._open_vector_index(chunks)
+    return len(chunks)
+
+
+class BulkIngester:
+    """Headless ingestion of many videos into the on-disk stores the app reads.
+
+    Transcripts are fetched on a thread pool through the same strategies,
+    rate limiter and transcript cache as the app. When retrieval uses dense
+    vectors, they are then chunked and embedded on a process pool that
+    writes the vectors to disk. BM25 indexes and analytics are cheap to
+    rebuild and are not persisted, so in the default BM25 setup the pool is
+    skipped and a video is done once its transcript is cached. At most
+    ``fetch_concurrency`` fetches and twice ``index_workers`` transcripts are
+    in flight, so memory stays flat however long the list is. A video marked
+    done whose transcript has since expired or been evicted is ingested
+    again.
+    """
+
+    def __init__(self, manifest: Optional[IngestManifest] = None,
+                 fetch_concurrency: int = INGEST_CONFIG['fetch_concurrency'],
+                 index_workers: Optional[int] = INGEST_CONFIG['index_workers'],
+                 retry_failed: bool = False, log: Callable[[str], None] = print):
+        self.manifest = manifest or get_ingest_manifest()
+        self.fetch_concurrency = fetch_concurrency
+        self.index_workers = index_workers or os.cpu_count() or 1
+        self.retry_failed = retry_failed
+        self.log = log
+        self.tracer = get_tracer()
+
+    @staticmethod
+    def _fetch(video_id: str) -> Tuple[object, bool, Optional[str]]:
+        """(transcript bytes or error message, success, strategy)"""
+        loader = GeminiTubeGPT()
+        loader.video_id = video_id
+        transcript, success = loader.get_transcript(video_id)
+        if not success:
+            return transcript, False, None
+        return loader.parsed_transcript.to_bytes(), True, loader.last_transcript_strategy
+
+    def run(self, video_ids: List[str]) -> Dict:
+        """Ingest every video not already done; returns a throughput summary"""
+        statuses = self.manifest.statuses(video_ids)
+        cached = get_transcript_cache().present(
+            [video_id for video_id in video_ids if statuses.get(video_id) == 'done'])
+        skip = {'done', 'failed'} if not self.retry_failed else {'done'}
+        pending = [video_id for video_id in video_ids
+                   if statuses.get(video_id) not in skip
+                   or (statuses[video_id] == 'done' and video_id not in cached)]
+        self.log(f"{len(video_ids)} videos, {len(video_ids) - len(pending)} already ingested, "
+                 f"{len(pending)} to go")
+
+        fetched_before = sum(self.tracer.counter('bytes_fetched').values())
+        failures_before = self.tracer.counter('transcript_strategy_failures')
+        started = time.perf_counter()
+        done = failed = stored = 0
+        strategies: Dict[str, int] = {}
+
+        fetching: Dict[Future, Tuple[str, float]] = {}
+        indexing: Dict[Future, Tuple[str, float, str, int]] = {}
+        queue = iter(pending)
+        exhausted = False
+
+        def finish(video_id: str, video_started: float, strategy: str, chunks: int, size: int) -> None:
+            nonlocal done, stored
+            seconds = time.perf_counter() - video_started
+            self.manifest.record(video_id, 'done', strategy, chunks, size, seconds)
+            done += 1
+            stored += size
+            strategies[strategy] = strategies.get(strategy, 0) + 1
+            indexed = f" {chunks} chunks" if chunks else ""
+            self.log(f"✓ {video_id} {strategy}{indexed} {size / 1024:.0f} KB "
+                     f"{seconds:.1f}s [{done + failed}/{len(pending)}]")
+
+        with ExitStack() as stack:
+            fetchers = stack.enter_context(
+                ThreadPoolExecutor(self.fetch_concurrency, thread_name_prefix='ingest-fetch'))
+            indexers = None
+            if writes_vectors():
+                # Spawn rather than fork: the fetch threads may hold locks at fork time
+                indexers = stack.enter_context(ProcessPoolExecutor(
+                    self.index_workers, mp_context=multiprocessing.get_context('spawn')))
+            while True:
+                while (not exhausted and len(fetching) < self.fetch_concurrency
+                       and len(indexing) < 2 * self.index_workers):
+                    video_id = next(queue, None)
+                    if video_id is None:
+                        exhausted = True
+                        break
+                    fetching[fetchers.submit(self._fetch, video_id)] = (video_id, time.perf_counter())
+
+                if not fetching and not indexing:
+                    break
+                finished, _ = wait(list(fetching) + list(indexing), return_when=FIRST_COMPLETED)
+
+                for future in finished:
+                    if future in fetching:
+                        video_id, video_started = fetching.pop(future)
+                        try:
+                            result, success, strategy = future.result()
+                        except Exception as e:
+                            result, success, strategy = f"{type(e).__name__}: {e}", False, None
+                        if success and indexers is None:
+                            finish(video_id, video_started, strategy, 0, len(result))
+                            continue
+                        if success:
+                            indexing[indexers.submit(index_transcript, video_id, result)] = (
+                                video_id, video_started, strategy, len(result))
+                            continue
+                        seconds = time.perf_counter() - video_started
+                        self.manifest.record(video_id, 'failed', seconds=seconds, error=result)
+                        failed += 1
+                        self.log(f"✗ {video_id} {result}")
+                        continue
+
+                    video_id, video_started, strategy, size = indexing.pop(future)
+                    try:
+                        chunks = future.result()
+                    except Exception as e:
+                        self.manifest.record(video_id, 'failed', strategy, size=size,
+                                             seconds=time.perf_counter() - video_started,
+                                             error=f"indexing failed: {type(e).__name__}: {e}")
+                        failed += 1
+                        self.log(f"✗ {video_id} indexing failed: {e}")
+                        continue
+                    finish(video_id, video_started, strategy, chunks, size)
+
+        elapsed = time.perf_counter() - started
+        failures = self.tracer.counter('transcript_strategy_failures')
+        return {
+            'videos': len(video_ids),
+            'skipped': len(video_ids) - len(pending),
+            'done': done,
+            'failed': failed,
+            'seconds': elapsed,
+            'videos_per_minute': (done / elapsed * 60) if elapsed else 0.0,
+            'bytes_fetched': int(sum(self.tracer.counter('bytes_fetched').values()) - fetched_before),
+            'bytes_stored': stored,
+            'strategies': strategies,
+            'strategy_failures': {name: int(count - failures_before.get(name, 0))
+                                  for name, count in failures.items() if count > failures_before.get(name, 0)},
+        }
+
+
+def format_summary(summary: Dict) -> str:
+    lines = [
+        f"Ingested {summary['done']} of {summary['videos'] - summary['skipped']} videos "
+        f"in {summary['seconds'] / 60:.1f} min ({summary['videos_per_minute']:.1f} videos/min), "
+        f"{summary['skipped']} skipped, {summary['failed']} failed",
+        f"Fetched {summary['bytes_fetched'] / 1e6:.1f} MB, stored {summary['bytes_stored'] / 1e6:.1f} MB of transcripts",
+    ]
+    if summary['strategies']:
+        lines.append("Served by: " + ", ".join(f"{name} {count}" for name, count in sorted(summary['strategies'].items())))
+    if summary['strategy_failures']:
+        lines.append("Strategy failures: " + ", ".join(
+            f"{name} {count}" for name, count in sorted(summary['strategy_failures'].items())))
+    return "\n".join(lines)
@@ -0,0 +1,207 @@
+import asyncio
+import hashlib
+import math
+import random
+import threading
+import time
+from typing import AsyncIterator, Callable, Dict, Iterator, Optional
+
+from google.api_core import exceptions as google_exceptions
+
+from .chunker import estimate_tokens
+from utils.constants import FAKE_LLM_CONFIG
+
+# End-of-stream marker for deltas handed across threads; the one object every module compares against
+STREAM_END = object()
+
+
+class Completion:
+    """Text of one model response and its token usage"""
+    __slots__ = ('text', 'input_tokens', 'output_tokens')
+
+    def __init__(self, text: str, input_tokens: int = 0, output_tokens: int = 0):
+        self.text = text
+        self.input_tokens = input_tokens
+        self.output_tokens = output_tokens
+
+
+class LLMBackend:
+    """A text generation model; subclass to plug in a provider.
+
+    ``generate``, ``stream`` and ``count_tokens`` are required. The async
+    variants default to running the blocking calls in worker threads;
+    backends with a native async API should override them.
+    """
+    name = 'base'
+
+    @property
+    def config(self) -> Dict:
+        """Settings that change outputs; part of every answer cache key"""
+        return {'backend': self.name}
+
+    def generate(self, prompt: str, generation_config: Optional[Dict] = None) -> Completion:
+        raise NotImplementedError
+
+    def stream(self, prompt: str, generation_config: Optional[Dict] = None) -> Iterator[str]:
+        raise NotImplementedError
+
+    def count_tokens(self, text: str) -> int:
+        raise NotImplementedError
+
+    async def agenerate(self, prompt: str, generation_config: Optional[Dict] = None) -> Completion:
+        return await asyncio.to_thread(self.generate, prompt, generation_config)
+
+    async def astream(self, prompt: str, generation_config: Optional[Dict] = None) -> AsyncIterator[str]:
+        deltas = await asyncio.to_thread(self.stream, prompt, generation_config)
+        while True:
+            delta = await asyncio.to_thread(next, deltas, STREAM_END)
+            if delta is STREAM_END:
+                return
+            yield delta
+
+
+class GeminiBackend(LLMBackend):
+    """Google Gemini through ``google.generativeai``"""
+    name = 'gemini'
+
+    def __init__(self, api_key: str, model_name: str = "gemini-2.0-flash-exp",
+                 generation_config: Optional[Dict] = None):
+        import google.generativeai as genai
+
+        genai.configure(api_key=api_key)
+        self.model_name = model_name
+        self.generation_config = generation_config or {}
+        self.model = genai.GenerativeModel(model_name=model_name, generation_config=self.generation_config)
+
+    @property
+    def config(self) -> Dict:
+        return {'model_name': self.model_name, **self.generation_config}
+
+    @staticmethod
+    def _completion(response) -> Completion:
+        usage = getattr(response, 'usage_metadata', None)
+        return Completion(response.text,
+                          getattr(usage, 'prompt_token_count', 0) or 0,
+                          getattr(usage, 'candidates_token_count', 0) or 0)
+
+    def generate(self, prompt: str, generation_config: Optional[Dict] = None) -> Completion:
+        return self._completion(self.model.generate_content(prompt, generation_config=generation_config))
+
+    def stream(self, prompt: str, generation_config: Optional[Dict] = None) -> Iterator[str]:
+        for chunk in self.model.generate_content(prompt, generation_config=generation_config, stream=True):
+            if chunk.text:
+                yield chunk.text
+
+    def count_tokens(self, text: str) -> int:
+        return self.model.count_tokens(text).total_tokens
+
+    async def agenerate(self, prompt: str, generation_config: Optional[Dict] = None) -> Completion:
+        response = await self.model.generate_content_async(prompt, generation_config=generation_config)
+        return self._completion(response)
+
+    async def astream(self, prompt: str, generation_config: Optional[Dict] = None) -> AsyncIterator[str]:
+        response = await self.model.generate_content_async(
+            prompt, generation_config=generation_config, stream=True)
+        async for chunk in response:
+            if chunk.text:
+                yield chunk.text
+
+
+class FakeBackend(LLMBackend):
+    """Offline stand-in with a controllable latency, error rate and token rate.
+
+    Time to first token is drawn from a ``fixed``, ``uniform`` or
+    ``lognormal`` distribution around ``latency_ms``. Output then arrives at
+    ``tokens_per_second``. ``error_rate`` of the calls fail with a retryable
+    ServiceUnavailable. All draws come from one seeded RNG, and responses are
+    a pure function of the prompt, so runs are reproducible. JSON-mode
+    requests get ``[]`` unless a ``responder`` is given.
+    """
+    name = 'fake'
+
+    def __init__(self, latency_ms: float = FAKE_LLM_CONFIG['latency_ms'],
+                 latency_distribution: str = FAKE_LLM_CONFIG['latency_distribution'],
+                 latency_jitter: float = FAKE_LLM_CONFIG['latency_jitter'],
+                 error_rate: float = FAKE_LLM_CONFIG['error_rate'],
+                 tokens_per_second: float = FAKE_LLM_CONFIG['tokens_per_second'],
+                 output_tokens: int = FAKE_LLM_CONFIG['output_tokens'],
+                 seed: int = FAKE_LLM_CONFIG['seed'],
+                 responder: Optional[Callable[[str], str]] = None):
+        if latency_distribution not in ('fixed', 'uniform', 'lognormal'):
+            raise ValueError(f"Unknown latency distribution: {latency_distribution}")
+        self.latency_ms = latency_ms
+        self.latency_distribution = latency_distribution
+        self.latency_jitter = latency_jitter
+        self.error_rate = error_rate
+        self.tokens_per_second = tokens_per_second
+        self.output_tokens = output_tokens
+        self.responder = responder
+        self.calls = 0
+        self.errors = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    @property
+    def config(self) -> Dict:
+        return {'backend': self.name, 'output_tokens': self.output_tokens}
+
+    def _draw(self) -> float:
+        """Seconds until the first token; raises for an injected failure"""
+        with self._lock:
+            self.calls += 1
+            failed = self._rng.random() < self.error_rate
+            if self.latency_distribution == 'fixed':
+                latency = self.latency_ms
+            elif self.latency_distribution == 'uniform':
+                spread = self.latency_ms * self.latency_jitter
+                latency = self._rng.uniform(self.latency_ms - spread, self.latency_ms + spread)
+            else:
+                latency = self.latency_ms * math.exp(self._rng.gauss(0.0, self.latency_jitter))
+            if failed:
+                self.errors += 1
+        if failed:
+            raise google_exceptions.ServiceUnavailable("fake backend: injected failure")
+        return max(latency, 0.0) / 1000.0
+
+    def _respond(self, prompt: str, generation_config: Optional[Dict]) -> str:
+        if self.responder is not None:
+            return self.responder(prompt)
+        if (generation_config or {}).get('response_mime_type') == 'application/json':
+            return '[]'
+        digest = hashlib.sha1(prompt.encode('utf-8')).hexdigest()
+        words = [digest[i % 32:i % 32 + 4] for i in range(self.output_tokens)]
+        return f"Fake answer {digest[:8]}: " + ' '.join(words)
+
+    def _tokens(self, text: str) -> Iterator[str]:
+        for i in range(0, len(text), 4):
+            yield text[i:i + 4]
+
+    def _completion(self, prompt: str, text: str) -> Completion:
+        return Completion(text, self.count_tokens(prompt), self.count_tokens(text))
+
+    def generate(self, prompt: str, generation_config: Optional[Dict] = None) -> Completion:
+        latency = self._draw()
+        text = self._respond(prompt, generation_config)
+        time.sleep(latency + self.count_tokens(text) / self.tokens_per_second)
+        return self._completion(prompt, text)
+
+    def stream(self, prompt: str, generation_config: Optional[Dict] = None) -> Iterator[str]:
+        time.sleep(self._draw())
+        for token in self._tokens(self._respond(prompt, generation_config)):
+            time.sleep(1.0 / self.tokens_per_second)
+            yield token
+
+    def count_tokens(self, text: str) -> int:
+        return estimate_tokens(text)
+
+    async def agenerate(self, prompt: str, generation_config: Optional[Dict] = None) -> Completion:
+        latency = self._draw()
+        text = self._respond(prompt, generation_config)
+        await asyncio.sleep(latency + self.count_tokens(text) / self.tokens_per_second)
+        return self._completion(prompt, text)
+
+    async def astream(self, prompt: str, generation_config: Optional[Dict] = None) -> AsyncIterator[str]:
+        await asyncio.sleep(self._draw())
+        for token in self._tokens(self._respond(prompt, generation_config)):
+            await asyncio.sleep(1.0 / self.tokens_per_second)
+            yield token
@@ -0,0 +1,225 @@
+import asyncio
+import queue
+import random
+import threading
+import time
+from typing import Any, AsyncIterator, Dict, Iterator, Optional
+
+from google.api_core import exceptions as google_exceptions
+
+from .chunker import estimate_tokens
+from .llm_backend import STREAM_END, Completion, LLMBackend
+from .tracing import get_tracer
+from utils.constants import LLM_CONFIG
+
+RETRYABLE_ERRORS = (
+    google_exceptions.TooManyRequests,
+    google_exceptions.ResourceExhausted,
+    google_exceptions.InternalServerError,
+    google_exceptions.BadGateway,
+    google_exceptions.ServiceUnavailable,
+    google_exceptions.GatewayTimeout,
+    google_exceptions.DeadlineExceeded,
+    asyncio.TimeoutError,
+    ConnectionError,
+)
+
+
+class LLMOverloadedError(Exception):
+    """Raised when a request waited too long for a free model slot"""
+
+    def __init__(self, waited: float):
+        super().__init__(f"TubeGPT is busy right now (waited {waited:.0f}s for a free slot). Please try again shortly.")
+        self.waited = waited
+
+
+class _EventLoopThread:
+    """One background asyncio loop per process that every sync call is funnelled through"""
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, name='tubegpt-llm-loop', daemon=True)
+        self.thread.start()
+        self.semaphore = self.run(self._make_semaphore(LLM_CONFIG['max_concurrency']))
+
+    @staticmethod
+    async def _make_semaphore(value: int) -> asyncio.Semaphore:
+        return asyncio.Semaphore(value)
+
+    def run(self, coro) -> Any:
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result()
+
+
+_loop_thread = None
+_loop_thread_lock = threading.Lock()
+
+
+def _get_loop_thread() -> _EventLoopThread:
+    global _loop_thread
+    with _loop_thread_lock:
+        if _loop_thread is None:
+            _loop_thread = _EventLoopThread()
+        return _loop_thread
+
+
+class LLMClient:
+    """Asyncio wrapper around an LLMBackend.
+
+    Every call shares one process-wide concurrency semaphore. Calls wait in a
+    queue for a slot and give up with LLMOverloadedError after
+    ``queue_timeout``. Each attempt has a timeout. Retryable errors (429, 5xx,
+    timeouts) are retried with exponential backoff and full jitter. A request
+    that is slower than ``hedge_after`` seconds gets a second, hedged attempt
+    if a slot is free, and the first to succeed wins. ``generate`` and
+    ``stream_text`` are blocking facades for the Streamlit script thread.
+    """
+
+    def __init__(self, backend: LLMBackend, max_retries: int = LLM_CONFIG['max_retries'],
+                 timeout: float = LLM_CONFIG['timeout_seconds'],
+                 backoff_base: float = LLM_CONFIG['backoff_base_seconds'],
+                 backoff_max: float = LLM_CONFIG['backoff_max_seconds'],
+                 hedge_after: Optional[float] = LLM_CONFIG['hedge_after_seconds'],
+                 queue_timeout: float = LLM_CONFIG['queue_timeout_seconds']):
+        self.backend = backend
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.hedge_after = hedge_after
+        self.queue_timeout = queue_timeout
+        self.retries = 0
+        self.hedges = 0
+
+    async def _acquire(self, semaphore: asyncio.Semaphore) -> None:
+        started = time.monotonic()
+        try:
+            await asyncio.wait_for(semaphore.acquire(), self.queue_timeout)
+        except asyncio.TimeoutError:
+            raise LLMOverloadedError(time.monotonic() - started) from None
+
+    async def _call(self, prompt: str, generation_config: Optional[Dict]) -> Completion:
+        return await asyncio.wait_for(self.backend.agenerate(prompt, generation_config), self.timeout)
+
+    async def _hedged_call(self, prompt: str, generation_config: Optional[Dict],
+                           semaphore: asyncio.Semaphore) -> Completion:
+        """Start a backup attempt if the first is slow and a slot is free"""
+        primary = asyncio.ensure_future(self._call(prompt, generation_config))
+        if self.hedge_after is None:
+            return await primary
+
+        done, _ = await asyncio.wait({primary}, timeout=self.hedge_after)
+        if done or semaphore.locked():
+            return await primary
+
+        await semaphore.acquire()
+        self.hedges += 1
+        backup = asyncio.ensure_future(self._call(prompt, generation_config))
+        try:
+            pending = {primary, backup}
+            error = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in (primary, backup):
+                task.cancel()
+            semaphore.release()
+
+    def _backoff(self, attempt: int) -> float:
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    async def agenerate(self, prompt: str, generation_config: Optional[Dict] = None) -> Completion:
+        """Generate a full response with queueing, retries and hedging"""
+        semaphore = _get_loop_thread().semaphore
+        for attempt in range(self.max_retries + 1):
+            await self._acquire(semaphore)
+            try:
+                return await self._hedged_call(prompt, generation_config, semaphore)
+            except RETRYABLE_ERRORS:
+                if attempt == self.max_retries:
+                    raise
+            finally:
+                semaphore.release()
+            self.retries += 1
+            await asyncio.sleep(self._backoff(attempt))
+
+    async def astream(self, prompt: str, generation_config: Optional[Dict] = None) -> AsyncIterator[str]:
+        """Stream text deltas; failures before the first delta are retried.
+
+        The timeout bounds the wait for every delta, so a stream that stalls
+        mid-answer gives its slot back instead of holding it forever.
+        """
+        semaphore = _get_loop_thread().semaphore
+        for attempt in range(self.max_retries + 1):
+            await self._acquire(semaphore)
+            started = False
+            deltas = None
+            try:
+                deltas = self.backend.astream(prompt, generation_config)
+                while True:
+                    try:
+                        delta = await asyncio.wait_for(deltas.__anext__(), self.timeout)
+                    except StopAsyncIteration:
+                        return
+                    started = True
+                    yield delta
+            except RETRYABLE_ERRORS:
+                if started or attempt == self.max_retries:
+                    raise
+            finally:
+                try:
+                    if deltas is not None:
+                        # Stops the model generating for a stream nobody reads
+                        await deltas.aclose()
+                finally:
+                    semaphore.release()
+            self.retries += 1
+            await asyncio.sleep(self._backoff(attempt))
+
+    def generate(self, prompt: str, generation_config: Optional[Dict] = None) -> Completion:
+        """Blocking facade over ``agenerate``"""
+        with get_tracer().span('llm.generate', backend=self.backend.name) as span:
+            completion = _get_loop_thread().run(self.agenerate(prompt, generation_config))
+            span.set(input_tokens=completion.input_tokens, output_tokens=completion.output_tokens)
+            return completion
+
+    def generate_text(self, prompt: str, generation_config: Optional[Dict] = None) -> str:
+        return self.generate(prompt, generation_config).text
+
+    def stream_text(self, prompt: str, generation_config: Optional[Dict] = None) -> Iterator[str]:
+        """Blocking facade over ``astream``, yielding deltas as they arrive"""
+        deltas: queue.Queue = queue.Queue()
+
+        async def pump():
+            try:
+                async for delta in self.astream(prompt, generation_config):
+                    deltas.put(delta)
+            except BaseException as e:
+                deltas.put(e)
+            finally:
+                deltas.put(STREAM_END)
+
+        with get_tracer().span('llm.stream', backend=self.backend.name) as span:
+            started = time.perf_counter()
+            pumping = asyncio.run_coroutine_threadsafe(pump(), _get_loop_thread().loop)
+            parts = []
+            try:
+                while True:
+                    item = deltas.get()
+                    if item is STREAM_END:
+                        break
+                    if isinstance(item, BaseException):
+                        raise item
+                    if not parts:
+                        span.set(ttft_seconds=time.perf_counter() - started)
+                    parts.append(item)
+                    yield item
+            finally:
+                # A closed or failed stream cancels the call, which frees its slot
+                pumping.cancel()
+            # Streams report no usage, so token counts are estimated from the text
+            span.set(input_tokens=estimate_tokens(prompt), output_tokens=estimate_tokens(''.join(parts)))
@@ -0,0 +1,137 @@
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+from utils.constants import CACHE_CONFIG, RATE_LIMIT_CONFIG
+
+
+def _take(tokens: float, updated: float, now: float, rate: float, capacity: float,
+          amount: float, max_wait: float) -> Tuple[float, bool, float]:
+    """Refill a bucket and try to reserve ``amount`` tokens.
+
+    Returns (remaining tokens, granted, wait seconds). A granted reservation may
+    drive the bucket negative; the wait is how long the caller must hold off
+    before using it. A refused one leaves the bucket untouched and reports how
+    long until it would have been granted.
+    """
+    tokens = min(capacity, tokens + max(now - updated, 0) * rate)
+    wait_time = max(amount - tokens, 0) / rate
+
+    if wait_time <= max_wait:
+        return tokens - amount, True, wait_time
+    return tokens, False, wait_time
+
+
+class RateLimitBackend:
+    """Storage for token buckets; subclass to coordinate across processes"""
+
+    def reserve(self, key: str, rate: float, capacity: float, amount: float,
+                max_wait: float) -> Tuple[bool, float]:
+        raise NotImplementedError
+
+
+class MemoryRateLimitBackend(RateLimitBackend):
+    """Buckets shared by every thread (and so every session) in this process"""
+
+    def __init__(self):
+        self._buckets: Dict[str, Tuple[float, float]] = {}
+        self._lock = threading.Lock()
+
+    def reserve(self, key: str, rate: float, capacity: float, amount: float,
+                max_wait: float) -> Tuple[bool, float]:
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (capacity, now))
+            tokens, granted, wait_time = _take(tokens, updated, now, rate, capacity, amount, max_wait)
+            self._buckets[key] = (tokens, now)
+        return granted, wait_time
+
+
+class SQLiteRateLimitBackend(RateLimitBackend):
+    """Buckets in a SQLite file so several app worker processes on one host share them"""
+
+    def __init__(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS buckets (key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)"
+        )
+        self._lock = threading.Lock()
+
+    def reserve(self, key: str, rate: float, capacity: float, amount: float,
+                max_wait: float) -> Tuple[bool, float]:
+        with self._lock:
+            # BEGIN IMMEDIATE takes the write lock up front, so the
+            # read-modify-write below is atomic across processes
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                now = time.time()
+                row = self._conn.execute("SELECT tokens, updated FROM buckets WHERE key = ?", (key,)).fetchone()
+                tokens, updated = row if row else (capacity, now)
+                tokens, granted, wait_time = _take(tokens, updated, now, rate, capacity, amount, max_wait)
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO buckets (key, tokens, updated) VALUES (?, ?, ?)",
+                    (key, tokens, now)
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return granted, wait_time
+
+
+class TokenBucketLimiter:
+    """Token-bucket rate limiter keyed by upstream endpoint.
+
+    ``limits`` maps an endpoint key to ``(rate per second, burst capacity)``.
+    Callers get the wait time back instead of the limiter sleeping for them.
+    """
+
+    def __init__(self, limits: Dict[str, Tuple[float, float]],
+                 default_limit: Tuple[float, float] = (1.0, 1.0),
+                 backend: Optional[RateLimitBackend] = None):
+        self.limits = dict(limits)
+        self.default_limit = default_limit
+        self.backend = backend or MemoryRateLimitBackend()
+
+    def reserve(self, key: str, tokens: float = 1.0, max_wait: float = 0.0) -> Tuple[bool, float]:
+        """Reserve tokens for ``key`` if they are available within ``max_wait`` seconds.
+
+        Returns (granted, wait seconds). When granted, the caller should wait the
+        returned time before making the request; when refused, nothing is
+        consumed and the wait says when to come back.
+        """
+        rate, capacity = self.limits.get(key, self.default_limit)
+        return self.backend.reserve(key, rate, capacity, tokens, max_wait)
+
+    def try_acquire(self, key: str, tokens: float = 1.0) -> float:
+        """Take tokens only if available right now; return 0.0 or the wait time"""
+        granted, wait_time = self.reserve(key, tokens, max_wait=0.0)
+        return 0.0 if granted else wait_time
+
+
+_shared_limiter = None
+_shared_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter() -> TokenBucketLimiter:
+    """Return the process-wide limiter shared by all sessions and fetch strategies"""
+    global _shared_limiter
+    with _shared_limiter_lock:
+        if _shared_limiter is None:
+            if RATE_LIMIT_CONFIG['backend'] == 'sqlite':
+                backend = SQLiteRateLimitBackend(os.path.join(CACHE_CONFIG['dir'], 'rate_limits.sqlite3'))
+            else:
+                backend = MemoryRateLimitBackend()
+            _shared_limiter = TokenBucketLimiter(
+                RATE_LIMIT_CONFIG['limits'],
+                default_limit=RATE_LIMIT_CONFIG['default_limit'],
+                backend=backend,
+            )
+        return _shared_limiter
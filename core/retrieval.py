@@ -0,0 +1,92 @@
+import heapq
+import math
+import re
+import sys
+from array import array
+from collections import Counter
+from typing import Dict, List, Sequence, Tuple
+
+TOKEN_RE = re.compile(r"[a-z0-9]+(?:'[a-z]+)?")
+
+STOPWORDS = frozenset("""
+a about above after again all also am an and any are as at be because been before being
+below between both but by can could did do does doing down during each few for from further
+had has have having he her here hers herself him himself his how i if in into is it its itself
+just me more most my myself no nor not now of off on once only or other our ours ourselves out
+over own same she should so some such than that the their theirs them themselves then there
+these they this those through to too under until up very was we were what when where which
+while who whom why will with would you your yours yourself yourselves um uh yeah like okay
+video tell say said says
+""".split())
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens with stopwords removed"""
+    return [token for token in TOKEN_RE.findall(text.lower()) if token not in STOPWORDS]
+
+
+class BM25Index:
+    """Inverted index over transcript chunks with Okapi BM25 scoring.
+
+    The per-posting BM25 weight is precomputed at build time, so a query is a
+    walk over the postings of its terms plus a top-k heap.
+    """
+
+    def __init__(self, documents: Sequence[str], k1: float = 1.5, b: float = 0.75):
+        self.documents = documents
+        self.k1 = k1
+        self.b = b
+
+        term_frequencies = []
+        lengths = array('i')
+        document_frequency: Counter = Counter()
+        for document in documents:
+            counts = Counter(tokenize(document))
+            term_frequencies.append(counts)
+            lengths.append(sum(counts.values()))
+            document_frequency.update(counts.keys())
+
+        count = len(lengths)
+        average_length = (sum(lengths) / count) if count else 0.0
+
+        # term -> (doc ids, BM25 weights)
+        self.postings: Dict[str, Tuple[array, array]] = {
+            term: (array('i'), array('f')) for term in document_frequency
+        }
+
+        for doc_id, counts in enumerate(term_frequencies):
+            norm = k1 * (1 - b + b * lengths[doc_id] / average_length) if average_length else k1
+            for term, tf in counts.items():
+                idf = math.log(1 + (count - document_frequency[term] + 0.5) / (document_frequency[term] + 0.5))
+                doc_ids, weights = self.postings[term]
+                doc_ids.append(doc_id)
+                weights.append(idf * tf * (k1 + 1) / (tf + norm))
+
+    def __len__(self) -> int:
+        return len(self.documents)
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory held by the postings (the documents are not counted)"""
+        return sys.getsizeof(self.postings) + sum(
+            sys.getsizeof(term) + sys.getsizeof(doc_ids) + sys.getsizeof(weights)
+            for term, (doc_ids, weights) in self.postings.items())
+
+    def search(self, query: str, top_k: int = 4) -> List[Tuple[int, float]]:
+        """Return up to ``top_k`` (doc id, score) pairs, best first"""
+        scores: Dict[int, float] = {}
+        for term in set(tokenize(query)):
+            posting = self.postings.get(term)
+            if posting is None:
+                continue
+            for doc_id, weight in zip(*posting):
+                scores[doc_id] = scores.get(doc_id, 0.0) + weight
+
+        return heapq.nlargest(top_k, scores.items(), key=lambda item: item[1])
+
+
+def spread_indices(count: int, k: int) -> List[int]:
+    """Evenly spaced indices across ``count`` items, for queries with no lexical match"""
+    if count <= k:
+        return list(range(count))
+    return [int(i * count / k) for i in range(k)]
@@ -0,0 +1,292 @@
+import html
+import io
+import json
+import re
+import struct
+import sys
+from array import array
+from collections import deque
+from xml.etree import ElementTree
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Tuple, Union
+
+_CLOCK = r'(?:(\d+):)?(\d{1,2}):(\d{2})[.,](\d{1,3})'
+TIMING_RE = re.compile(r'^\s*' + _CLOCK + r'\s*-->\s*' + _CLOCK)
+TAG_RE = re.compile(r'<[^>]*>')
+# Word timings and <c> spans only appear in auto-generated (rolling) tracks
+ROLLING_TAG_RE = re.compile(r'<(?:\d+:)?\d{1,2}:\d{2}[.,]\d{1,3}>|<c[.>]')
+WHITESPACE_RE = re.compile(r'\s+')
+
+# Blocks in a WebVTT header that never carry caption text
+VTT_META_BLOCKS = ('WEBVTT', 'NOTE', 'STYLE', 'REGION')
+
+_MAGIC = b'TGT1'
+_HEADER = struct.Struct('<4sII')
+
+
+def _clock_ms(hours: str, minutes: str, seconds: str, fraction: str) -> int:
+    """Convert captured ``HH:MM:SS.mmm`` clock fields to milliseconds"""
+    total = (int(hours or 0) * 60 + int(minutes)) * 60 + int(seconds)
+    return total * 1000 + int(fraction.ljust(3, '0'))
+
+
+def clean_caption_line(line: str) -> str:
+    """Strip inline ``<c>``/timing/voice tags and entities from a caption line"""
+    if '<' in line:
+        line = TAG_RE.sub('', line)
+    if '&' in line:
+        line = html.unescape(line)
+    return WHITESPACE_RE.sub(' ', line).strip()
+
+
+class ParsedTranscript:
+    """Plain transcript text with compact parallel per-cue arrays.
+
+    Cue ``i`` spans ``start_ms[i]..end_ms[i]`` and its text is
+    ``text[text_start[i]:text_end[i]]``.
+    """
+    __slots__ = ('text', 'start_ms', 'end_ms', 'text_start', 'text_end')
+
+    def __init__(self, text: str, start_ms: array, end_ms: array, text_start: array, text_end: array):
+        self.text = text
+        self.start_ms = start_ms
+        self.end_ms = end_ms
+        self.text_start = text_start
+        self.text_end = text_end
+
+    def __len__(self) -> int:
+        return len(self.start_ms)
+
+    def cue(self, index: int) -> Tuple[int, int, str]:
+        """Return (start_ms, end_ms, text) for one cue"""
+        return (self.start_ms[index], self.end_ms[index],
+                self.text[self.text_start[index]:self.text_end[index]])
+
+    @classmethod
+    def from_text(cls, text: str) -> 'ParsedTranscript':
+        """Wrap untimed text as a single cue"""
+        return cls(text, array('q', [0]), array('q', [0]), array('q', [0]), array('q', [len(text)]))
+
+    @classmethod
+    def from_entries(cls, entries: Iterable[Dict]) -> 'ParsedTranscript':
+        """Build from YouTubeTranscriptApi-style ``{text, start, duration}`` dicts"""
+        builder = TranscriptBuilder()
+        for entry in entries:
+            start_ms = int(float(entry.get('start', 0)) * 1000)
+            end_ms = start_ms + int(float(entry.get('duration', 0)) * 1000)
+            builder.add_cue(start_ms, end_ms, entry.get('text', '').split('\n'))
+        return builder.build()
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the text and the cue arrays"""
+        return sys.getsizeof(self.text) + sum(
+            sys.getsizeof(values) for values in (self.start_ms, self.end_ms, self.text_start, self.text_end))
+
+    def to_bytes(self) -> bytes:
+        """Serialize to a compact binary blob (used by the transcript cache)"""
+        encoded = self.text.encode('utf-8')
+        parts = [_HEADER.pack(_MAGIC, len(self), len(encoded))]
+        for values in (self.start_ms, self.end_ms, self.text_start, self.text_end):
+            if sys.byteorder != 'little':
+                values = array('q', values)
+                values.byteswap()
+            parts.append(values.tobytes())
+        parts.append(encoded)
+        return b''.join(parts)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'ParsedTranscript':
+        """Inverse of ``to_bytes``; plain UTF-8 text is accepted as one untimed cue"""
+        if not data.startswith(_MAGIC):
+            return cls.from_text(data.decode('utf-8'))
+
+        _, count, text_length = _HEADER.unpack_from(data)
+        offset = _HEADER.size
+        arrays = []
+        for _ in range(4):
+            values = array('q')
+            values.frombytes(data[offset:offset + count * 8])
+            if sys.byteorder != 'little':
+                values.byteswap()
+            arrays.append(values)
+            offset += count * 8
+        text = data[offset:offset + text_length].decode('utf-8')
+        return cls(text, *arrays)
+
+
+class TranscriptBuilder:
+    """Accumulates cues, dropping the rolling repeats of YouTube auto-captions.
+
+    Auto-generated tracks re-emit the previous line at the top of each cue and
+    add short "snap" cues that repeat the whole caption, so a naive join holds
+    every line two or three times. Repeats are only dropped once the track is
+    known to roll, i.e. it carries inline word timings or ``<c>`` spans, or
+    for a cue that overlaps the one before it. Manual captions keep genuinely
+    repeated lines such as "Yes." / "Yes." or a chorus.
+    """
+
+    def __init__(self, history: int = 3):
+        self._recent = deque(maxlen=history)
+        self._buffer = io.StringIO()
+        self._length = 0
+        self._last_end_ms = None
+        self.rolling = False
+        self.start_ms = array('q')
+        self.end_ms = array('q')
+        self.text_start = array('q')
+        self.text_end = array('q')
+
+    def add_cue(self, start_ms: int, end_ms: int, lines: Iterable[str]) -> None:
+        """Add one cue's raw text lines"""
+        lines = list(lines)
+        if not self.rolling and any('<' in raw and ROLLING_TAG_RE.search(raw) for raw in lines):
+            self.rolling = True
+        overlaps = self._last_end_ms is not None and start_ms < self._last_end_ms
+        self._last_end_ms = end_ms if self._last_end_ms is None else max(self._last_end_ms, end_ms)
+        dedupe = self.rolling or overlaps
+
+        pieces = []
+        for raw in lines:
+            line = clean_caption_line(raw)
+            if not line:
+                continue
+            if not dedupe:
+                self._recent.append(line)
+                pieces.append(line)
+                continue
+            if line in self._recent:
+                continue
+
+            previous = self._recent[-1] if self._recent else ''
+            # Growing captions repeat the previous line as a prefix
+            if previous and line.startswith(previous + ' '):
+                piece = line[len(previous):].strip()
+            else:
+                piece = line
+
+            self._recent.append(line)
+            if piece:
+                pieces.append(piece)
+
+        if not pieces:
+            return
+
+        text = ' '.join(pieces)
+        if self._length:
+            self._buffer.write(' ')
+            self._length += 1
+
+        self.start_ms.append(start_ms)
+        self.end_ms.append(end_ms)
+        self.text_start.append(self._length)
+        self._buffer.write(text)
+        self._length += len(text)
+        self.text_end.append(self._length)
+
+    def build(self) -> ParsedTranscript:
+        return ParsedTranscript(self._buffer.getvalue(), self.start_ms, self.end_ms,
+                                self.text_start, self.text_end)
+
+
+def iter_cues(lines: Iterable[str]) -> Iterator[Tuple[int, int, List[str]]]:
+    """Yield (start_ms, end_ms, text lines) for each WebVTT/SRT cue, one line at a time"""
+    in_meta = False
+    start_ms = end_ms = None
+    text_lines: List[str] = []
+
+    for raw in lines:
+        line = raw.strip('\r\n\ufeff')
+        stripped = line.strip()
+
+        # Only a truly empty line ends a block; auto-captions pad cues with
+        # whitespace-only lines
+        if not line:
+            if start_ms is not None:
+                yield start_ms, end_ms, text_lines
+                start_ms = end_ms = None
+                text_lines = []
+            in_meta = False
+            continue
+
+        if in_meta or not stripped:
+            continue
+
+        if start_ms is None:
+            match = TIMING_RE.match(stripped)
+            if match:
+                fields = match.groups()
+                start_ms = _clock_ms(*fields[:4])
+                end_ms = _clock_ms(*fields[4:])
+            elif stripped.startswith(VTT_META_BLOCKS):
+                in_meta = True
+            # Anything else before a timing line is an SRT index or cue id
+            continue
+
+        text_lines.append(stripped)
+
+    if start_ms is not None:
+        yield start_ms, end_ms, text_lines
+
+
+def parse_subtitles(lines: Iterable[str]) -> ParsedTranscript:
+    """Parse WebVTT or SRT from any iterable of text lines (e.g. an open file)"""
+    builder = TranscriptBuilder()
+    for start_ms, end_ms, text_lines in iter_cues(lines):
+        builder.add_cue(start_ms, end_ms, text_lines)
+    return builder.build()
+
+
+def parse_subtitle_file(path: str) -> ParsedTranscript:
+    """Stream-parse a subtitle file without reading it into memory at once"""
+    with open(path, 'r', encoding='utf-8', errors='replace') as f:
+        return parse_subtitles(f)
+
+
+def parse_subtitle_bytes(data: Union[bytes, bytearray, memoryview, BinaryIO]) -> ParsedTranscript:
+    """Stream-parse subtitles from a byte buffer or binary stream"""
+    stream = io.BytesIO(data) if isinstance(data, (bytes, bytearray, memoryview)) else data
+    wrapper = io.TextIOWrapper(stream, encoding='utf-8', errors='replace')
+    try:
+        return parse_subtitles(wrapper)
+    finally:
+        # Leave the caller's stream open
+        wrapper.detach()
+
+
+def parse_json3(data: Union[bytes, str]) -> ParsedTranscript:
+    """Parse YouTube's ``json3`` timed-text format"""
+    builder = TranscriptBuilder()
+    for event in json.loads(data).get('events', []):
+        segs = event.get('segs')
+        if not segs:
+            continue
+        start_ms = int(event.get('tStartMs', 0))
+        end_ms = start_ms + int(event.get('dDurationMs', 0))
+        text = ''.join(seg.get('utf8', '') for seg in segs)
+        builder.add_cue(start_ms, end_ms, text.split('\n'))
+    return builder.build()
+
+
+def parse_srv3(data: Union[bytes, BinaryIO]) -> ParsedTranscript:
+    """Stream-parse YouTube's ``srv3`` timed-text XML (``<p t=.. d=..>`` cues)"""
+    stream = io.BytesIO(data) if isinstance(data, (bytes, bytearray, memoryview)) else data
+    builder = TranscriptBuilder()
+    for _, element in ElementTree.iterparse(stream, events=('end',)):
+        if element.tag != 'p':
+            continue
+        start_ms = int(element.get('t', 0))
+        end_ms = start_ms + int(element.get('d', 0))
+        builder.add_cue(start_ms, end_ms, ''.join(element.itertext()).split('\n'))
+        element.clear()
+    return builder.build()
+
+
+def parse_caption_bytes(data: bytes, ext: str) -> ParsedTranscript:
+    """Parse a downloaded caption track by its yt-dlp ``ext``"""
+    if ext == 'json3':
+        return parse_json3(data)
+    if ext == 'srv3':
+        return parse_srv3(data)
+    if ext in ('vtt', 'srt'):
+        return parse_subtitle_bytes(data)
+    raise ValueError(f"Unsupported caption format: {ext}")
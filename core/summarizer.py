@@ -0,0 +1,196 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterator, List, Optional, Sequence
+
+from .chunker import ChunkStore, estimate_tokens
+from utils.constants import SUMMARY_CONFIG
+
+MAP_PROMPT = """
+            Summarize part {part} of {parts} of a YouTube video transcript.
+            Keep the key points, names, numbers and conclusions; skip filler.
+
+            Transcript section:
+            {text}
+
+            Section summary:
+            """
+
+REDUCE_PROMPT = """
+            Merge these consecutive partial summaries of one YouTube video into a single
+            summary that keeps every key point, name, number and conclusion, in order.
+
+            Partial summaries:
+            {text}
+
+            Merged summary:
+            """
+
+FINAL_PROMPT = """
+            Create a comprehensive summary of this YouTube video based on the {source} below.
+            Include:
+            1. Main topic/theme
+            2. Key points discussed
+            3. Important people or entities mentioned
+            4. Any conclusions or takeaways
+
+            {label}:
+            {text}
+
+            Summary:
+            """
+
+
+class SummaryCache:
+    """Process-wide cache of intermediate summaries, keyed per video by prompt hash"""
+
+    def __init__(self, max_videos: int = SUMMARY_CONFIG['cache_videos']):
+        self.max_videos = max_videos
+        self._videos: "OrderedDict[str, Dict[str, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, video_id: str, key: str) -> Optional[str]:
+        with self._lock:
+            entries = self._videos.get(video_id)
+            if entries is None:
+                return None
+            self._videos.move_to_end(video_id)
+            return entries.get(key)
+
+    def put(self, video_id: str, key: str, summary: str) -> None:
+        with self._lock:
+            self._videos.setdefault(video_id, {})[key] = summary
+            self._videos.move_to_end(video_id)
+            while len(self._videos) > self.max_videos:
+                self._videos.popitem(last=False)
+
+
+_shared_summary_cache = SummaryCache()
+
+
+class MapReduceSummarizer:
+    """Summarizes a whole transcript with a bounded pool of concurrent model calls.
+
+    Consecutive chunks are grouped up to ``group_tokens`` and summarized in
+    parallel (map). Partial summaries are then merged in parallel batches that
+    fit ``reduce_tokens`` until one prompt holds them all (reduce), so wall
+    time grows with tree depth rather than chunk count. Every intermediate
+    result is cached under its prompt hash, so a re-run only pays for groups
+    whose text changed.
+    """
+
+    def __init__(self, generate: Callable[[str], str],
+                 max_workers: int = SUMMARY_CONFIG['max_workers'],
+                 group_tokens: int = SUMMARY_CONFIG['group_tokens'],
+                 reduce_tokens: int = SUMMARY_CONFIG['reduce_tokens'],
+                 cache: Optional[SummaryCache] = None):
+        self.generate = generate
+        self.max_workers = max_workers
+        self.group_tokens = group_tokens
+        self.reduce_tokens = reduce_tokens
+        self.cache = cache if cache is not None else _shared_summary_cache
+        self.calls = 0
+        self.cache_hits = 0
+
+    def _groups(self, chunks: Sequence[str]) -> List[str]:
+        """Consecutive chunks packed into groups of about ``group_tokens``"""
+        groups, first, size = [], 0, 0
+        for i in range(len(chunks)):
+            tokens = estimate_tokens(chunks[i])
+            if i > first and size + tokens > self.group_tokens:
+                groups.append(self._join(chunks, first, i))
+                first, size = i, 0
+            size += tokens
+        if len(chunks):
+            groups.append(self._join(chunks, first, len(chunks)))
+        return groups
+
+    @staticmethod
+    def _join(chunks: Sequence[str], first: int, last: int) -> str:
+        if isinstance(chunks, ChunkStore):
+            # One slice of the shared transcript, without the chunk overlaps
+            return chunks.text[chunks.starts[first]:chunks.ends[last - 1]]
+        return "\n\n".join(chunks[first:last])
+
+    def _cached_generate(self, video_id: str, prompt: str) -> str:
+        key = hashlib.sha1(prompt.encode('utf-8')).hexdigest()
+        cached = self.cache.get(video_id, key)
+        if cached is not None:
+            self.cache_hits += 1
+            return cached
+        self.calls += 1
+        summary = self.generate(prompt)
+        self.cache.put(video_id, key, summary)
+        return summary
+
+    def _run(self, video_id: str, prompts: List[str]) -> List[str]:
+        if len(prompts) == 1:
+            return [self._cached_generate(video_id, prompts[0])]
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='summary') as pool:
+            return list(pool.map(lambda prompt: self._cached_generate(video_id, prompt), prompts))
+
+    def summarize(self, video_id: str, chunks: Sequence[str]) -> str:
+        """Summarize every chunk of a transcript"""
+        prompt = self._final_prompt(video_id, chunks)
+        return self._cached_generate(video_id, prompt) if prompt else ""
+
+    def summarize_stream(self, video_id: str, chunks: Sequence[str],
+                         generate_stream: Callable[[str], Iterator[str]]) -> Iterator[str]:
+        """Run map/reduce, then stream the final summary as text deltas"""
+        prompt = self._final_prompt(video_id, chunks)
+        if not prompt:
+            return
+
+        key = hashlib.sha1(prompt.encode('utf-8')).hexdigest()
+        cached = self.cache.get(video_id, key)
+        if cached is not None:
+            self.cache_hits += 1
+            yield cached
+            return
+
+        self.calls += 1
+        parts = []
+        for delta in generate_stream(prompt):
+            parts.append(delta)
+            yield delta
+        self.cache.put(video_id, key, ''.join(parts))
+
+    def _final_prompt(self, video_id: str, chunks: Sequence[str]) -> Optional[str]:
+        """Map and reduce the transcript down to the prompt for the final summary"""
+        groups = self._groups(chunks)
+        if not groups:
+            return None
+
+        if len(groups) == 1:
+            return FINAL_PROMPT.format(source="transcript", label="Transcript", text=groups[0])
+
+        # Map
+        summaries = self._run(video_id, [
+            MAP_PROMPT.format(part=i + 1, parts=len(groups), text=text) for i, text in enumerate(groups)
+        ])
+
+        # Reduce until the partials fit one prompt
+        while sum(estimate_tokens(summary) for summary in summaries) > self.reduce_tokens:
+            batches, batch, size = [], [], 0
+            for summary in summaries:
+                tokens = estimate_tokens(summary)
+                if batch and size + tokens > self.reduce_tokens:
+                    batches.append(batch)
+                    batch, size = [], 0
+                batch.append(summary)
+                size += tokens
+            batches.append(batch)
+
+            if len(batches) == len(summaries):
+                # Every partial is already a batch of its own; merging cannot shrink further
+                break
+            # Single-summary batches pass through without a model call
+            merge = [i for i, batch in enumerate(batches) if len(batch) > 1]
+            merged = self._run(video_id, [REDUCE_PROMPT.format(text="\n\n".join(batches[i])) for i in merge])
+            summaries = [batch[0] for batch in batches]
+            for i, summary in zip(merge, merged):
+                summaries[i] = summary
+
+        return FINAL_PROMPT.format(
+            source="section summaries", label="Section summaries", text="\n\n".join(summaries))
@@ -0,0 +1,269 @@
+import bisect
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional
+
+from utils.constants import TRACING_CONFIG
+
+# Numeric span attributes that are also summed into Prometheus counters
+COUNTED_ATTRIBUTES = ('input_tokens', 'output_tokens', 'bytes_fetched')
+
+
+class Span:
+    """One timed operation; children point at their parent through ``parent_id``"""
+    __slots__ = ('name', 'trace_id', 'span_id', 'parent_id', 'start_ns', 'end_ns', '_started',
+                 'duration', 'attributes', 'error')
+
+    def __init__(self, name: str, trace_id: str, parent_id: Optional[str], attributes: Dict):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self._started = time.perf_counter()
+        self.duration = None
+        self.attributes = attributes
+        self.error = None
+
+    def set(self, **attributes) -> None:
+        self.attributes.update(attributes)
+
+    def finish(self) -> None:
+        self.duration = time.perf_counter() - self._started
+        self.end_ns = self.start_ns + int(self.duration * 1e9)
+
+
+class Tracer:
+    """In-process span recorder with Prometheus and OTLP/JSON export.
+
+    Spans nest through a per-thread stack. ``wrap`` carries the current span
+    into worker threads, so pool work still lands in the caller's trace.
+    Finished spans are kept in a bounded ring. Their durations feed
+    per-name histograms, and token and byte attributes feed counters.
+    """
+
+    def __init__(self, max_spans: int = TRACING_CONFIG['max_spans'],
+                 buckets: tuple = TRACING_CONFIG['buckets']):
+        self.buckets = tuple(sorted(buckets))
+        self._spans: deque = deque(maxlen=max_spans)
+        self._histograms: Dict[str, List] = {}   # name -> [bucket counts..., overflow, sum, count]
+        self._counters: Dict[tuple, float] = {}  # (metric, label, value) -> total
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def _stack(self) -> List[Span]:
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def current(self) -> Optional[Span]:
+        stack = self._stack()
+        return stack[-1] if stack else None
+
+    @contextmanager
+    def span(self, name: str, **attributes) -> Iterator[Span]:
+        """Time a block as a child of the current span (or as a new trace)"""
+        parent = self.current()
+        span = Span(name, parent.trace_id if parent else os.urandom(16).hex(),
+                    parent.span_id if parent else None, attributes)
+        stack = self._stack()
+        stack.append(span)
+        try:
+            yield span
+        except BaseException as e:
+            if not isinstance(e, GeneratorExit):
+                span.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            # Remove this span even if an abandoned generator left others above it
+            if span in stack:
+                del stack[stack.index(span):]
+            span.finish()
+            self._record(span)
+
+    @contextmanager
+    def attach(self, parent: Optional[Span]) -> Iterator[None]:
+        """Make ``parent`` the current span on this thread for the block"""
+        if parent is None:
+            yield
+            return
+        stack = self._stack()
+        stack.append(parent)
+        try:
+            yield
+        finally:
+            if parent in stack:
+                del stack[stack.index(parent):]
+
+    def wrap(self, fn: Callable) -> Callable:
+        """Bind ``fn`` to the current span so calls from other threads nest under it"""
+        parent = self.current()
+
+        def run(*args, **kwargs):
+            with self.attach(parent):
+                return fn(*args, **kwargs)
+        return run
+
+    def _record(self, span: Span) -> None:
+        with self._lock:
+            self._spans.append(span)
+            histogram = self._histograms.get(span.name)
+            if histogram is None:
+                histogram = self._histograms[span.name] = [0] * (len(self.buckets) + 3)
+            histogram[bisect.bisect_left(self.buckets, span.duration)] += 1
+            histogram[-2] += span.duration
+            histogram[-1] += 1
+
+            for key in COUNTED_ATTRIBUTES:
+                value = span.attributes.get(key)
+                if value:
+                    counter = (key, 'span', span.name)
+                    self._counters[counter] = self._counters.get(counter, 0) + value
+            strategy = span.attributes.get('strategy')
+            if span.name == 'video.transcript' and strategy:
+                counter = ('transcript_strategy', 'strategy', strategy)
+                self._counters[counter] = self._counters.get(counter, 0) + 1
+            if span.name == 'transcript.strategy' and (span.error or span.attributes.get('success') is False):
+                counter = ('transcript_strategy_failures', 'strategy', strategy)
+                self._counters[counter] = self._counters.get(counter, 0) + 1
+            if span.error:
+                counter = ('span_errors', 'span', span.name)
+                self._counters[counter] = self._counters.get(counter, 0) + 1
+
+    def counter(self, metric: str) -> Dict[str, float]:
+        """Totals of one counter by label value, e.g. ``counter('bytes_fetched')``"""
+        with self._lock:
+            return {value: total for (name, _, value), total in self._counters.items() if name == metric}
+
+    def trace(self, trace_id: str) -> List[Span]:
+        """Finished spans of one trace, in start order"""
+        with self._lock:
+            spans = [span for span in self._spans if span.trace_id == trace_id]
+        return sorted(spans, key=lambda span: span.start_ns)
+
+    def breakdown(self, trace_id: str) -> List[Dict]:
+        """Rows of a trace as a tree (depth-first), for display"""
+        spans = self.trace(trace_id)
+        children: Dict[Optional[str], List[Span]] = {}
+        ids = {span.span_id for span in spans}
+        for span in spans:
+            parent = span.parent_id if span.parent_id in ids else None
+            children.setdefault(parent, []).append(span)
+
+        rows = []
+        pending = [(span, 0) for span in reversed(children.get(None, []))]
+        while pending:
+            span, depth = pending.pop()
+            rows.append({
+                'stage': span.name,
+                'depth': depth,
+                'ms': span.duration * 1000,
+                'attributes': dict(span.attributes),
+                'error': span.error,
+            })
+            pending.extend((child, depth + 1) for child in reversed(children.get(span.span_id, [])))
+        return rows
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Count, mean and approximate p95 seconds per span name"""
+        with self._lock:
+            histograms = {name: list(values) for name, values in self._histograms.items()}
+        result = {}
+        for name, values in histograms.items():
+            count = values[-1]
+            target, seen, p95 = 0.95 * count, 0, float('inf')
+            for bound, bucket in zip(self.buckets, values):
+                seen += bucket
+                if seen >= target:
+                    p95 = bound
+                    break
+            result[name] = {'count': count, 'mean_seconds': values[-2] / count, 'p95_seconds': p95}
+        return result
+
+    def to_prometheus(self) -> str:
+        """Histograms and counters in the Prometheus text exposition format"""
+        with self._lock:
+            histograms = {name: list(values) for name, values in self._histograms.items()}
+            counters = dict(self._counters)
+
+        lines = [
+            "# HELP tubegpt_span_duration_seconds Duration of traced TubeGPT operations",
+            "# TYPE tubegpt_span_duration_seconds histogram",
+        ]
+        for name, values in sorted(histograms.items()):
+            cumulative = 0
+            for bound, bucket in zip(self.buckets, values):
+                cumulative += bucket
+                lines.append(f'tubegpt_span_duration_seconds_bucket{{span="{name}",le="{bound}"}} {cumulative}')
+            lines.append(f'tubegpt_span_duration_seconds_bucket{{span="{name}",le="+Inf"}} {values[-1]}')
+            lines.append(f'tubegpt_span_duration_seconds_sum{{span="{name}"}} {values[-2]:.6f}')
+            lines.append(f'tubegpt_span_duration_seconds_count{{span="{name}"}} {values[-1]}')
+
+        metrics = sorted({metric for metric, _, _ in counters})
+        for metric in metrics:
+            lines.append(f"# TYPE tubegpt_{metric}_total counter")
+            for (name, label, value), total in sorted(counters.items()):
+                if name == metric:
+                    lines.append(f'tubegpt_{metric}_total{{{label}="{value}"}} {total:g}')
+        return "\n".join(lines) + "\n"
+
+    def to_otlp_json(self) -> str:
+        """Finished spans as an OTLP/JSON ExportTraceServiceRequest"""
+        with self._lock:
+            spans = list(self._spans)
+        return json.dumps({
+            'resourceSpans': [{
+                'resource': {'attributes': [_otlp_attribute('service.name', 'tubegpt')]},
+                'scopeSpans': [{
+                    'scope': {'name': 'tubegpt.tracing'},
+                    'spans': [_otlp_span(span) for span in spans],
+                }],
+            }],
+        })
+
+
+def _otlp_attribute(key: str, value) -> Dict:
+    if isinstance(value, bool):
+        typed = {'boolValue': value}
+    elif isinstance(value, int):
+        typed = {'intValue': str(value)}
+    elif isinstance(value, float):
+        typed = {'doubleValue': value}
+    else:
+        typed = {'stringValue': str(value)}
+    return {'key': key, 'value': typed}
+
+
+def _otlp_span(span: Span) -> Dict:
+    encoded = {
+        'traceId': span.trace_id,
+        'spanId': span.span_id,
+        'name': span.name,
+        'kind': 1,
+        'startTimeUnixNano': str(span.start_ns),
+        'endTimeUnixNano': str(span.end_ns),
+        'attributes': [_otlp_attribute(key, value) for key, value in span.attributes.items()],
+        'status': {'code': 2, 'message': span.error} if span.error else {'code': 1},
+    }
+    if span.parent_id:
+        encoded['parentSpanId'] = span.parent_id
+    return encoded
+
+
+_shared_tracer = None
+_shared_tracer_lock = threading.Lock()
+
+
+def get_tracer() -> Tracer:
+    """Return the process-wide tracer shared by all sessions"""
+    global _shared_tracer
+    with _shared_tracer_lock:
+        if _shared_tracer is None:
+            _shared_tracer = Tracer()
+        return _shared_tracer
@@ -0,0 +1,191 @@
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Dict, Iterable, Optional, Set
+
+from utils.constants import CACHE_CONFIG
+
+
+class TranscriptCache:
+    """Persistent, compressed transcript cache keyed by video_id and language.
+
+    Entries live in a single SQLite file so every session (and every app worker
+    process on the host) shares them. Payloads are zlib-compressed, expire after
+    ``ttl_seconds`` and are evicted least-recently-used once the stored size
+    exceeds ``max_bytes``.
+    """
+
+    def __init__(self, path: str, max_bytes: int, ttl_seconds: float):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS transcripts (
+                video_id TEXT NOT NULL,
+                language TEXT NOT NULL,
+                payload BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                created REAL NOT NULL,
+                accessed REAL NOT NULL,
+                PRIMARY KEY (video_id, language)
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS transcripts_accessed ON transcripts (accessed)")
+
+    def get_bytes(self, video_id: str, language: str = 'en') -> Optional[bytes]:
+        """Return the cached payload, or None on a miss or expired entry"""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload, created FROM transcripts WHERE video_id = ? AND language = ?",
+                (video_id, language)
+            ).fetchone()
+
+            if row is None:
+                self.misses += 1
+                return None
+
+            payload, created = row
+            if self.ttl_seconds and now - created > self.ttl_seconds:
+                self._conn.execute(
+                    "DELETE FROM transcripts WHERE video_id = ? AND language = ?",
+                    (video_id, language)
+                )
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._conn.execute(
+                "UPDATE transcripts SET accessed = ? WHERE video_id = ? AND language = ?",
+                (now, video_id, language)
+            )
+            self.hits += 1
+
+        return zlib.decompress(payload)
+
+    def present(self, video_ids: Iterable[str], language: str = 'en') -> Set[str]:
+        """The given videos that have an unexpired entry, without counting hits or touching LRU order"""
+        video_ids = list(video_ids)
+        oldest = time.time() - self.ttl_seconds if self.ttl_seconds else 0
+        present = set()
+        with self._lock:
+            # Stay under SQLite's bound-parameter limit
+            for start in range(0, len(video_ids), 500):
+                batch = video_ids[start:start + 500]
+                present.update(video_id for video_id, in self._conn.execute(
+                    f"SELECT video_id FROM transcripts WHERE language = ? AND created >= ? "
+                    f"AND video_id IN ({','.join('?' * len(batch))})",
+                    [language, oldest] + batch
+                ))
+        return present
+
+    def put_bytes(self, video_id: str, language: str, data: bytes) -> None:
+        """Store a payload and evict least-recently-used entries over the size cap"""
+        payload = zlib.compress(data, 6)
+        if self.max_bytes and len(payload) > self.max_bytes:
+            return
+
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO transcripts (video_id, language, payload, size, created, accessed) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (video_id, language, payload, len(payload), now, now)
+            )
+            self._evict()
+
+    def get(self, video_id: str, language: str = 'en') -> Optional[str]:
+        """Return a cached transcript string"""
+        data = self.get_bytes(video_id, language)
+        return data.decode('utf-8') if data is not None else None
+
+    def put(self, video_id: str, language: str, transcript: str) -> None:
+        """Cache a transcript string"""
+        self.put_bytes(video_id, language, transcript.encode('utf-8'))
+
+    def _evict(self) -> None:
+        """Drop expired entries, then the oldest-accessed ones until under the cap"""
+        if self.ttl_seconds:
+            cursor = self._conn.execute(
+                "DELETE FROM transcripts WHERE created < ?",
+                (time.time() - self.ttl_seconds,)
+            )
+            self.expirations += max(cursor.rowcount, 0)
+
+        if not self.max_bytes:
+            return
+
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM transcripts").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        victims = []
+        for video_id, language, size in self._conn.execute(
+            "SELECT video_id, language, size FROM transcripts ORDER BY accessed ASC"
+        ):
+            if total <= self.max_bytes:
+                break
+            victims.append((video_id, language))
+            total -= size
+
+        self._conn.executemany(
+            "DELETE FROM transcripts WHERE video_id = ? AND language = ?",
+            victims
+        )
+        self.evictions += len(victims)
+
+    def stats(self) -> Dict[str, int]:
+        """Return hit/miss/eviction counters and current storage usage"""
+        with self._lock:
+            entries, size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM transcripts"
+            ).fetchone()
+
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'expirations': self.expirations,
+            'entries': entries,
+            'bytes': size,
+            'max_bytes': self.max_bytes,
+        }
+
+    def clear(self) -> None:
+        """Remove every cached transcript"""
+        with self._lock:
+            self._conn.execute("DELETE FROM transcripts")
+
+
+_shared_cache = None
+_shared_cache_lock = threading.Lock()
+
+
+def get_transcript_cache() -> TranscriptCache:
+    """Return the process-wide transcript cache shared by all sessions"""
+    global _shared_cache
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            _shared_cache = TranscriptCache(
+                path=os.path.join(CACHE_CONFIG['dir'], 'transcripts.sqlite3'),
+                max_bytes=CACHE_CONFIG['transcript_max_bytes'],
+                ttl_seconds=CACHE_CONFIG['transcript_ttl_seconds'],
+            )
+        return _shared_cache
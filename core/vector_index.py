@@ -0,0 +1,180 @@
+import hashlib
+import json
+import math
+import os
+import zlib
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+from numpy.lib.format import open_memmap
+
+from .retrieval import tokenize
+
+# Rows embedded per batch while building, bounding peak memory on long videos
+BUILD_BATCH = 1024
+# Rows scored per block when the matrix is int8, bounding the float32 temporary
+SEARCH_BLOCK = 8192
+
+
+class Embedder:
+    """Turns texts into L2-normalized float32 vectors; subclass to plug in a model"""
+    name = 'base'
+    dim = 0
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        raise NotImplementedError
+
+
+class HashingEmbedder(Embedder):
+    """Offline embedder: signed feature hashing of unigrams and bigrams.
+
+    Needs no network, vocabulary or fitting, so vectors built by one process
+    can be queried by any other. Term counts are dampened with ``1 + log(tf)``.
+    """
+    name = 'hashing'
+
+    def __init__(self, dim: int = 1024):
+        self.dim = dim
+
+    def _features(self, text: str) -> List[str]:
+        tokens = tokenize(text)
+        return tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            counts = {}
+            for feature in self._features(text):
+                # crc32 is stable across processes, unlike hash()
+                h = zlib.crc32(feature.encode('utf-8'))
+                slot = h % self.dim
+                sign = 1.0 if h & 0x80000000 else -1.0
+                counts[slot] = counts.get(slot, 0.0) + sign
+            for slot, value in counts.items():
+                if value:
+                    vectors[row, slot] = math.copysign(1.0 + math.log(abs(value)), value)
+
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        np.divide(vectors, norms, out=vectors, where=norms > 0)
+        return vectors
+
+
+def fingerprint(texts: Sequence[str], embedder: Embedder, dtype: str) -> str:
+    """Identify a chunk list + embedder so a stale on-disk index is never reused"""
+    digest = hashlib.sha1(f"{embedder.name}:{embedder.dim}:{dtype}:{len(texts)}".encode('utf-8'))
+    for text in texts:
+        digest.update(text.encode('utf-8'))
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+class DenseVectorIndex:
+    """Chunk vectors in one contiguous float32 or int8 matrix.
+
+    Persisted indexes are opened with ``mmap_mode='r'``, so reopening a video
+    costs a file open rather than a rebuild, and pages are shared between
+    processes through the OS page cache.
+    """
+
+    def __init__(self, vectors: np.ndarray, embedder: Embedder, scales: Optional[np.ndarray] = None):
+        self.vectors = vectors
+        self.scales = scales
+        self.embedder = embedder
+
+    def __len__(self) -> int:
+        return self.vectors.shape[0]
+
+    @property
+    def nbytes(self) -> int:
+        return self.vectors.nbytes + (self.scales.nbytes if self.scales is not None else 0)
+
+    @staticmethod
+    def _quantize(block: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Symmetric per-row int8 quantization"""
+        scales = np.abs(block).max(axis=1) / 127.0
+        scales[scales == 0] = 1.0
+        return np.round(block / scales[:, None]).astype(np.int8), scales.astype(np.float32)
+
+    @classmethod
+    def build(cls, texts: Sequence[str], embedder: Embedder, dtype: str = 'float32') -> 'DenseVectorIndex':
+        """Embed every chunk into an in-memory matrix"""
+        vectors = np.zeros((len(texts), embedder.dim), dtype=dtype)
+        scales = np.ones(len(texts), dtype=np.float32) if dtype == 'int8' else None
+        cls._fill(vectors, scales, texts, embedder)
+        return cls(vectors, embedder, scales)
+
+    @classmethod
+    def _fill(cls, vectors: np.ndarray, scales: Optional[np.ndarray], texts: Sequence[str],
+              embedder: Embedder) -> None:
+        for start in range(0, len(texts), BUILD_BATCH):
+            block = embedder.embed(texts[start:start + BUILD_BATCH])
+            end = start + block.shape[0]
+            if scales is not None:
+                vectors[start:end], scales[start:end] = cls._quantize(block)
+            else:
+                vectors[start:end] = block
+
+    @classmethod
+    def open_or_build(cls, directory: str, texts: Sequence[str], embedder: Embedder,
+                      dtype: str = 'float32') -> 'DenseVectorIndex':
+        """Memory-map the index saved in ``directory``, (re)building it if stale"""
+        if not texts:
+            return cls.build(texts, embedder, dtype)
+
+        key = fingerprint(texts, embedder, dtype)
+        meta_path = os.path.join(directory, 'meta.json')
+        vectors_path = os.path.join(directory, 'vectors.npy')
+        scales_path = os.path.join(directory, 'scales.npy')
+
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                if json.load(f).get('fingerprint') == key:
+                    return cls._open(vectors_path, scales_path, embedder, dtype)
+        except (OSError, ValueError):
+            pass
+
+        os.makedirs(directory, exist_ok=True)
+        # Embed straight into the on-disk matrix, then swap the files into place
+        vectors = open_memmap(vectors_path + '.tmp', mode='w+', dtype=dtype, shape=(len(texts), embedder.dim))
+        scales = np.ones(len(texts), dtype=np.float32) if dtype == 'int8' else None
+        cls._fill(vectors, scales, texts, embedder)
+        vectors.flush()
+        del vectors
+        os.replace(vectors_path + '.tmp', vectors_path)
+        if scales is not None:
+            np.save(scales_path, scales)
+
+        with open(meta_path + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump({'fingerprint': key, 'embedder': embedder.name, 'dim': embedder.dim,
+                       'dtype': dtype, 'count': len(texts)}, f)
+        os.replace(meta_path + '.tmp', meta_path)
+
+        return cls._open(vectors_path, scales_path, embedder, dtype)
+
+    @classmethod
+    def _open(cls, vectors_path: str, scales_path: str, embedder: Embedder, dtype: str) -> 'DenseVectorIndex':
+        vectors = np.load(vectors_path, mmap_mode='r')
+        scales = np.load(scales_path) if dtype == 'int8' else None
+        return cls(vectors, embedder, scales)
+
+    def scores(self, query: str) -> np.ndarray:
+        """Cosine similarity of the query against every chunk"""
+        q = self.embedder.embed([query])[0]
+        if self.scales is None:
+            return self.vectors @ q
+
+        out = np.empty(len(self), dtype=np.float32)
+        for start in range(0, len(self), SEARCH_BLOCK):
+            block = self.vectors[start:start + SEARCH_BLOCK]
+            out[start:start + block.shape[0]] = block @ q
+        return out * self.scales
+
+    def search(self, query: str, top_k: int = 4) -> List[Tuple[int, float]]:
+        """Return up to ``top_k`` (chunk id, score) pairs with positive similarity, best first"""
+        if not len(self):
+            return []
+        scores = self.scores(query)
+        k = min(top_k, len(scores))
+        candidates = np.argpartition(-scores, k - 1)[:k]
+        candidates = candidates[np.argsort(-scores[candidates])]
+        return [(int(i), float(scores[i])) for i in candidates if scores[i] > 0]
@@ -0,0 +1,106 @@
+from collections import Counter
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .chunker import CHARS_PER_TOKEN, ChunkStore
+from .retrieval import tokenize
+from .subtitle_parser import ParsedTranscript
+
+# Code points str.split() treats as whitespace in practice
+_SPACES = np.array([0x20, 0x09, 0x0A, 0x0B, 0x0C, 0x0D, 0xA0], dtype=np.uint32)
+
+
+class VideoStats:
+    """Analytics for one loaded video, computed once at load time.
+
+    The transcript is scanned once as a NumPy code-point array to find word
+    starts. Per-cue and per-chunk word counts then come from
+    ``searchsorted`` over those offsets. Rendering only reads attributes, so
+    reruns cost nothing however long the video is.
+    """
+
+    def __init__(self, chars: int, words: int, chunk_tokens: np.ndarray, chunk_words: np.ndarray,
+                 top_terms: List[Tuple[str, int]], pace_minutes: Optional[np.ndarray] = None,
+                 words_per_minute: Optional[np.ndarray] = None, duration_seconds: Optional[float] = None):
+        self.chars = chars
+        self.words = words
+        self.chunk_tokens = chunk_tokens
+        self.chunk_words = chunk_words
+        self.top_terms = top_terms
+        self.pace_minutes = pace_minutes
+        self.words_per_minute = words_per_minute
+        self.duration_seconds = duration_seconds
+
+        self.chunk_count = len(chunk_tokens)
+        self.avg_words_per_chunk = int(chunk_words.mean()) if self.chunk_count else 0
+        if self.chunk_count:
+            self.chunk_token_percentiles = dict(zip(
+                ('p10', 'p50', 'p90', 'max'), np.percentile(chunk_tokens, [10, 50, 90, 100]).astype(int).tolist()))
+            counts, edges = np.histogram(chunk_tokens, bins=min(20, max(self.chunk_count, 1)))
+            self.chunk_token_histogram = (counts, edges)
+        else:
+            self.chunk_token_percentiles = {}
+            self.chunk_token_histogram = (np.zeros(0, dtype=np.int64), np.zeros(1))
+        self.average_wpm = (words / (duration_seconds / 60.0)) if duration_seconds else None
+
+    @classmethod
+    def compute(cls, text: str, chunks: Sequence[str], timing: Optional[ParsedTranscript] = None,
+                bucket_seconds: int = 60, top_k: int = 20) -> 'VideoStats':
+        word_starts = _word_starts(text)
+
+        if isinstance(chunks, ChunkStore):
+            starts = np.frombuffer(chunks.starts, dtype=np.int64)
+            ends = np.frombuffer(chunks.ends, dtype=np.int64)
+            chunk_chars = ends - starts
+            chunk_words = np.searchsorted(word_starts, ends) - np.searchsorted(word_starts, starts)
+        else:
+            chunk_chars = np.fromiter((len(chunk) for chunk in chunks), dtype=np.int64, count=len(chunks))
+            chunk_words = np.fromiter((len(chunk.split()) for chunk in chunks), dtype=np.int64, count=len(chunks))
+        chunk_tokens = np.ceil(chunk_chars / CHARS_PER_TOKEN).astype(np.int64)
+
+        top_terms = Counter(tokenize(text)).most_common(top_k)
+
+        pace_minutes = words_per_minute = duration = None
+        if timing is not None and len(timing) and timing.text == text:
+            pace_minutes, words_per_minute, duration = _pace(timing, word_starts, bucket_seconds)
+
+        return cls(len(text), len(word_starts), chunk_tokens, chunk_words, top_terms,
+                   pace_minutes, words_per_minute, duration)
+
+    @property
+    def nbytes(self) -> int:
+        arrays = [self.chunk_tokens, self.chunk_words, self.pace_minutes, self.words_per_minute]
+        return sum(array.nbytes for array in arrays if array is not None)
+
+
+def _word_starts(text: str) -> np.ndarray:
+    """Character offsets where a whitespace-delimited word begins"""
+    if not text:
+        return np.zeros(0, dtype=np.int64)
+    codes = np.frombuffer(text.encode('utf-32-le'), dtype=np.uint32)
+    space = np.isin(codes, _SPACES)
+    starts = ~space
+    starts[1:] &= space[:-1]
+    return np.flatnonzero(starts)
+
+
+def _pace(timing: ParsedTranscript, word_starts: np.ndarray,
+          bucket_seconds: int) -> Tuple[np.ndarray, np.ndarray, float]:
+    """Words per minute in fixed time buckets, from per-cue word counts"""
+    cue_start = np.frombuffer(timing.start_ms, dtype=np.int64)
+    cue_end = np.frombuffer(timing.end_ms, dtype=np.int64)
+    text_start = np.frombuffer(timing.text_start, dtype=np.int64)
+    text_end = np.frombuffer(timing.text_end, dtype=np.int64)
+    cue_words = np.searchsorted(word_starts, text_end) - np.searchsorted(word_starts, text_start)
+
+    duration_ms = int(cue_end.max())
+    bucket_ms = bucket_seconds * 1000
+    buckets = int(cue_start.max()) // bucket_ms + 1
+    words = np.bincount(cue_start // bucket_ms, weights=cue_words, minlength=buckets)
+
+    # The last bucket is usually partial; rate it over the time it actually covers
+    seconds = np.full(buckets, float(bucket_seconds))
+    seconds[-1] = max((duration_ms - (buckets - 1) * bucket_ms) / 1000.0, 1.0)
+    minutes = np.arange(buckets) * (bucket_seconds / 60.0)
+    return minutes, words / (seconds / 60.0), duration_ms / 1000.0
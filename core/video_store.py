@@ -0,0 +1,175 @@
+import threading
+import weakref
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Callable, Dict, Hashable, List, Optional
+
+from .chunker import ChunkStore
+from .retrieval import BM25Index
+from .subtitle_parser import ParsedTranscript
+from .vector_index import DenseVectorIndex
+from .video_stats import VideoStats
+from utils.constants import VIDEO_STORE_CONFIG
+
+
+class VideoEntry:
+    """Everything derived from one video's transcript, shared read-only by all sessions.
+
+    Nothing in an entry is modified after it is built. Sessions replace their
+    references when they load another video; they never mutate these objects.
+    """
+    __slots__ = ('video_id', 'parsed', 'chunks', 'search_index', 'vector_index', 'video_stats',
+                 'strategy', 'nbytes', 'refs')
+
+    def __init__(self, video_id: str, parsed: ParsedTranscript, chunks: ChunkStore, search_index: BM25Index,
+                 vector_index: Optional[DenseVectorIndex] = None, video_stats: Optional[VideoStats] = None,
+                 strategy: Optional[str] = None):
+        self.video_id = video_id
+        self.parsed = parsed
+        self.chunks = chunks
+        self.search_index = search_index
+        self.vector_index = vector_index
+        self.video_stats = video_stats
+        self.strategy = strategy
+        self.refs = 0
+        self.nbytes = (parsed.nbytes + chunks.nbytes + search_index.nbytes
+                       + (vector_index.nbytes if vector_index is not None else 0)
+                       + (video_stats.nbytes if video_stats is not None else 0))
+
+    @property
+    def transcript(self) -> str:
+        return self.parsed.text
+
+
+class VideoHandle:
+    """A session's counted reference to a VideoEntry.
+
+    The entry cannot be evicted while any handle on it is held. A handle is
+    released explicitly with ``release()``, or when it is garbage collected
+    along with its session.
+    """
+    __slots__ = ('entry', '_finalizer', '__weakref__')
+
+    def __init__(self, store: 'VideoStore', key: Hashable, entry: VideoEntry):
+        self.entry = entry
+        self._finalizer = weakref.finalize(self, store._release, key)
+
+    def release(self) -> None:
+        self._finalizer()
+
+    @property
+    def released(self) -> bool:
+        return not self._finalizer.alive
+
+
+class VideoStore:
+    """Process-wide store of loaded videos, keyed by video id and chunking settings.
+
+    Memory grows with distinct videos rather than with sessions. Concurrent
+    loads of the same video build it once, and the other callers wait for
+    that build. Entries nobody holds are evicted least-recently-used first
+    once the total passes ``max_bytes``. Held entries are never evicted, so
+    the total can exceed the budget while they are all in use.
+    """
+
+    def __init__(self, max_bytes: int = VIDEO_STORE_CONFIG['max_bytes']):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[Hashable, VideoEntry]" = OrderedDict()
+        self._building: Dict[Hashable, Future] = {}
+        self._bytes = 0
+        # Reentrant: a handle finalizer may run from garbage collection while the lock is held
+        self._lock = threading.RLock()
+
+    def acquire(self, key: Hashable, build: Callable[[], VideoEntry]) -> VideoHandle:
+        """Return a handle on ``key``'s entry, calling ``build`` only if no one has yet"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self.hits += 1
+                return self._handle(key, entry)
+            future = self._building.get(key)
+            owner = future is None
+            if owner:
+                self.misses += 1
+                future = self._building[key] = Future()
+
+        if not owner:
+            # Another session is already building this video
+            entry = future.result()
+            with self._lock:
+                self.hits += 1
+                return self._handle(key, entry)
+
+        try:
+            entry = build()
+        except BaseException as e:
+            with self._lock:
+                del self._building[key]
+            future.set_exception(e)
+            raise
+
+        with self._lock:
+            del self._building[key]
+            self._entries[key] = entry
+            self._bytes += entry.nbytes
+            handle = self._handle(key, entry)
+            self._evict()
+        future.set_result(entry)
+        return handle
+
+    def _handle(self, key: Hashable, entry: VideoEntry) -> VideoHandle:
+        entry.refs += 1
+        self._entries.move_to_end(key)
+        return VideoHandle(self, key, entry)
+
+    def _release(self, key: Hashable) -> None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry.refs -= 1
+                self._evict()
+
+    def _evict(self) -> None:
+        if self._bytes <= self.max_bytes:
+            return
+        for key in [key for key, entry in self._entries.items() if entry.refs <= 0]:
+            entry = self._entries.pop(key)
+            self._bytes -= entry.nbytes
+            self.evictions += 1
+            if self._bytes <= self.max_bytes:
+                break
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                'videos': len(self._entries),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'pinned': sum(1 for entry in self._entries.values() if entry.refs > 0),
+                'sessions': sum(entry.refs for entry in self._entries.values()),
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+            }
+
+    def usage(self) -> List[Dict]:
+        """Per-video memory and reference counts, most recently used first"""
+        with self._lock:
+            return [{'video_id': entry.video_id, 'bytes': entry.nbytes, 'sessions': entry.refs}
+                    for entry in reversed(self._entries.values())]
+
+
+_shared_store = None
+_shared_store_lock = threading.Lock()
+
+
+def get_video_store() -> VideoStore:
+    """Return the process-wide video store shared by all sessions"""
+    global _shared_store
+    with _shared_store_lock:
+        if _shared_store is None:
+            _shared_store = VideoStore()
+        return _shared_store
@@ -0,0 +1,60 @@
+import argparse
+import json
+import sys
+
+from dotenv import load_dotenv
+
+# Before the config is imported, so .env settings such as TUBEGPT_LLM_BACKEND apply
+load_dotenv()
+
+from core.gemini_service import GeminiTubeGPT
+from core.ingest import BulkIngester, expand_sources, format_summary, get_ingest_manifest
+from utils.constants import INGEST_CONFIG, RATE_LIMIT_CONFIG, TRANSCRIPT_CONFIG
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Pre-warm TubeGPT's transcript cache and indexes for many videos without the UI")
+    parser.add_argument('sources', nargs='+',
+                        help="video URLs or ids, playlist or channel URLs, or files listing any of these")
+    parser.add_argument('--fetch-concurrency', type=int, default=INGEST_CONFIG['fetch_concurrency'])
+    parser.add_argument('--index-workers', type=int, default=INGEST_CONFIG['index_workers'],
+                        help="processes that chunk and embed transcripts when retrieval uses dense vectors "
+                             "(default: one per CPU)")
+    parser.add_argument('--max-wait', type=float, default=INGEST_CONFIG['max_wait_seconds'],
+                        help="seconds a fetch may wait for a rate-limiter slot before the strategy fails")
+    parser.add_argument('--hedged', action='store_true',
+                        help="race the fetch strategies as the app does (uses more of the rate limit)")
+    parser.add_argument('--retry-failed', action='store_true', help="retry videos that failed on an earlier run")
+    parser.add_argument('--list', action='store_true', help="only print the video ids the sources expand to")
+    parser.add_argument('--json', help="also write the summary to this JSON file")
+    args = parser.parse_args()
+
+    # A batch job should queue on the limiter rather than fail fast like the UI
+    RATE_LIMIT_CONFIG['max_wait_seconds'] = args.max_wait
+    TRANSCRIPT_CONFIG['hedged'] = args.hedged
+
+    video_ids = expand_sources(args.sources, GeminiTubeGPT.extract_video_id,
+                               on_error=lambda message: print(message, file=sys.stderr))
+    if args.list:
+        print("\n".join(video_ids))
+        return
+    if not video_ids:
+        print("No videos to ingest", file=sys.stderr)
+        sys.exit(1)
+
+    ingester = BulkIngester(get_ingest_manifest(), args.fetch_concurrency, args.index_workers, args.retry_failed)
+    try:
+        summary = ingester.run(video_ids)
+    except KeyboardInterrupt:
+        print("\nInterrupted; rerun the same command to resume", file=sys.stderr)
+        sys.exit(130)
+
+    print(format_summary(summary))
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(summary, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,25 @@
+import argparse
+
+import uvicorn
+from dotenv import load_dotenv
+
+# Before the config is imported, so .env settings such as TUBEGPT_LLM_BACKEND apply
+load_dotenv()
+
+from utils.constants import API_CONFIG
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve TubeGPT's load, ask and summarize endpoints over HTTP")
+    parser.add_argument('--host', default=API_CONFIG['host'])
+    parser.add_argument('--port', type=int, default=API_CONFIG['port'])
+    parser.add_argument('--workers', type=int, default=1,
+                        help="worker processes; each has its own request limits and in-memory caches")
+    args = parser.parse_args()
+
+    uvicorn.run('core.api_server:create_app', factory=True, host=args.host, port=args.port,
+                workers=args.workers, log_level='info')
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+import pytest
+
+from core.answer_cache import AnswerCache
+
+CONFIG = {'model': 'fake', 'temperature': 0.0}
+CONTEXT = "the company was founded in 1998 by two engineers and failed in 2004"
+
+
+def cache_with(question: str) -> AnswerCache:
+    cache = AnswerCache(near_duplicate=True)
+    cache.put('vid', question, CONFIG, CONTEXT, f"answer to {question}")
+    return cache
+
+
+@pytest.mark.parametrize('cached, asked', [
+    ("Who founded the company?", "When was the company founded?"),
+    ("Who are the speakers?", "Who are not the speakers?"),
+    ("Who are the speakers?", "Who aren't the speakers?"),
+    ("How did the company fail?", "Why did the company fail?"),
+    ("What did the company build?", "Where did the company build?"),
+])
+def test_different_questions_do_not_share_answers(cached, asked):
+    cache = cache_with(cached)
+    assert cache.get('vid', asked, CONFIG, CONTEXT) is None
+    assert cache.stats()['near_hits'] == 0
+
+
+def test_light_rewording_still_hits():
+    cache = cache_with("Who founded the company?")
+    assert cache.get('vid', "who   founded the company!!", CONFIG, CONTEXT) == "answer to Who founded the company?"
+    assert cache.get('vid', "So who founded the company?", CONFIG, CONTEXT) == "answer to Who founded the company?"
+    assert cache.stats()['near_hits'] == 1
+
+
+def test_near_duplicates_off_by_default():
+    cache = AnswerCache()
+    cache.put('vid', "Who founded the company?", CONFIG, CONTEXT, "two engineers")
+    assert cache.get('vid', "So who founded the company?", CONFIG, CONTEXT) is None
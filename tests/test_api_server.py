@@ -0,0 +1,77 @@
+import asyncio
+import threading
+import time
+
+from starlette.concurrency import run_in_threadpool
+
+from core.api_server import _drive
+from core.tracing import Tracer
+
+
+def traced_deltas(tracer: Tracer, threads: list, count: int = 5, delay: float = 0.0):
+    """A service-style stream: spans held open across ``yield``"""
+    try:
+        with tracer.span('question.answer'):
+            with tracer.span('llm.stream'):
+                for n in range(count):
+                    threads.append(threading.get_ident())
+                    time.sleep(delay)
+                    yield f"delta {n} "
+    finally:
+        threads.append(threading.get_ident())
+
+
+def test_stream_runs_on_one_thread_and_leaves_pool_stacks_clean():
+    tracer = Tracer()
+    threads = []
+
+    async def main():
+        received, seen_by_pool = [], []
+        async for delta in _drive(traced_deltas(tracer, threads)):
+            received.append(delta)
+            # Other requests run on the pool while the stream is paused
+            for _ in range(8):
+                seen_by_pool.append(await run_in_threadpool(tracer.current))
+        return received, seen_by_pool
+
+    received, seen_by_pool = asyncio.run(main())
+    assert received == [f"delta {n} " for n in range(5)]
+    assert seen_by_pool == [None] * len(seen_by_pool)
+    assert len(set(threads)) == 1
+    assert threads[0] != threading.get_ident()
+    assert [span.name for span in tracer._spans] == ['llm.stream', 'question.answer']
+
+
+def test_abandoned_stream_is_closed_on_its_own_thread():
+    tracer = Tracer()
+    threads = []
+
+    async def main():
+        stream = _drive(traced_deltas(tracer, threads, count=1000, delay=0.005))
+        await stream.__anext__()
+        await stream.aclose()
+        for _ in range(100):
+            if len(tracer._spans) == 2:
+                break
+            await asyncio.sleep(0.01)
+
+    asyncio.run(main())
+    assert len(set(threads)) == 1
+    assert len(threads) < 1000
+    assert [span.name for span in tracer._spans] == ['llm.stream', 'question.answer']
+
+
+def test_stream_errors_reach_the_client():
+    def failing():
+        yield "partial"
+        raise ValueError("backend failed")
+
+    async def main():
+        received = []
+        try:
+            async for delta in _drive(failing()):
+                received.append(delta)
+        except ValueError as e:
+            return received, str(e)
+
+    assert asyncio.run(main()) == (["partial"], "backend failed")
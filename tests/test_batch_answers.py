@@ -0,0 +1,43 @@
+import threading
+
+from core.answer_cache import AnswerCache
+from core.gemini_service import GeminiTubeGPT
+from core.llm_backend import FakeBackend
+
+QUESTIONS = ["What is the main topic?", "Who is speaking?", "What are the key points?"]
+
+
+def attach(service: GeminiTubeGPT, video_id: str, word: str) -> None:
+    """Point the service at a made-up video whose every chunk mentions ``word``"""
+    service.video_id = video_id
+    service.transcript = " ".join(f"{word} sentence number {n}." for n in range(400))
+    service.parsed_transcript = None
+    service.chunks = service.chunk_transcript(service.transcript)
+
+
+def test_precompute_keeps_the_video_it_started_with():
+    release = threading.Event()
+    prompts = []
+
+    def respond(prompt):
+        release.wait(5)
+        prompts.append(prompt)
+        return "answer"
+
+    service = GeminiTubeGPT()
+    service.set_backend(FakeBackend(latency_ms=0, latency_distribution='fixed', responder=respond))
+    service.answer_cache = AnswerCache()
+    attach(service, 'videoAAAAAA', 'alpha')
+
+    assert service.start_precompute(QUESTIONS)
+    # The user loads another video while the batch is still running
+    attach(service, 'videoBBBBBB', 'bravo')
+    release.set()
+    service._precompute_thread.join(10)
+
+    assert len(prompts) == len(QUESTIONS)
+    assert all('alpha' in prompt and 'bravo' not in prompt for prompt in prompts)
+    assert {key[0] for key in service.answer_cache._entries} == {'videoAAAAAA'}
+    # The finished batch belongs to the earlier video, not the one on screen
+    assert service.last_batch_results == []
+    assert service.video_id == 'videoBBBBBB'
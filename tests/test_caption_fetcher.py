@@ -0,0 +1,86 @@
+import functools
+import os
+import threading
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from core.caption_fetcher import CaptionFetcher, select_caption_track
+
+FIXTURES = os.path.join(os.path.dirname(__file__), 'fixtures', 'captions')
+TEXT = "Welcome to the show today we talk about & caching"
+
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture(scope='module')
+def caption_server():
+    """A local stand-in for YouTube's timed-text endpoint serving the fixture tracks"""
+    server = ThreadingHTTPServer(('127.0.0.1', 0), functools.partial(QuietHandler, directory=FIXTURES))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def fetcher():
+    with requests.Session() as session:
+        yield CaptionFetcher(session=session, timeout=5)
+
+
+@pytest.mark.parametrize('ext', ['json3', 'srv3', 'vtt'])
+def test_fetch_track_parses_each_format(caption_server, fetcher, ext):
+    transcript, size = fetcher.fetch_track({'url': f"{caption_server}/sample.{ext}", 'ext': ext})
+    assert transcript.text == TEXT
+    assert list(transcript.start_ms) == [1200, 3600]
+    assert transcript.cue(0) == (1200, 3600, "Welcome to the show")
+    assert size == os.path.getsize(os.path.join(FIXTURES, f'sample.{ext}'))
+
+
+def test_fetch_transcript_uses_the_selected_track(caption_server, fetcher):
+    info = {
+        'subtitles': {'en': [{'url': f"{caption_server}/sample.srv3", 'ext': 'srv3'}]},
+        'automatic_captions': {'en': [{'url': f"{caption_server}/missing.json3", 'ext': 'json3'}]},
+    }
+    assert fetcher.fetch_transcript(info).text == TEXT
+
+
+def test_download_refuses_tracks_over_the_byte_limit(caption_server):
+    with requests.Session() as session:
+        fetcher = CaptionFetcher(session=session, timeout=5, max_bytes=64)
+        with pytest.raises(ValueError, match="larger than 64 bytes"):
+            fetcher.fetch_track({'url': f"{caption_server}/sample.vtt", 'ext': 'vtt'})
+
+
+def test_missing_track_raises_http_error(caption_server, fetcher):
+    with pytest.raises(requests.HTTPError):
+        fetcher.download(f"{caption_server}/missing.vtt")
+
+
+def test_select_prefers_uploaded_subtitles_over_auto_captions():
+    uploaded = {'url': 'https://example.test/uploaded.vtt', 'ext': 'vtt'}
+    info = {
+        'automatic_captions': {'en': [{'url': 'https://example.test/auto.json3', 'ext': 'json3'}]},
+        'subtitles': {'en': [uploaded]},
+    }
+    # Uploaded subtitles win even in a less preferred format
+    assert select_caption_track(info) is uploaded
+
+
+def test_select_orders_by_language_then_format_and_skips_tracks_without_url():
+    info = {
+        'subtitles': {'de': [{'url': 'https://example.test/de.json3', 'ext': 'json3'}]},
+        'automatic_captions': {
+            'en': [{'ext': 'json3'},
+                   {'url': 'https://example.test/en.vtt', 'ext': 'vtt'},
+                   {'url': 'https://example.test/en.srv3', 'ext': 'srv3'}],
+        },
+    }
+    assert select_caption_track(info)['url'] == 'https://example.test/en.srv3'
+    assert select_caption_track({'subtitles': {'de': info['subtitles']['de']}}) is None
@@ -0,0 +1,40 @@
+import random
+
+import pytest
+
+from core.chunker import TokenChunker
+
+WORDS = "model data video people time work going really think about".split()
+
+
+def unpunctuated(words: int, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+
+@pytest.mark.parametrize('chunk_tokens, overlap_tokens', [(256, 48), (128, 32), (64, 8)])
+def test_unpunctuated_text_keeps_the_configured_overlap(chunk_tokens, overlap_tokens):
+    text = unpunctuated(4000)
+    chunker = TokenChunker(chunk_tokens, overlap_tokens)
+    spans = list(chunker.iter_spans(text))
+    overlap_chars = overlap_tokens * chunker.chars_per_token
+    longest_word = max(len(word) for word in WORDS) + 1
+
+    assert len(spans) > 2
+    for (start, end), (next_start, next_end) in zip(spans, spans[1:]):
+        assert end - start <= chunk_tokens * chunker.chars_per_token
+        shared = end - next_start
+        # Cuts land on whitespace, so the overlap can fall short by up to a word
+        assert overlap_chars - 2 * longest_word <= shared <= overlap_chars
+        assert text[next_start:end] == text[next_start:next_end][:shared]
+    assert spans[-1][1] == len(text)
+
+
+def test_punctuated_chunks_are_unchanged_by_hard_splitting():
+    rng = random.Random(1)
+    text = " ".join(" ".join(rng.choice(WORDS) for _ in range(rng.randint(5, 15))) + "." for _ in range(400))
+    spans = list(TokenChunker(256, 48).iter_spans(text))
+    # Every chunk still starts and ends on a sentence boundary
+    for start, end in spans:
+        assert text[end - 1] == "."
+        assert start == 0 or text[start - 2] == "."
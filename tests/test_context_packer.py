@@ -0,0 +1,58 @@
+import random
+
+import pytest
+
+from core.chunker import TokenChunker, estimate_tokens
+from core.context_packer import ContextPacker
+from utils.constants import CHUNK_CONFIG
+
+SENTENCE = "The speaker explains how the cache keeps answers for repeated questions. "
+
+
+def test_defaults_match_the_old_four_chunk_selection():
+    packer = ContextPacker()
+    assert packer.candidates == 4
+    assert packer.budget_tokens == 4 * CHUNK_CONFIG['chunk_tokens']
+
+
+def test_derived_candidates_can_fill_the_budget():
+    packer = ContextPacker(budget_tokens=1536, chunk_tokens=256, candidates=None)
+    assert packer.candidates * 256 > packer.budget_tokens
+    assert ContextPacker(candidates=3).candidates == 3
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_packed_context_is_never_larger_than_the_plain_join(seed):
+    rng = random.Random(seed)
+    words = "model data cache people video answer question token budget overlap".split()
+    text = " ".join(rng.choice(words) + ("." if rng.random() < 0.1 else "") for _ in range(8000))
+    chunks = TokenChunker(CHUNK_CONFIG['chunk_tokens'], CHUNK_CONFIG['overlap_tokens']).chunk_store(text)
+    packer = ContextPacker()
+    # A focused question usually ranks the top chunk's neighbours too
+    top = rng.randrange(1, len(chunks) - 1)
+    ranked = list(dict.fromkeys([top, top + 1, top - 1] + rng.sample(range(len(chunks)), packer.candidates)))
+    ranked = ranked[:packer.candidates]
+    plain = estimate_tokens(packer.separator.join(chunks[doc_id] for doc_id in ranked))
+    packed = packer.pack(chunks, ranked)
+    assert packed.tokens <= plain
+    assert packed.tokens <= packer.budget_tokens
+
+
+def test_candidates_fill_the_budget_beyond_four_chunks():
+    chunks = TokenChunker(256, 48).chunk_store(SENTENCE * 400)
+    packer = ContextPacker(budget_tokens=1536, chunk_tokens=256, candidates=None)
+    packed = packer.pack(chunks, list(range(packer.candidates)))
+    # Adjacent chunks share their overlap, so a sixth whole chunk still fits
+    assert packed.chunks == 1536 // 256
+    assert 4 * 256 < packed.tokens <= 1536
+    assert packed.unpacked_tokens > packed.tokens
+    assert packed.dropped == packer.candidates - packed.chunks
+
+
+def test_over_budget_top_chunk_is_clipped_for_plain_texts():
+    chunks = ["word " * 2000, "short chunk"]
+    packed = ContextPacker(budget_tokens=100).pack(chunks, [0, 1])
+    assert packed.tokens <= 100
+    assert estimate_tokens(packed.text) == packed.tokens
+    assert packed.text == chunks[0][:len(packed.text)]
+    assert packed.dropped == 1
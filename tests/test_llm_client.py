@@ -0,0 +1,54 @@
+import asyncio
+import time
+
+import pytest
+
+from core.llm_backend import FakeBackend
+from core.llm_client import LLMClient, _get_loop_thread
+from utils.constants import LLM_CONFIG
+
+
+class StallingBackend(FakeBackend):
+    """Sends one delta, then never another"""
+
+    async def astream(self, prompt, generation_config=None):
+        yield "first"
+        await asyncio.sleep(3600)
+        yield "never"
+
+
+def free_slots(expected: int, wait: float = 2.0) -> int:
+    """Free slots in the process-wide semaphore once cancellations have run"""
+    semaphore = _get_loop_thread().semaphore
+    deadline = time.monotonic() + wait
+    while semaphore._value < expected and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return semaphore._value
+
+
+def test_closing_streams_early_returns_their_slots():
+    slots = LLM_CONFIG['max_concurrency']
+    backend = FakeBackend(latency_ms=0, latency_distribution='fixed', tokens_per_second=200, output_tokens=4000)
+    client = LLMClient(backend, queue_timeout=1.0, hedge_after=None)
+
+    for _ in range(2):
+        streams = [client.stream_text(f"question {n}") for n in range(slots)]
+        for stream in streams:
+            assert next(stream)
+        for stream in streams:
+            stream.close()
+        assert free_slots(slots) == slots
+
+    fast = LLMClient(FakeBackend(latency_ms=0, latency_distribution='fixed', output_tokens=8), queue_timeout=1.0)
+    assert fast.generate_text("after the abandoned streams")
+
+
+def test_a_stalled_stream_times_out_and_frees_its_slot():
+    slots = LLM_CONFIG['max_concurrency']
+    client = LLMClient(StallingBackend(latency_ms=0, latency_distribution='fixed'), timeout=0.2,
+                       queue_timeout=1.0, hedge_after=None)
+    stream = client.stream_text("stall")
+    assert next(stream) == "first"
+    with pytest.raises(asyncio.TimeoutError):
+        next(stream)
+    assert free_slots(slots) == slots
@@ -0,0 +1,84 @@
+import json
+
+from core.subtitle_parser import ParsedTranscript, parse_json3, parse_subtitle_bytes
+
+MANUAL_SRT = b"""1
+00:00:01,000 --> 00:00:02,000
+Yes.
+
+2
+00:00:02,000 --> 00:00:03,000
+Yes.
+
+3
+00:00:03,000 --> 00:00:04,000
+No.
+"""
+
+MANUAL_VTT = b"""WEBVTT
+
+00:00:10.000 --> 00:00:12.000
+<v Singer>La la la</v>
+
+00:00:12.000 --> 00:00:14.000
+<v Singer>La la la</v>
+
+00:00:14.000 --> 00:00:16.000
+La la la la
+"""
+
+AUTO_VTT = b"""WEBVTT
+Kind: captions
+Language: en
+
+00:00:00.000 --> 00:00:01.500 align:start position:0%
+ 
+so<00:00:00.300><c> today</c><00:00:00.600><c> we</c>
+
+00:00:01.500 --> 00:00:01.510 align:start position:0%
+so today we
+ 
+
+00:00:01.510 --> 00:00:03.000 align:start position:0%
+so today we
+talk<00:00:01.800><c> about</c><00:00:02.100><c> models</c>
+
+00:00:03.000 --> 00:00:03.010 align:start position:0%
+talk about models
+ 
+"""
+
+
+def test_manual_srt_keeps_repeated_lines():
+    transcript = parse_subtitle_bytes(MANUAL_SRT)
+    assert transcript.text == "Yes. Yes. No."
+    assert list(transcript.start_ms) == [1000, 2000, 3000]
+
+
+def test_manual_vtt_keeps_repeated_lyrics_and_prefixes():
+    transcript = parse_subtitle_bytes(MANUAL_VTT)
+    assert transcript.text == "La la la La la la La la la la"
+
+
+def test_auto_captions_drop_rolling_repeats():
+    transcript = parse_subtitle_bytes(AUTO_VTT)
+    assert transcript.text == "so today we talk about models"
+    assert [transcript.cue(i)[0] for i in range(len(transcript))] == [0, 1510]
+
+
+def test_entries_and_json3_keep_repeats():
+    entries = [{'text': 'Yes.', 'start': 1.0, 'duration': 1.0},
+               {'text': 'Yes.', 'start': 2.0, 'duration': 1.0},
+               {'text': 'No.', 'start': 3.0, 'duration': 1.0}]
+    assert ParsedTranscript.from_entries(entries).text == "Yes. Yes. No."
+
+    events = [{'tStartMs': n * 1000, 'dDurationMs': 1000, 'segs': [{'utf8': text}]}
+              for n, text in enumerate(["Yes.", "Yes.", "No."])]
+    assert parse_json3(json.dumps({'events': events})).text == "Yes. Yes. No."
+
+
+def test_overlapping_cues_drop_repeats():
+    entries = [{'text': 'we talk about models', 'start': 0.0, 'duration': 3.0},
+               {'text': 'we talk about models', 'start': 2.0, 'duration': 3.0},
+               {'text': 'and data', 'start': 5.0, 'duration': 1.0}]
+    assert ParsedTranscript.from_entries(entries).text == "we talk about models and data"
@@ -4,12 +4,30 @@ TubeGPT Utils Package
 This package contains utility functions, constants, and helper modules for the TubeGPT application.
 """
 
-from .constants import APP_CONFIG, QUICK_QUESTIONS, THEMES
+from .constants import APP_CONFIG, QUICK_QUESTIONS, THEMES, CACHE_CONFIG, TRANSCRIPT_CONFIG, RATE_LIMIT_CONFIG, CAPTION_CONFIG, RETRIEVAL_CONFIG, CHUNK_CONFIG, SUMMARY_CONFIG, ANSWER_CACHE_CONFIG, QA_CONFIG, LLM_CONFIG, FAKE_LLM_CONFIG, TRACING_CONFIG, VIDEO_STORE_CONFIG, INGEST_CONFIG, FAKE_TRANSCRIPT_CONFIG, API_CONFIG, MEMORY_CONFIG, CONTEXT_CONFIG
 
 __all__ = [
     'APP_CONFIG',
     'QUICK_QUESTIONS', 
-    'THEMES'
+    'THEMES',
+    'CACHE_CONFIG',
+    'TRANSCRIPT_CONFIG',
+    'RATE_LIMIT_CONFIG',
+    'CAPTION_CONFIG',
+    'RETRIEVAL_CONFIG',
+    'CHUNK_CONFIG',
+    'SUMMARY_CONFIG',
+    'ANSWER_CACHE_CONFIG',
+    'QA_CONFIG',
+    'LLM_CONFIG',
+    'FAKE_LLM_CONFIG',
+    'TRACING_CONFIG',
+    'VIDEO_STORE_CONFIG',
+    'INGEST_CONFIG',
+    'FAKE_TRANSCRIPT_CONFIG',
+    'API_CONFIG',
+    'MEMORY_CONFIG',
+    'CONTEXT_CONFIG'
 ]
 
 __version__ = '2.0.0'
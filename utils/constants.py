@@ -1,3 +1,5 @@
+import os
+
 APP_CONFIG = {
     'name': 'TubeGPT',
     'version': '2.0.0',
@@ -35,3 +37,190 @@ THEMES = {
         'text': '#1e293b'
     }
 }
+
+CACHE_CONFIG = {
+    'dir': os.getenv('TUBEGPT_CACHE_DIR', os.path.join(os.path.expanduser('~'), '.cache', 'tubegpt')),
+    'transcript_max_bytes': 256 * 1024 * 1024,
+    'transcript_ttl_seconds': 7 * 24 * 3600,
+}
+
+TRANSCRIPT_CONFIG = {
+    # 'youtube', or 'fake' to serve generated captions offline (load tests, benchmarks)
+    'source': os.environ.get('TUBEGPT_TRANSCRIPT_SOURCE', 'youtube'),
+    # Start the fetch strategies on a stagger instead of strictly one after another
+    'hedged': True,
+    'hedge_stagger_seconds': 2.0,
+    'strategy_timeout_seconds': 30.0,
+}
+
+RATE_LIMIT_CONFIG = {
+    # 'memory' shares buckets across sessions in one process; 'sqlite' also
+    # coordinates several app worker processes on the same host
+    'backend': os.getenv('TUBEGPT_RATE_LIMIT_BACKEND', 'memory'),
+    # endpoint -> (requests per second, burst capacity)
+    'limits': {
+        'youtube_watch': (0.5, 4),
+        'youtube_transcript_api': (0.2, 2),
+        'youtube_timedtext': (1.0, 4),
+    },
+    'default_limit': (1.0, 2),
+    # Longest a fetch strategy will wait for a slot before reporting itself rate limited
+    'max_wait_seconds': 3.0,
+}
+
+CAPTION_CONFIG = {
+    'languages': ('en', 'en-US', 'en-GB'),
+    # Preferred in-memory caption formats, best first
+    'formats': ('json3', 'srv3', 'vtt'),
+    'timeout_seconds': 15.0,
+    'max_bytes': 64 * 1024 * 1024,
+    'pool_connections': 4,
+    'pool_maxsize': 16,
+    'user_agent': 'Mozilla/5.0 (compatible; TubeGPT/2.0)',
+}
+
+RETRIEVAL_CONFIG = {
+    # 'bm25' scores chunks lexically and 'dense' by embedding similarity, both
+    # locally; 'cascade' reranks a local shortlist with one Gemini call; 'llm'
+    # asks Gemini to rate the first few chunks (legacy)
+    'mode': 'bm25',
+    # Local scorer and shortlist size for the cascade's first stage
+    'cascade_prefilter': 'bm25',
+    'cascade_candidates': 16,
+    'bm25_k1': 1.5,
+    'bm25_b': 0.75,
+    'embedding_dim': 1024,
+    # 'int8' quarters the on-disk/mmapped matrix at a small accuracy cost
+    'vector_dtype': 'float32',
+}
+
+CHUNK_CONFIG = {
+    # Roughly 1,000 characters per chunk with ~200 characters of overlap
+    'chunk_tokens': 256,
+    'overlap_tokens': 48,
+}
+
+SUMMARY_CONFIG = {
+    # Concurrent Gemini calls per summary
+    'max_workers': 4,
+    # Transcript tokens per map-stage prompt
+    'group_tokens': 6000,
+    # Largest set of partial summaries merged in one prompt
+    'reduce_tokens': 8000,
+    # Videos whose intermediate summaries stay cached
+    'cache_videos': 64,
+}
+
+ANSWER_CACHE_CONFIG = {
+    'max_entries': 4096,
+    'ttl_seconds': 24 * 3600,
+    # Also reuse answers for lightly reworded questions with identical context
+    # (same question words and negations, high overlap of the remaining words)
+    'near_duplicate': False,
+    'similarity_threshold': 0.8,
+}
+
+QA_CONFIG = {
+    # Concurrent Gemini calls for batch answering
+    'max_concurrency': 4,
+    # Answer every quick action in the background as soon as a video loads;
+    # costs one model call per quick action on every load, asked or not
+    'precompute_quick_actions': False,
+    # Recent per-request latency records (time-to-first-token, total) kept per session
+    'metrics_history': 200,
+}
+
+LLM_CONFIG = {
+    # 'gemini', or 'fake' to answer offline with FakeBackend (benchmarks, load tests)
+    'backend': os.environ.get('TUBEGPT_LLM_BACKEND', 'gemini'),
+    # Gemini calls in flight across every session in this process
+    'max_concurrency': 8,
+    # How long a call may wait for a free slot before reporting "busy"
+    'queue_timeout_seconds': 60.0,
+    'timeout_seconds': 60.0,
+    # Retries on 429/5xx/timeouts, with full-jitter exponential backoff
+    'max_retries': 4,
+    'backoff_base_seconds': 0.5,
+    'backoff_max_seconds': 8.0,
+    # Send a backup request when the first has not answered by then (None disables)
+    'hedge_after_seconds': 20.0,
+}
+
+FAKE_LLM_CONFIG = {
+    # Time to first token: 'fixed', 'uniform' (+/- jitter * latency) or 'lognormal' (sigma = jitter)
+    'latency_distribution': 'lognormal',
+    'latency_ms': 400.0,
+    'latency_jitter': 0.5,
+    # Fraction of calls that fail with a retryable 503
+    'error_rate': 0.0,
+    'tokens_per_second': 80.0,
+    'output_tokens': 120,
+    'seed': 0,
+}
+
+TRACING_CONFIG = {
+    # Finished spans kept in memory for the latency breakdown and OTLP export
+    'max_spans': 5000,
+    # Histogram bucket upper bounds in seconds
+    'buckets': (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0),
+}
+
+VIDEO_STORE_CONFIG = {
+    # Memory for transcripts, chunks and indexes shared by every session in the process
+    'max_bytes': int(os.environ.get('TUBEGPT_VIDEO_STORE_MB', '512')) * 1024 * 1024,
+}
+
+INGEST_CONFIG = {
+    # Videos whose transcripts are fetched at once; each fetch still waits on the rate limiter
+    'fetch_concurrency': 4,
+    # Processes that chunk and index fetched transcripts (None = one per CPU)
+    'index_workers': None,
+    # Bulk jobs wait this long for a rate-limiter slot instead of failing the strategy
+    'max_wait_seconds': 600.0,
+}
+
+FAKE_TRANSCRIPT_CONFIG = {
+    # Lognormal fetch latency around latency_ms (sigma = latency_jitter)
+    'latency_ms': 300.0,
+    'latency_jitter': 0.5,
+    'words': 8000,
+    # Fraction of fetches that report no captions
+    'error_rate': 0.0,
+    'seed': 0,
+}
+
+API_CONFIG = {
+    'host': os.environ.get('TUBEGPT_API_HOST', '127.0.0.1'),
+    'port': int(os.environ.get('TUBEGPT_API_PORT', '8000')),
+    # Requests doing work at once in one server worker process
+    'max_inflight': 32,
+    # Requests allowed to wait for a slot; beyond this the server answers 429
+    'max_queue': 64,
+    # Longest a queued request waits before it gets a 429
+    'queue_timeout_seconds': 10.0,
+    # Loaded videos each worker keeps ready to answer about
+    'max_videos': 256,
+}
+
+MEMORY_CONFIG = {
+    # Recent chat turns kept verbatim in every answer prompt
+    'recent_tokens': 1200,
+    # Older turns are folded into a running summary of at most this size
+    'summary_tokens': 300,
+    # Longer answers are clipped when remembered
+    'max_turn_tokens': 400,
+    # Fold old turns into the summary on a background thread after each answer
+    'background': True,
+}
+
+CONTEXT_CONFIG = {
+    # Ranked chunks offered to the packer per question. None offers enough
+    # whole chunks to fill the budget plus two
+    'candidates': 4,
+    # Transcript tokens per answer prompt: the four whole chunks answers used
+    # before packing, so merged overlaps cut the prompt rather than refill it
+    'budget_tokens': 4 * CHUNK_CONFIG['chunk_tokens'],
+    'separator': "\n\n",
+    # Prefix each merged span with its [m:ss] start time (a few tokens per span)
+    'timestamps': False,
+}